@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from dashboard.rollups import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user statistics rollup tables from verification history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Only rebuild these users (default: all users)',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        count = 0
+        for user in users.iterator(chunk_size=500):
+            rebuild_user_stats(user)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} user(s).'))
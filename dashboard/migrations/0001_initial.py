@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_checks', models.IntegerField(default=0)),
+                ('true_count', models.IntegerField(default=0)),
+                ('fake_count', models.IntegerField(default=0)),
+                ('partially_true_count', models.IntegerField(default=0)),
+                ('bookmarked_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='verification_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('checks', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user category stats',
+                'constraints': [models.UniqueConstraint(fields=('user', 'category'), name='dashboard_unique_user_category')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('checks', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user monthly stats',
+                'ordering': ['user', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='dashboard_unique_user_month')],
+            },
+        ),
+    ]
@@ -1,3 +1,52 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class UserStats(models.Model):
+    """Running verification counters for a user (maintained by dashboard.rollups)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='verification_stats')
+    total_checks = models.IntegerField(default=0)
+    true_count = models.IntegerField(default=0)
+    fake_count = models.IntegerField(default=0)
+    partially_true_count = models.IntegerField(default=0)
+    bookmarked_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total_checks} checks"
+
+
+class UserMonthlyStats(models.Model):
+    """Checks per user per calendar month"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    month = models.DateField()
+    checks = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['user', 'month']
+        verbose_name_plural = 'user monthly stats'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month'], name='dashboard_unique_user_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.month:%b %Y}: {self.checks}"
+
+
+class UserCategoryStats(models.Model):
+    """Checks per user per news category"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.CharField(max_length=20)
+    checks = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'user category stats'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category'], name='dashboard_unique_user_category'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category}: {self.checks}"
@@ -0,0 +1,139 @@
+"""
+Incremental maintenance of the per-user statistics rollup tables.
+
+The verification write paths call these functions so the dashboard can read
+a handful of rollup rows instead of scanning the user's whole history.
+Counters are adjusted with atomic ``F()`` updates, so concurrent workers
+never lose increments. A user without a UserStats row is rebuilt from their
+history on first touch, which also backfills accounts that predate the
+rollups; ``manage.py rebuild_user_stats`` rebuilds everything.
+"""
+from collections import Counter
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from verifier.models import VerificationResult
+from .models import UserStats, UserMonthlyStats, UserCategoryStats
+
+
+PREDICTION_FIELDS = {
+    'True': 'true_count',
+    'Fake': 'fake_count',
+    'Partially True': 'partially_true_count',
+}
+
+
+def month_key(value):
+    """First day of the (local) calendar month containing ``value``"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def rebuild_user_stats(user):
+    """Recompute every rollup row for ``user`` from their history"""
+    results = VerificationResult.objects.filter(user=user)
+    counts = results.aggregate(
+        total_checks=Count('id'),
+        true_count=Count('id', filter=Q(prediction='True')),
+        fake_count=Count('id', filter=Q(prediction='Fake')),
+        partially_true_count=Count('id', filter=Q(prediction='Partially True')),
+        bookmarked_count=Count('id', filter=Q(is_bookmarked=True)),
+    )
+    months = (
+        results.annotate(month=TruncMonth('created_at'))
+        .values('month').annotate(checks=Count('id')).order_by()
+    )
+    categories = results.values('category').annotate(checks=Count('id')).order_by()
+
+    with transaction.atomic():
+        UserStats.objects.update_or_create(user=user, defaults=counts)
+        UserMonthlyStats.objects.filter(user=user).delete()
+        UserMonthlyStats.objects.bulk_create([
+            UserMonthlyStats(user=user, month=month_key(row['month']), checks=row['checks'])
+            for row in months
+        ])
+        UserCategoryStats.objects.filter(user=user).delete()
+        UserCategoryStats.objects.bulk_create([
+            UserCategoryStats(user=user, category=row['category'], checks=row['checks'])
+            for row in categories
+        ])
+
+
+def _ensure_stats(user):
+    """True if the user's rollups exist; otherwise rebuild them and return False"""
+    if UserStats.objects.filter(user=user).exists():
+        return True
+    rebuild_user_stats(user)
+    return False
+
+
+def _bump(model, user, key_field, deltas):
+    """Apply ``{key: delta}`` to keyed rollup rows, creating missing ones"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    model.objects.bulk_create(
+        [model(user=user, **{key_field: key}) for key in deltas],
+        ignore_conflicts=True,
+    )
+    # One UPDATE per distinct delta rather than per row
+    by_delta = {}
+    for key, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(key)
+    for delta, keys in by_delta.items():
+        model.objects.filter(user=user, **{f'{key_field}__in': keys}).update(checks=F('checks') + delta)
+
+
+def _apply(user, results, sign):
+    if not _ensure_stats(user):
+        return  # the rebuild already reflects these rows
+
+    counters = Counter({'total_checks': len(results)})
+    for result in results:
+        field = PREDICTION_FIELDS.get(result.prediction)
+        if field:
+            counters[field] += 1
+        if result.is_bookmarked:
+            counters['bookmarked_count'] += 1
+
+    UserStats.objects.filter(user=user).update(
+        **{field: F(field) + sign * count for field, count in counters.items()},
+        updated_at=timezone.now(),
+    )
+    _bump(UserMonthlyStats, user, 'month',
+          {k: sign * v for k, v in Counter(month_key(r.created_at) for r in results).items()})
+    _bump(UserCategoryStats, user, 'category',
+          {k: sign * v for k, v in Counter(r.category for r in results).items()})
+
+
+def record_results_created(user, results):
+    """Count newly created VerificationResult rows"""
+    if results:
+        with transaction.atomic():
+            _apply(user, results, 1)
+
+
+def record_result_deleted(result):
+    """Un-count a VerificationResult that was just deleted"""
+    with transaction.atomic():
+        _apply(result.user, [result], -1)
+
+
+def record_bookmark_changed(result):
+    """Adjust the bookmark counter after ``result.is_bookmarked`` was flipped.
+
+    Call it only when the flip changed the row (a conditional UPDATE that
+    matched), or concurrent toggles apply the same delta twice.
+    """
+    if not _ensure_stats(result.user):
+        return
+    delta = 1 if result.is_bookmarked else -1
+    UserStats.objects.filter(user=result.user).update(
+        bookmarked_count=F('bookmarked_count') + delta,
+        updated_at=timezone.now(),
+    )
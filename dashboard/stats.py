@@ -0,0 +1,95 @@
+"""
+Per-user verification statistics shared by the dashboard page and its JSON API.
+
+Lifetime counters, the category breakdown and the monthly trend are read from
+the rollup tables maintained by dashboard.rollups, so their cost does not
+grow with the size of the user's history. Only the rolling week-over-week
+numbers touch VerificationResult, as one conditional aggregate over the last
+two weeks of rows.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from verifier.models import VerificationResult
+from .models import UserStats, UserMonthlyStats, UserCategoryStats
+from .rollups import month_key, rebuild_user_stats
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _previous_month(month_start):
+    return _month_start(month_start - timedelta(days=1))
+
+
+def _get_rollup(user):
+    stats = UserStats.objects.filter(user=user).first()
+    if stats is None:
+        rebuild_user_stats(user)
+        stats = UserStats.objects.get(user=user)
+    return stats
+
+
+def get_user_stats(user, months=6, include_monthly=True, include_details=True):
+    """Counters, category breakdown and (optionally) monthly trend for a user"""
+    rollup = _get_rollup(user)
+    stats = {
+        'total_checks': rollup.total_checks,
+        'true_news_count': rollup.true_count,
+        'fake_news_count': rollup.fake_count,
+        'partially_true_count': rollup.partially_true_count,
+        'bookmarked_count': rollup.bookmarked_count,
+    }
+    if not include_details:
+        return stats
+
+    now = timezone.now()
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = week_ago - timedelta(days=7)
+    stats.update(
+        VerificationResult.objects
+        .filter(user=user, created_at__gte=two_weeks_ago)
+        .aggregate(
+            weekly_checks=Count('id', filter=Q(created_at__gte=week_ago)),
+            this_week_true=Count('id', filter=Q(created_at__gte=week_ago, prediction='True')),
+            last_week_true=Count('id', filter=Q(created_at__lt=week_ago, prediction='True')),
+        )
+    )
+
+    stats['category_stats'] = list(
+        UserCategoryStats.objects
+        .filter(user=user, checks__gt=0)
+        .order_by('-checks')
+        .values('category', count=F('checks'))[:5]
+    )
+
+    if include_monthly:
+        stats['monthly_data'] = get_monthly_checks(user, months, now)
+
+    return stats
+
+
+def get_monthly_checks(user, months=6, now=None):
+    """Checks per calendar month for the last ``months`` months, oldest first"""
+    now = now or timezone.now()
+    month_starts = [_month_start(timezone.localtime(now) if timezone.is_aware(now) else now)]
+    for _ in range(months - 1):
+        month_starts.append(_previous_month(month_starts[-1]))
+    month_starts.reverse()
+
+    by_month = dict(
+        UserMonthlyStats.objects
+        .filter(user=user, month__gte=month_key(month_starts[0]))
+        .values_list('month', 'checks')
+    )
+
+    return [
+        {
+            'month': month.strftime('%b %Y'),
+            'checks': by_month.get(month_key(month), 0),
+        }
+        for month in month_starts
+    ]
@@ -6,4 +6,5 @@ app_name = 'dashboard'
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('api/stats/', views.user_stats_api, name='user_stats_api'),
+    path('api/trending/', views.trending_topics_api, name='trending_topics_api'),
 ]
@@ -3,6 +3,7 @@ Django settings for fake_news_detector project.
 """
 
 from pathlib import Path
+import json
 import os
 from dotenv import load_dotenv
 
@@ -106,6 +107,19 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared across worker processes on the same host; point at redis/memcached in production
+    'verdicts': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'verdicts',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -116,3 +130,120 @@ LOGIN_URL = '/accounts/login/'
 
 # API Configuration
 NEWS_VERIFICATION_API_KEY = os.getenv('NEWS_VERIFICATION_API_KEY')
+
+# OpenAI-compatible chat completions endpoint used by verifier/api_verifier.py
+LLM_API_BASE_URL = os.getenv('LLM_API_BASE_URL', 'https://api.groq.com/openai/v1')
+LLM_MODEL = os.getenv('LLM_MODEL', 'llama3-70b-8192')
+
+# LLM provider routing (see verifier/llm_providers.py). A JSON list of
+# OpenAI-compatible endpoints, e.g.
+#   [{"name": "groq", "base_url": "https://api.groq.com/openai/v1",
+#     "model": "llama3-70b-8192", "api_key_env": "GROQ_API_KEY", "weight": 2},
+#    {"name": "xai", "base_url": "https://api.x.ai/v1", "model": "grok-beta",
+#     "api_key_env": "XAI_API_KEY"}]
+# Empty means the single endpoint above with NEWS_VERIFICATION_API_KEY.
+LLM_PROVIDERS = json.loads(os.getenv('LLM_PROVIDERS', '[]'))
+LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'True').lower() == 'true'
+LLM_HEDGE_DELAY = None  # seconds; None follows the primary provider's p95
+LLM_HEDGE_MIN_DELAY = 0.25
+LLM_HEDGE_MAX_DELAY = 5.0
+LLM_LATENCY_EWMA_ALPHA = 0.1
+LLM_ROUTER_MAX_WORKERS = 32
+
+# Admission control (see verifier/rate_limit.py). Per-user token bucket for
+# verification requests, and a global bucket per provider pacing upstream
+# calls below its quota ("rpm" in LLM_PROVIDERS overrides the default; 0 or
+# None disables). Calls queue for up to LLM_UPSTREAM_MAX_WAIT seconds before
+# answering 429. Buckets are per process unless RATE_LIMIT_CACHE_ALIAS names
+# a cache shared by all processes (redis, memcached or database).
+VERIFY_USER_RATE_PER_MINUTE = int(os.getenv('VERIFY_USER_RATE_PER_MINUTE', 10))
+VERIFY_USER_BURST = int(os.getenv('VERIFY_USER_BURST', 10))
+LLM_UPSTREAM_RATE_PER_MINUTE = int(os.getenv('LLM_UPSTREAM_RATE_PER_MINUTE', 27))  # Groq free tier: 30
+LLM_UPSTREAM_BURST = 5
+LLM_UPSTREAM_MAX_WAIT = 5.0
+RATE_LIMIT_CACHE_ALIAS = os.getenv('RATE_LIMIT_CACHE_ALIAS') or None
+
+# Verdict JSON parsing (see verifier/verdict_parsing.py): one cheap retry that
+# asks the model to fix an unparseable reply, and optional recording of raw
+# replies (JSON lines) for `manage.py benchmark_verdict_parsing --file`
+LLM_JSON_REPAIR_ENABLED = os.getenv('LLM_JSON_REPAIR_ENABLED', 'True').lower() == 'true'
+LLM_JSON_REPAIR_MAX_TOKENS = int(os.getenv('LLM_JSON_REPAIR_MAX_TOKENS', 400))
+LLM_OUTPUT_RECORD_PATH = os.getenv('LLM_OUTPUT_RECORD_PATH', '')
+
+# Prompt size (see verifier/prompt_budget.py): articles over the token budget
+# are shortened with 'key_sentences' (TF-IDF ranked) or 'head_tail'
+LLM_CONTEXT_TOKENS = 8192
+LLM_MAX_COMPLETION_TOKENS = 500
+LLM_ARTICLE_TOKEN_BUDGET = int(os.getenv('LLM_ARTICLE_TOKEN_BUDGET', 3000))
+LLM_TRUNCATION_STRATEGY = os.getenv('LLM_TRUNCATION_STRATEGY', 'key_sentences')
+VERIFICATION_MAX_CONTENT_CHARS = 50000
+
+# Stream the LLM's analysis to the verify page over server-sent events
+VERIFICATION_STREAMING_ENABLED = os.getenv('VERIFICATION_STREAMING_ENABLED', 'True').lower() == 'true'
+
+# Verdict cache (see verifier/cache.py)
+VERDICT_CACHE_TTL = int(os.getenv('VERDICT_CACHE_TTL', 3600))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv('VERDICT_CACHE_MAX_ENTRIES', 2048))
+VERDICT_CACHE_SHARED_ALIAS = os.getenv('VERDICT_CACHE_SHARED_ALIAS', 'verdicts') or None
+
+# Near-duplicate reuse: articles this similar (estimated Jaccard) to a recent verdict reuse it
+NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'True').lower() == 'true'
+NEAR_DUPLICATE_THRESHOLD = 0.85
+NEAR_DUPLICATE_MAX_AGE_DAYS = 30
+# Older signatures are pruned this often (seconds) by the background trending flusher
+NEAR_DUPLICATE_PRUNE_INTERVAL = 3600
+
+# Local ML models (vectorizer + classifiers written by manage.py train_models)
+ML_MODEL_DIR = BASE_DIR / 'ML_Model_Training' / 'model_training'
+ML_DATASET_DIR = BASE_DIR / 'ML_Model_Training' / 'datasets'
+ML_BUNDLE_DIR = ML_MODEL_DIR / 'bundles'
+
+# Model registry: champion/candidate bundles named in ML_BUNDLE_DIR/registry.json (manage.py model_rollout),
+# hot-swapped by every process within the poll interval; shadow scoring runs on a bounded background queue
+ML_REGISTRY_POLL_SECONDS = 5
+ML_SHADOW_QUEUE_SIZE = 1000
+ML_SHADOW_LOG_EVERY = 100
+
+# Tiered verification: answer locally and only escalate uncertain or high-risk articles to the LLM
+VERIFICATION_CASCADE_ENABLED = os.getenv('VERIFICATION_CASCADE_ENABLED', 'True').lower() == 'true'
+VERIFICATION_CASCADE_THRESHOLD = float(os.getenv('VERIFICATION_CASCADE_THRESHOLD', 0.85))
+VERIFICATION_HIGH_RISK_CATEGORIES = ['Politics', 'Health']
+
+# Batch verification API
+BATCH_VERIFY_MAX_ITEMS = 500
+BATCH_VERIFY_MAX_CONCURRENCY = int(os.getenv('BATCH_VERIFY_MAX_CONCURRENCY', 8))
+
+# Pooled HTTP client for upstream LLM / fact-check APIs (see verifier/http_client.py)
+LLM_HTTP_POOL_SIZE = int(os.getenv('LLM_HTTP_POOL_SIZE', 10))
+LLM_HTTP_MAX_RETRIES = int(os.getenv('LLM_HTTP_MAX_RETRIES', 2))
+LLM_HTTP_BACKOFF_BASE = 0.5
+LLM_HTTP_BACKOFF_MAX = 8.0
+LLM_HTTP_CONNECT_TIMEOUT = 3.05
+LLM_HTTP_READ_TIMEOUT = float(os.getenv('LLM_HTTP_READ_TIMEOUT', 30))
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+LLM_CIRCUIT_RESET_TIMEOUT = 30
+
+# Background verification jobs: the form view enqueues and run_verification_workers drains the queue
+VERIFICATION_ASYNC_JOBS = os.getenv('VERIFICATION_ASYNC_JOBS', 'False').lower() == 'true'
+VERIFICATION_WORKER_PROCESSES = int(os.getenv('VERIFICATION_WORKER_PROCESSES', 2))
+# A running job's worker heartbeats every HEARTBEAT seconds; jobs silent for STALE seconds are requeued
+VERIFICATION_JOB_HEARTBEAT_SECONDS = 15
+VERIFICATION_JOB_STALE_SECONDS = 120
+# Longest ?wait= on the job status API; a waiting request holds a web worker
+VERIFICATION_JOB_MAX_WAIT = 1
+
+# Verification history: how long filtered/search result totals are cached
+HISTORY_COUNT_CACHE_TTL = 60
+
+# Trending topics: buffered counts are flushed in the background and decayed over a sliding window
+TRENDING_FLUSH_INTERVAL = 30
+TRENDING_RESCORE_INTERVAL = 300
+TRENDING_WINDOW_HOURS = 48
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_KEYWORDS_PER_ARTICLE = 2
+# The published top-topics list lives in a cache every worker process shares
+TRENDING_CACHE_ALIAS = os.getenv('TRENDING_CACHE_ALIAS', 'verdicts')
+TRENDING_CACHE_TTL = 300
+
+# Corpus IDF table for keyword extraction (manage.py build_keyword_idf)
+KEYWORD_IDF_PATH = ML_MODEL_DIR / 'keyword_idf.npz'
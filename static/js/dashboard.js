@@ -237,15 +237,44 @@ function initializeRealTimeUpdates() {
  * Refresh trending topics
  */
 function refreshTrendingTopics() {
-    // This would typically make an AJAX call to get updated trending topics
-    // For now, we'll just add a visual indicator that data is being refreshed
-    const trendingCard = document.querySelector('.card:has(h5:contains("Trending Topics"))');
-    if (trendingCard) {
-        trendingCard.style.opacity = '0.7';
-        setTimeout(() => {
-            trendingCard.style.opacity = '1';
-        }, 1000);
+    const trendingCard = document.getElementById('trending-topics');
+    if (!trendingCard) {
+        return;
     }
+    const trendingApiUrl = trendingCard.dataset.url || '/dashboard/api/trending/';
+
+    trendingCard.style.opacity = '0.7';
+    fetch(trendingApiUrl, {
+        method: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        const list = trendingCard.querySelector('.list-group');
+        if (!list || !data.topics.length) {
+            return;
+        }
+        // Build with textContent: topics come from user-submitted articles
+        list.replaceChildren(...data.topics.map(item => {
+            const row = document.createElement('li');
+            row.className = 'list-group-item d-flex justify-content-between align-items-center';
+            const name = document.createElement('span');
+            name.textContent = item.topic;
+            const count = document.createElement('span');
+            count.className = 'badge bg-secondary rounded-pill';
+            count.textContent = item.count;
+            row.append(name, count);
+            return row;
+        }));
+    })
+    .catch(error => {
+        console.error('Error refreshing trending topics:', error);
+    })
+    .finally(() => {
+        trendingCard.style.opacity = '1';
+    });
 }
 
 /**
@@ -575,4 +604,5 @@ document.addEventListener('DOMContentLoaded', function() {
 // Make functions available globally for inline event handlers
 window.installPWA = installPWA;
 window.refreshUserStats = refreshUserStats;
+window.refreshTrendingTopics = refreshTrendingTopics;
 window.showToast = showToast;
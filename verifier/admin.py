@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import VerificationResult, TrendingTopic
+from .models import VerificationResult, TrendingTopic, VerificationJob, ApiToken
 
 
 @admin.register(VerificationResult)
 class VerificationResultAdmin(admin.ModelAdmin):
     list_display = ('user', 'title_preview', 'prediction', 'confidence', 'created_at')
-    list_filter = ('prediction', 'created_at', 'category')
+    list_filter = ('prediction', 'source', 'created_at', 'category')
     search_fields = ('title', 'content', 'user__username')
     readonly_fields = ('created_at',)
     
@@ -16,6 +16,32 @@ class VerificationResultAdmin(admin.ModelAdmin):
 
 @admin.register(TrendingTopic)
 class TrendingTopicAdmin(admin.ModelAdmin):
-    list_display = ('topic', 'verification_count', 'created_at')
+    list_display = ('topic', 'verification_count', 'score', 'created_at')
     search_fields = ('topic',)
     readonly_fields = ('created_at',)
+
+
+@admin.register(VerificationJob)
+class VerificationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'created_at', 'last_used_at')
+    search_fields = ('name', 'user__username')
+    readonly_fields = ('key_hash', 'created_at', 'last_used_at')
+
+    def has_add_permission(self, request):
+        # The key is only ever shown by ``manage.py create_api_token``; a token
+        # added here would have no key that matches it
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            'subtitle': 'Issue tokens with: manage.py create_api_token <username> --name <name>',
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
@@ -2,33 +2,43 @@
 Grok AI News Verification System
 Uses xAI's Grok models for intelligent news fact-checking
 """
-import json
-import requests
-from typing import Dict, Any, Optional
-from fake_news_detector.settings import NEWS_VERIFICATION_API_KEY
+from typing import Dict, Any, Iterator, Optional, Tuple
+from django.conf import settings
+from .llm_providers import get_provider_router
+from .prompt_budget import article_budget, estimate_tokens, fit_to_budget
+from .rate_limit import RateLimited
+from .streaming import AnalysisStreamParser, iter_completion_deltas
+from .verdict_parsing import JSONObjectScanner, parse_metrics, parse_verdict, record_output
 
 class AutoAPINewsVerifier:
-    
+
+    # Bump whenever the prompt below changes so cached verdicts are not reused
+    prompt_version = "v1"
+
     def __init__(self):
-        self.api_key = NEWS_VERIFICATION_API_KEY
-        # self.base_url = "https://api.x.ai/v1"
-        self.base_url = "https://api.groq.com/openai/v1"
-        # self.model = "grok-beta"  # Using the main Grok model
-        self.model = "llama3-70b-8192"
+        # Providers (base URL, model, key) come from LLM_PROVIDERS; see llm_providers.py
+        self.router = get_provider_router()
+        self.model = self.router.model_label
+        self.max_tokens = getattr(settings, 'LLM_MAX_COMPLETION_TOKENS', 500)
+        self.repair_enabled = getattr(settings, 'LLM_JSON_REPAIR_ENABLED', True)
+        self.repair_max_tokens = getattr(settings, 'LLM_JSON_REPAIR_MAX_TOKENS', 400)
+        self.repair_input_chars = 4000
 
     def verify_news(self, text: str, title: str = "") -> Dict[str, Any]:
 
-        if not self.api_key:
+        if not self.router.providers:
             return self._demo_verification(text, title)
             
         try:
             return self._call_grok_api(text, title)
+        except RateLimited:
+            raise  # over quota: the caller answers 429 rather than a demo verdict
         except Exception as e:
             print(f"Grok API error: {e}")
             return self._demo_verification(text, title)
     
-    def _call_grok_api(self, text: str, title: str = "") -> Dict[str, Any]:
-        
+    def _build_request(self, text: str, title: str = ""):
+        """Chat-completion payload for one article, without the provider's model"""
         content = f"Headline: {title}\n\nContent: {text}" if title else text
         
         prompt = f"""
@@ -52,13 +62,7 @@ class AutoAPINewsVerifier:
         }}
         """
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
         data = {
-            "model": self.model,
             "messages": [
                 {
                     "role": "system", 
@@ -70,62 +74,136 @@ class AutoAPINewsVerifier:
                 }
             ],
             "temperature": 0.3, 
-            "max_tokens": 500
+            "max_tokens": self.max_tokens
         }
+        return data
+
+    @staticmethod
+    def _for_provider(data: Dict[str, Any]):
+        return lambda provider: dict(data, model=provider.model)
+
+    def _fit_article(self, text: str, title: str = "") -> Tuple[str, Dict[str, Any]]:
+        """Shorten the article to the prompt's token budget"""
+        empty = self._build_request("", title)
+        overhead = sum(estimate_tokens(message["content"]) for message in empty["messages"])
+        text, budget = fit_to_budget(text, article_budget(overhead))
+        if budget['truncated']:
+            print(
+                f"Article shortened for the prompt ({budget['strategy']}): "
+                f"~{budget['original_tokens']} -> ~{budget['tokens']} tokens, "
+                f"budget {budget['budget']}"
+            )
+        return text, budget
+
+    @staticmethod
+    def _with_budget(result: Dict[str, Any], budget: Dict[str, Any]) -> Dict[str, Any]:
+        if budget['truncated']:
+            result['truncated'] = True
+        return result
+
+    def _call_grok_api(self, text: str, title: str = "") -> Dict[str, Any]:
+        text, budget = self._fit_article(text, title)
+        data = self._build_request(text, title)
         
-        response = requests.post(
-            f"{self.base_url}/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=30
+        provider, result = self.router.complete(self._for_provider(data))
+        verdict = self._parse_completion(result['choices'][0]['message']['content'])
+        verdict['provider'] = provider.name
+        return self._with_budget(verdict, budget)
+
+    def stream_news(self, text: str, title: str = "") -> Iterator[Tuple[str, Any]]:
+        """Verify with a streamed completion.
+
+        Yields ``('analysis', text)`` as the model writes its explanation and
+        finally ``('result', result_dict)``. Without a configured provider, or if
+        the stream fails before producing anything, the demo verdict is the result.
+        """
+        if not self.router.providers:
+            yield 'result', self._demo_verification(text, title)
+            return
+
+        article, budget = self._fit_article(text, title)
+        data = self._build_request(article, title)
+        data["stream"] = True
+        parser = AnalysisStreamParser()
+        scanner = JSONObjectScanner()
+        provider = None
+        try:
+            provider, response, lines = self.router.stream(self._for_provider(data))
+            with response:
+                for delta in iter_completion_deltas(lines):
+                    analysis = parser.feed(delta)
+                    if analysis:
+                        yield 'analysis', analysis
+                    if scanner.feed(delta) and parse_verdict(parser.text, scanner)[0] is not None:
+                        # The verdict object is complete; anything after it is chatter
+                        break
+        except RateLimited:
+            raise
+        except Exception as e:
+            print(f"Grok API streaming error: {e}")
+            if not parser.text:
+                yield 'result', self._demo_verification(text, title)
+                return
+
+        verdict = self._parse_completion(parser.text, scanner)
+        verdict['provider'] = provider.name
+        yield 'result', self._with_budget(verdict, budget)
+
+    def _parse_completion(self, content: str, scanner: Optional[JSONObjectScanner] = None) -> Dict[str, Any]:
+        """Turn the model's reply into a result dict, with one repair retry"""
+        record_output(content)
+        verdict, status = parse_verdict(content, scanner)
+        failure = None
+        if verdict is None:
+            failure = status
+            if self.repair_enabled:
+                repaired = self._repair_completion(content, status)
+                verdict, _ = parse_verdict(repaired) if repaired else (None, None)
+            status = 'repaired' if verdict is not None else 'failed'
+        parse_metrics.record(status, failure)
+
+        if verdict is not None:
+            return {**verdict, 'source': 'llm'}
+        print(f"Unparseable LLM verdict ({failure})")
+        return {
+            'prediction': 'Partially True',
+            'confidence': 0.5,
+            'analysis': content[:200] + "...",
+            'key_issues': [],
+            'credibility_score': 0.5,
+            'source': 'llm_unparsed',
+        }
+
+    def _repair_completion(self, content: str, problem: str) -> Optional[str]:
+        """Ask the model once to re-emit a broken reply as valid JSON.
+
+        Only the broken reply is sent, not the article, and the answer is
+        capped at a few hundred tokens, so this costs a fraction of the
+        original call.
+        """
+        prompt = (
+            "The reply below was meant to be one JSON object with the keys "
+            '"prediction" ("True", "Fake" or "Partially True"), "confidence" (0 to 1), '
+            '"analysis" (string), "key_issues" (list of strings) and '
+            f'"credibility_score" (0 to 1), but it failed to parse ({problem}). '
+            "Return only the corrected JSON object, keeping the original assessment.\n\n"
+            f"{content[:self.repair_input_chars]}"
         )
-        
-        if response.status_code != 200:
-            raise Exception(f"API call failed: {response.status_code} - {response.text}")
-        
-        result = response.json()
-        content = result['choices'][0]['message']['content']
-        import re
-        json_match = re.search(r'\{.*?\}', content, re.DOTALL)
-
-        # Parse the JSON response
-        # try:
-        #     analysis = json.loads(content)
-        #     return {
-        #         'prediction': analysis.get('prediction'),
-        #         'confidence': float(analysis.get('confidence', 0.5)),
-        #         'analysis': analysis.get('analysis', 'Analysis completed'),
-        #         'key_issues': analysis.get('key_issues', []),
-        #         'credibility_score': float(analysis.get('credibility_score', 0.5))
-        #     }
-        # except json.JSONDecodeError:
-        #     # Fallback if JSON parsing fails
-        #     return {
-        #         'prediction': 'Partially True',
-        #         'confidence': 0.5,
-        #         'analysis': content[:200] + "...",
-        #         'key_issues': [],
-        #         'credibility_score': 0.5
-        #     }
-
-        if json_match:
-            analysis = json.loads(json_match.group())
-            return {
-                'prediction': analysis.get('prediction'),
-                'confidence': float(analysis.get('confidence', 0.5)),
-                'analysis': analysis.get('analysis', 'Analysis completed'),
-                'key_issues': analysis.get('key_issues', []),
-                'credibility_score': float(analysis.get('credibility_score', 0.5))
-            }
-        else:
-            return {
-                'prediction': 'Partially True',
-                'confidence': 0.5,
-                'analysis': content[:200] + "...",
-                'key_issues': [],
-                'credibility_score': 0.5
-            }
-    
+        data = {
+            "messages": [
+                {"role": "system", "content": "You repair malformed JSON. Reply with a single JSON object and nothing else."},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0,
+            "max_tokens": self.repair_max_tokens,
+        }
+        try:
+            _, result = self.router.complete(self._for_provider(data))
+            return result['choices'][0]['message']['content']
+        except Exception as e:
+            print(f"Grok API repair error: {e}")
+            return None
+
     def _demo_verification(self, text: str, title: str = "") -> Dict[str, Any]:
         """Demo verification for testing without API key"""
         # print("Using demo funtion")
@@ -156,4 +234,5 @@ class AutoAPINewsVerifier:
             'analysis': analysis,
             'key_issues': ['Demo mode - get XAI_API_KEY for full analysis'],
             'credibility_score': confidence,
+            'source': 'demo',
         }
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Bulk scoring of stored verifications with the local classifiers.
+
+Rows are streamed from the database in chunks, and each chunk is vectorized
+and scored in one call per model (LocalModelEngine.score_many). With more
+than one worker, chunks are scored in a process pool while the parent keeps
+reading; each worker loads its own copy of the models once.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from .ml_engine import LocalModelEngine, get_local_engine
+
+
+Chunk = Tuple[List[int], List[str]]
+
+
+def iter_chunks(queryset, chunk_size: int) -> Iterator[Chunk]:
+    """Yield ``(ids, texts)`` chunks of ``queryset`` without loading it whole"""
+    ids, texts = [], []
+    rows = queryset.values_list('id', 'title', 'content').order_by()
+    for pk, title, content in rows.iterator(chunk_size=chunk_size):
+        ids.append(pk)
+        texts.append(f"{title} {content}".strip())
+        if len(ids) == chunk_size:
+            yield ids, texts
+            ids, texts = [], []
+    if ids:
+        yield ids, texts
+
+
+def score_chunk(chunk: Chunk):
+    """Score one chunk; returns ``(ids, logistic_true, tree_true, seconds)``"""
+    ids, texts = chunk
+    start = time.perf_counter()
+    logistic_true, tree_true = get_local_engine().score_many(texts)
+    return ids, logistic_true, tree_true, time.perf_counter() - start
+
+
+def _init_worker():
+    # Under spawn/forkserver the child starts without Django configured
+    import django
+
+    django.setup()
+    get_local_engine().available
+
+
+def score_chunks(chunks, workers: int = 1):
+    """Score ``chunks`` in order, in this process or in ``workers`` processes.
+
+    At most two chunks per worker are in flight, so memory stays bounded no
+    matter how large the archive is.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield score_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def combined_verdicts(logistic_true: np.ndarray, tree_true: np.ndarray):
+    """Vectorized counterpart of LocalModelEngine._result: labels and confidences"""
+    combined = (logistic_true + tree_true) / 2.0
+    labels = np.where(combined >= 0.5, LocalModelEngine.LABELS[1], LocalModelEngine.LABELS[0])
+    return labels, np.maximum(combined, 1.0 - combined)
+
+
+def default_workers() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
@@ -0,0 +1,167 @@
+"""
+Verdict cache for news verification results.
+
+Verdicts are keyed on a hash of the normalized article text plus the model
+name and prompt version, so the same story pasted by many users only reaches
+the upstream API once per TTL. Lookups go through a small in-process LRU
+first and then an optional shared tier backed by a Django cache alias
+(locmem, file-based, redis, ...).
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+
+class LocalLRUTier:
+    """Thread-safe in-process LRU store with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DjangoCacheTier:
+    """Shared tier delegating to a configured Django cache alias"""
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.backend = caches[alias]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        self.backend.set(key, value, timeout=ttl)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class VerdictCache:
+    """Two-tier TTL cache for verification verdicts with hit/miss counters"""
+
+    def __init__(self, local_tier=None, shared_tier=None, ttl: int = 3600, key_prefix: str = 'verdict'):
+        self.local_tier = local_tier
+        self.shared_tier = shared_tier
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'stores': 0}
+
+    @staticmethod
+    def content_hash(normalized_text: str) -> str:
+        """Hash of already-normalized article text"""
+        return hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()
+
+    def make_key(self, normalized_text: str, model: str, prompt_version: str) -> str:
+        return f"{self.key_prefix}:{model}:{prompt_version}:{self.content_hash(normalized_text)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.local_tier is not None:
+            value = self.local_tier.get(key)
+            if value is not None:
+                self._count('local_hits')
+                return copy.deepcopy(value)
+
+        if self.shared_tier is not None:
+            try:
+                value = self.shared_tier.get(key)
+            except Exception as e:
+                print(f"Verdict cache shared tier error: {e}")
+                value = None
+            if value is not None:
+                self._count('shared_hits')
+                if self.local_tier is not None:
+                    self.local_tier.set(key, value, self.ttl)
+                return copy.deepcopy(value)
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        if self.local_tier is not None:
+            self.local_tier.set(key, value, self.ttl)
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.set(key, value, self.ttl)
+            except Exception as e:
+                print(f"Verdict cache shared tier error: {e}")
+        self._count('stores')
+
+    def clear(self) -> None:
+        for tier in (self.local_tier, self.shared_tier):
+            if tier is not None:
+                tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        hits = counters['local_hits'] + counters['shared_hits']
+        lookups = hits + counters['misses']
+        counters['hit_rate'] = hits / lookups if lookups else 0.0
+        counters['local_entries'] = len(self.local_tier) if self.local_tier is not None else 0
+        return counters
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+_verdict_cache = None
+_verdict_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Return the process-wide verdict cache configured from settings"""
+    global _verdict_cache
+    if _verdict_cache is None:
+        with _verdict_cache_lock:
+            if _verdict_cache is None:
+                shared_tier = None
+                alias = getattr(settings, 'VERDICT_CACHE_SHARED_ALIAS', None)
+                if alias:
+                    try:
+                        shared_tier = DjangoCacheTier(alias)
+                    except InvalidCacheBackendError:
+                        print(f"Verdict cache alias '{alias}' is not configured; using local tier only")
+                _verdict_cache = VerdictCache(
+                    local_tier=LocalLRUTier(getattr(settings, 'VERDICT_CACHE_MAX_ENTRIES', 1024)),
+                    shared_tier=shared_tier,
+                    ttl=getattr(settings, 'VERDICT_CACHE_TTL', 3600),
+                )
+    return _verdict_cache
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from .models import VerificationResult
 
 
@@ -15,6 +16,7 @@ class NewsVerificationForm(forms.Form):
     )
     
     content = forms.CharField(
+        max_length=getattr(settings, 'VERIFICATION_MAX_CONTENT_CHARS', 50000),
         widget=forms.Textarea(attrs={
             'class': 'form-control',
             'placeholder': 'Paste the full article text or headline here...',
@@ -0,0 +1,184 @@
+"""
+Shared HTTP client for upstream verification APIs.
+
+One connection-pooled ``requests.Session`` is reused by every verification
+in the process, so calls to the same provider skip the TCP/TLS handshake.
+Transient failures (connection errors, timeouts, 429 and 5xx) are retried
+with jittered exponential backoff that honours ``Retry-After``, and a
+per-host circuit breaker fails fast while a provider is degraded so callers
+can drop to their fallback tier immediately.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe through; its outcome decides the next state
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class PooledHTTPClient:
+    """Thread-safe keep-alive client with retry/backoff and circuit breaking"""
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 connect_timeout: float = 3.05, read_timeout: float = 30.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = (connect_timeout, read_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST with retries. Returns the last response or raises the last error.
+
+        Raises CircuitOpenError without touching the network while the host's
+        circuit is open.
+        """
+        breaker = self.breaker_for(url)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f'Circuit open for {urlparse(url).netloc}')
+
+        kwargs.setdefault('timeout', self.timeout)
+        response = None
+        error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, **kwargs)
+                error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                response = None
+                error = e
+            except Exception:
+                # Not worth retrying (bad URL, redirect loop, broken body), but
+                # still a failure: a half-open probe must not leave the circuit stuck
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+
+            if attempt == self.max_retries:
+                break
+            delay = self._retry_delay(attempt, response)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up now"""
+        if response is not None:
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                # Waiting longer than our backoff cap would just hold the worker
+                return retry_after if retry_after <= self.backoff_max else None
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHTTPClient:
+    """Return the process-wide pooled client configured from settings"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PooledHTTPClient(
+                    pool_size=getattr(settings, 'LLM_HTTP_POOL_SIZE', 10),
+                    max_retries=getattr(settings, 'LLM_HTTP_MAX_RETRIES', 2),
+                    backoff_base=getattr(settings, 'LLM_HTTP_BACKOFF_BASE', 0.5),
+                    backoff_max=getattr(settings, 'LLM_HTTP_BACKOFF_MAX', 8.0),
+                    connect_timeout=getattr(settings, 'LLM_HTTP_CONNECT_TIMEOUT', 3.05),
+                    read_timeout=getattr(settings, 'LLM_HTTP_READ_TIMEOUT', 30.0),
+                    failure_threshold=getattr(settings, 'LLM_CIRCUIT_FAILURE_THRESHOLD', 5),
+                    reset_timeout=getattr(settings, 'LLM_CIRCUIT_RESET_TIMEOUT', 30.0),
+                )
+    return _client
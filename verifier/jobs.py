@@ -0,0 +1,145 @@
+"""
+DB-backed queue of verification jobs.
+
+Web requests enqueue a job and return immediately; the worker processes
+started by ``manage.py run_verification_workers`` claim jobs one at a time.
+Claiming is a conditional UPDATE on the job's status, so any number of
+workers can drain the same table without an external broker or row locks.
+
+While a job runs, its worker refreshes ``started_at`` as a heartbeat, so
+only jobs whose worker died go stale however long the upstream calls take.
+Finishing a job is conditional on the worker still owning that attempt: a
+worker whose job was requeued and claimed again finishes without effect.
+"""
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VerificationJob
+
+
+# Shown on the job page; exception text can carry URLs, SQL or provider errors
+FAILED_JOB_MESSAGE = 'Verification failed. Please try again.'
+
+def enqueue_job(user, title, content, category, save_to_history=True):
+    """Queue an article for background verification"""
+    return VerificationJob.objects.create(
+        user=user,
+        title=title or '',
+        content=content,
+        category=category or 'Other',
+        save_to_history=save_to_history,
+    )
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to running and return it, or None"""
+    while True:
+        job_id = (
+            VerificationJob.objects
+            .filter(status=VerificationJob.STATUS_QUEUED)
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        claimed = VerificationJob.objects.filter(
+            id=job_id, status=VerificationJob.STATUS_QUEUED
+        ).update(status=VerificationJob.STATUS_RUNNING, started_at=timezone.now(),
+                 attempts=F('attempts') + 1)
+        if claimed:
+            return VerificationJob.objects.select_related('user').get(id=job_id)
+        # Another worker won the race for this job; try the next one
+
+
+def _owned(job):
+    """The job's row, if it is still running the attempt ``job`` was claimed for"""
+    return VerificationJob.objects.filter(
+        id=job.id, status=VerificationJob.STATUS_RUNNING, attempts=job.attempts
+    )
+
+
+def heartbeat(job) -> bool:
+    """Mark a running job as alive; False once the worker no longer owns it"""
+    return bool(_owned(job).update(started_at=timezone.now()))
+
+
+class JobHeartbeat:
+    """Context manager that sends heartbeats for ``job`` from a background thread"""
+
+    def __init__(self, job, interval):
+        self.job = job
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-{job.id}-heartbeat', daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not heartbeat(self.job):
+                    return
+        except Exception as e:
+            print(f"Heartbeat for job {self.job.id} failed: {e}")
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def complete_job(job, result, save_result=None) -> bool:
+    """Mark a claimed job done; returns False, changing nothing, if it is no longer ours.
+
+    ``save_result`` (returning the VerificationResult) runs in the same
+    transaction, so a job is never saved to history twice.
+    """
+    with transaction.atomic():
+        if not _owned(job).update(status=VerificationJob.STATUS_DONE, result=result,
+                                  finished_at=timezone.now()):
+            return False
+        if save_result is not None:
+            VerificationJob.objects.filter(id=job.id).update(verification_result=save_result())
+    return True
+
+
+def fail_job(job) -> bool:
+    """Mark a claimed job failed. The user sees FAILED_JOB_MESSAGE; details belong in the worker log"""
+    return bool(_owned(job).update(
+        status=VerificationJob.STATUS_FAILED, error=FAILED_JOB_MESSAGE, finished_at=timezone.now(),
+    ))
+
+
+def defer_job(job) -> bool:
+    """Put a claimed job back on the queue without counting the attempt"""
+    return bool(_owned(job).update(
+        status=VerificationJob.STATUS_QUEUED, started_at=None, attempts=job.attempts - 1,
+    ))
+
+
+def requeue_stale_jobs(timeout_seconds, max_attempts=3):
+    """Requeue jobs without a heartbeat for ``timeout_seconds``; give up after max_attempts.
+
+    Returns the number of jobs put back on the queue.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout_seconds)
+    stale = VerificationJob.objects.filter(
+        status=VerificationJob.STATUS_RUNNING, started_at__lt=cutoff
+    )
+    stale.filter(attempts__gte=max_attempts).update(
+        status=VerificationJob.STATUS_FAILED,
+        error='Worker did not finish the job.',
+        finished_at=timezone.now(),
+    )
+    return stale.filter(attempts__lt=max_attempts).update(
+        status=VerificationJob.STATUS_QUEUED, started_at=None
+    )
@@ -0,0 +1,207 @@
+"""
+Keyword and keyphrase extraction for trending topics.
+
+Articles are tokenized into unigrams and adjacent-word bigrams (never
+spanning a stopword), counted into a sparse document-term matrix with
+sublinear TF, and weighted by inverse document frequency from a corpus IDF
+table. A batch is scored in a single pass over one sparse matrix, so the
+same code serves a single verification inline and a backfill over the
+whole history.
+
+The IDF table is built by ``manage.py build_keyword_idf`` (from the training
+CSVs and/or verification history) and stored at KEYWORD_IDF_PATH. Without
+it the extractor falls back to the trained TF-IDF vectorizer's unigram IDF,
+and failing that to plain TF with stopword filtering.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+
+
+_TOKEN_RE = re.compile(r"[a-z][a-z'\-]*[a-z]")
+
+# Words that are frequent in headlines but never a topic on their own
+NEWS_STOP_WORDS = frozenset('''
+    according ago said says say saying told tells report reports reported reporting
+    breaking news latest update updates watch video photos read new just like
+    people year years week weeks month months day days today yesterday tomorrow
+    time times way thing things really going want wants make makes made
+    monday tuesday wednesday thursday friday saturday sunday
+    january february march april june july august september october november december
+    reuters featured image getty images
+    does did don't doesn't didn't it's that's there's i'm we're they're
+    mr mrs ms dr
+'''.split())
+
+STOP_WORDS = ENGLISH_STOP_WORDS | NEWS_STOP_WORDS
+
+MIN_TOKEN_LENGTH = 3
+
+
+def analyze(text):
+    """Unigrams and stopword-free bigrams of ``text``"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    keep = [len(token) >= MIN_TOKEN_LENGTH and token not in STOP_WORDS for token in tokens]
+
+    terms = [token for token, ok in zip(tokens, keep) if ok]
+    terms.extend(
+        f'{tokens[i]} {tokens[i + 1]}'
+        for i in range(len(tokens) - 1)
+        if keep[i] and keep[i + 1]
+    )
+    return terms
+
+
+def document_frequencies(texts, min_df=1):
+    """``({term: df}, n_docs)`` for an iterable of texts"""
+    texts = list(texts)
+    if not texts:
+        return {}, 0
+    vectorizer = CountVectorizer(analyzer=analyze, binary=True, min_df=min_df)
+    try:
+        matrix = vectorizer.fit_transform(texts)
+    except ValueError:  # every document was empty after stopword removal
+        return {}, len(texts)
+    df = np.asarray(matrix.sum(axis=0)).ravel()
+    return dict(zip(vectorizer.get_feature_names_out(), df.tolist())), len(texts)
+
+
+def save_idf_table(path, df_counts, n_docs):
+    """Persist document frequencies as a compressed ``.npz`` table"""
+    os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+    terms = np.array(list(df_counts), dtype=str)
+    df = np.fromiter(df_counts.values(), dtype=np.int64, count=len(df_counts))
+    np.savez_compressed(path, terms=terms, df=df, n_docs=np.int64(n_docs))
+
+
+class KeywordExtractor:
+    """TF-IDF keyphrase scorer over a precomputed corpus IDF table"""
+
+    def __init__(self, idf_path=None, title_weight=2.0):
+        self.idf_path = str(idf_path or getattr(settings, 'KEYWORD_IDF_PATH', ''))
+        self.title_weight = title_weight
+        self.idf = {}
+        self.default_idf = 1.0
+        self.idf_source = 'none'
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.idf_path and os.path.exists(self.idf_path):
+                with np.load(self.idf_path) as table:
+                    self._set_idf(table['terms'].tolist(), table['df'], int(table['n_docs']))
+                self.idf_source = 'table'
+            else:
+                self._load_vectorizer_idf()
+            self._loaded = True
+
+    def _set_idf(self, terms, df, n_docs):
+        # Smoothed IDF, as in TfidfVectorizer; unseen terms count as df=0
+        idf = np.log((1.0 + n_docs) / (1.0 + np.asarray(df, dtype=np.float64))) + 1.0
+        self.idf = dict(zip(terms, idf.tolist()))
+        self.default_idf = float(np.log(1.0 + n_docs) + 1.0)
+
+    def _load_vectorizer_idf(self):
+        from .ml_engine import get_local_engine
+
+        engine = get_local_engine()
+        # Hashed features have no vocabulary or idf to borrow
+        if not engine.available or not hasattr(engine.vectorizer, 'idf_'):
+            return
+        vectorizer = engine.vectorizer
+        self.idf = dict(zip(vectorizer.get_feature_names_out(), vectorizer.idf_.tolist()))
+        self.default_idf = float(vectorizer.idf_.max())
+        self.idf_source = 'vectorizer'
+
+    def score_matrix(self, titles, contents):
+        """Sparse (documents x terms) keyword scores and the term array.
+
+        Builds the count matrix directly rather than through CountVectorizer,
+        whose per-call parameter validation dominates the cost of small batches.
+        """
+        self._ensure_loaded()
+        vocabulary = {}
+        rows, columns, weights = [], [], []
+        for row, (title, content) in enumerate(zip(titles, contents)):
+            for text, weight in ((title, self.title_weight), (content, 1.0)):
+                ids = [vocabulary.setdefault(term, len(vocabulary)) for term in analyze(text or '')]
+                rows.append(np.full(len(ids), row, dtype=np.int32))
+                columns.append(np.asarray(ids, dtype=np.int32))
+                weights.append(np.full(len(ids), weight))
+        if not vocabulary:
+            return None, np.array([], dtype=str)
+
+        counts = sparse.csr_matrix(
+            (np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(len(titles), len(vocabulary)),
+        )
+        counts.sum_duplicates()
+
+        terms = np.array(list(vocabulary), dtype=object)
+        idf = np.fromiter(
+            (self.idf.get(term, self.default_idf) for term in terms),
+            dtype=np.float64, count=len(terms),
+        )
+        # Phrases are rarer than their words, so the IDF alone favours them
+        # only where the table knows them; give every bigram a small boost
+        idf *= np.fromiter((1.5 if ' ' in term else 1.0 for term in terms),
+                           dtype=np.float64, count=len(terms))
+
+        counts.data = (1.0 + np.log(counts.data)) * idf[counts.indices]
+        return counts, terms
+
+    def extract_many(self, titles, contents, top_k=3):
+        """Top keyphrases for each (title, content) pair"""
+        titles, contents = list(titles), list(contents)
+        scores, terms = self.score_matrix(titles, contents)
+        if scores is None:
+            return [[] for _ in titles]
+
+        keywords = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            indices, data = scores.indices[start:end], scores.data[start:end]
+            order = np.argsort(-data, kind='stable')[:top_k * 4]
+            keywords.append(_select(terms[indices[order]], top_k))
+        return keywords
+
+    def extract(self, title, content, top_k=3):
+        return self.extract_many([title], [content], top_k=top_k)[0]
+
+
+def _select(candidates, top_k):
+    """Best-first candidates, skipping any that share a word with one already taken"""
+    chosen, used = [], set()
+    for term in candidates:
+        words = set(term.split())
+        if words & used:
+            continue
+        chosen.append(str(term))
+        used |= words
+        if len(chosen) == top_k:
+            break
+    return chosen
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_keyword_extractor() -> KeywordExtractor:
+    """Return the process-wide keyword extractor"""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = KeywordExtractor()
+    return _extractor
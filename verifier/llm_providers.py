@@ -0,0 +1,387 @@
+"""
+Routing LLM requests across OpenAI-compatible providers.
+
+Each provider in LLM_PROVIDERS is any endpoint that serves
+``/chat/completions``. Its health comes from the shared HTTP client's
+per-host circuit breaker, its reliability from an EWMA error rate, and its
+latency from EWMA estimates of the mean, p50 and p95. Completion time and,
+for streams, time to first token are tracked separately.
+
+A request goes to a primary picked by weighted random choice: each
+configured weight is scaled by reliability and divided by the provider's
+typical latency. Providers with an open circuit go to the back of the
+queue. If the primary has not answered
+after the hedge delay (its own p95, clamped), the same request is fired at
+the next-best provider and the first good answer wins. A primary that fails
+fails over immediately. Tail latency is then bounded by roughly the hedge
+delay plus the fastest healthy provider's latency, rather than by the
+slowest provider.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .http_client import CircuitBreaker, get_http_client
+from .rate_limit import upstream_bucket
+
+
+class NoProviderError(Exception):
+    """Raised when no LLM provider is configured"""
+
+
+class ProviderError(Exception):
+    """A provider answered with an error status"""
+
+
+class LatencyTracker:
+    """EWMA latency mean plus streaming p50/p95 estimates.
+
+    The quantiles use stochastic approximation: each sample nudges the
+    estimate up by ``q`` or down by ``1 - q`` steps, so it settles where a
+    fraction ``q`` of samples fall below it. The step is scaled by the mean,
+    so the estimates adapt equally well to milliseconds or seconds.
+    """
+
+    QUANTILES = (0.5, 0.95)
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.samples = 0
+        self.mean: Optional[float] = None
+        self.quantiles: Dict[float, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.samples += 1
+            if self.mean is None:
+                self.mean = seconds
+                self.quantiles = {q: seconds for q in self.QUANTILES}
+                return
+            self.mean += self.alpha * (seconds - self.mean)
+            step = self.alpha * self.mean
+            for q, estimate in self.quantiles.items():
+                below = 1.0 if seconds <= estimate else 0.0
+                self.quantiles[q] = max(0.0, estimate + step * (q - below))
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.quantiles.get(0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.quantiles.get(0.95)
+
+
+class Provider:
+    """One OpenAI-compatible chat completions endpoint"""
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str = '',
+                 weight: float = 1.0, alpha: float = 0.1, bucket=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key or ''
+        self.weight = float(weight)
+        # Global token bucket pacing calls under the provider's quota (None: unlimited)
+        self.bucket = bucket
+        self.latency = LatencyTracker(alpha)
+        self.first_token = LatencyTracker(alpha)
+        self.error_rate = 0.0
+        self.alpha = alpha
+        self._counters = {'requests': 0, 'errors': 0, 'hedges': 0, 'wins': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def record_success(self, seconds: float, stream: bool = False) -> None:
+        (self.first_token if stream else self.latency).observe(seconds)
+        with self._lock:
+            self.error_rate -= self.alpha * self.error_rate
+
+    def record_error(self) -> None:
+        with self._lock:
+            self._counters['errors'] += 1
+            self.error_rate += self.alpha * (1.0 - self.error_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update(
+            name=self.name, model=self.model, weight=self.weight,
+            error_rate=round(self.error_rate, 3),
+            mean=self.latency.mean, p50=self.latency.p50, p95=self.latency.p95,
+            first_token_p50=self.first_token.p50, first_token_p95=self.first_token.p95,
+            rate_limit=self.bucket.stats() if self.bucket else None,
+        )
+        return counters
+
+
+class ProviderRouter:
+    """Weighted, latency-aware routing with hedging and failover"""
+
+    # Assumed latency for providers without samples yet, so they still get traffic
+    DEFAULT_LATENCY = 1.0
+    # Share of its weight a provider keeps however often it fails, so it can recover
+    MIN_RELIABILITY = 0.05
+
+    def __init__(self, providers: List[Provider], http_client=None, hedge_enabled: bool = True,
+                 hedge_delay: Optional[float] = None, hedge_min_delay: float = 0.25,
+                 hedge_max_delay: float = 5.0, max_workers: int = 32, max_wait: float = 5.0):
+        self.providers = providers
+        self.http_client = http_client or get_http_client()
+        self.hedge_enabled = hedge_enabled and len(providers) > 1
+        self.hedge_delay_override = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+        self.max_wait = max_wait
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-router')
+
+    @property
+    def model_label(self) -> str:
+        """The models behind this router, for cache keys"""
+        return '+'.join(sorted({provider.model for provider in self.providers})) or 'none'
+
+    def healthy(self, provider: Provider) -> bool:
+        breaker = self.http_client.breaker_for(provider.url)
+        if breaker.state == CircuitBreaker.CLOSED:
+            return True
+        # An open circuit is worth routing to again once its probe is due
+        return (breaker.state == CircuitBreaker.OPEN
+                and time.monotonic() - breaker.opened_at >= breaker.reset_timeout)
+
+    def ranked(self, stream: bool = False) -> List[Provider]:
+        """Providers in the order to try them: weighted primary, then by p95"""
+        healthy = [p for p in self.providers if self.healthy(p)]
+        unhealthy = [p for p in self.providers if p not in healthy]
+        if not healthy:
+            return unhealthy
+
+        def tracker(provider):
+            return provider.first_token if stream else provider.latency
+
+        weights = [
+            p.weight * max(1.0 - p.error_rate, self.MIN_RELIABILITY)
+            / max(tracker(p).p50 or self.DEFAULT_LATENCY, 1e-3)
+            for p in healthy
+        ]
+        primary = random.choices(healthy, weights=weights)[0] if sum(weights) > 0 else healthy[0]
+        rest = sorted((p for p in healthy if p is not primary),
+                      key=lambda p: tracker(p).p95 or self.DEFAULT_LATENCY)
+        return [primary] + rest + unhealthy
+
+    def hedge_delay(self, provider: Provider, stream: bool = False) -> float:
+        if self.hedge_delay_override is not None:
+            return self.hedge_delay_override
+        p95 = (provider.first_token if stream else provider.latency).p95
+        if p95 is None:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, p95))
+
+    def complete(self, build_payload: Callable[[Provider], Dict[str, Any]]) -> Tuple[Provider, Dict[str, Any]]:
+        """Chat completion JSON from the first provider to answer well"""
+        return self._race(build_payload, stream=False)
+
+    def stream(self, build_payload: Callable[[Provider], Dict[str, Any]]):
+        """``(provider, response, lines)`` for the first stream to produce data.
+
+        ``lines`` iterates the SSE lines, starting with the first data line
+        that was read to decide the race; close ``response`` when done.
+        """
+        provider, (response, lines) = self._race(build_payload, stream=True)
+        return provider, response, lines
+
+    def _race(self, build_payload, stream):
+        queue = self.ranked(stream)
+        if not queue:
+            raise NoProviderError('No LLM provider is configured')
+
+        pending = {}
+        errors = []
+        hedged = False
+
+        def launch(hedge=False):
+            # A hedge is only worth sending if quota is free right now
+            provider = self._admit(queue, wait=not hedge)
+            if provider is None:
+                return
+            provider.count('requests')
+            if hedge:
+                provider.count('hedges')
+            future = self.executor.submit(self._attempt, provider, build_payload(provider), stream)
+            pending[future] = provider
+
+        launch()
+        primary = next(iter(pending.values()))
+        while pending:
+            timeout = None
+            if self.hedge_enabled and queue and not hedged:
+                timeout = self.hedge_delay(primary, stream)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                launch(hedge=True)
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                provider.count('wins')
+                for loser in pending:
+                    loser.add_done_callback(_discard)
+                return provider, result
+            if not pending and queue:
+                launch()  # fail over to the next provider
+
+        raise ProviderError('All LLM providers failed: ' + '; '.join(errors))
+
+    def _admit(self, queue: List[Provider], wait: bool) -> Optional[Provider]:
+        """Remove and return the first queued provider with upstream quota free.
+
+        When every bucket is empty and ``wait`` is set, queue on the provider
+        that frees up first, for at most ``max_wait`` seconds; RateLimited
+        is raised beyond that.
+        """
+        retry_after = {}
+        for provider in queue:
+            if provider.bucket is None:
+                queue.remove(provider)
+                return provider
+            granted, delay = provider.bucket.reserve()
+            if granted:
+                queue.remove(provider)
+                return provider
+            retry_after[provider.name] = delay
+        if not wait or not queue:
+            return None
+        provider = min(queue, key=lambda p: retry_after[p.name])
+        provider.bucket.acquire(max_wait=self.max_wait)
+        queue.remove(provider)
+        return provider
+
+    def _attempt(self, provider: Provider, payload: Dict[str, Any], stream: bool):
+        start = time.monotonic()
+        try:
+            response = self.http_client.post(
+                provider.url, headers=provider.headers(), json=payload, stream=stream,
+            )
+        except Exception:
+            provider.record_error()
+            raise
+        if response.status_code != 200:
+            provider.record_error()
+            detail = response.text[:200]
+            response.close()
+            raise ProviderError(f"API call failed: {response.status_code} - {detail}")
+        if not stream:
+            try:
+                body = response.json()
+            except ValueError:
+                # A 200 with an HTML error page or a truncated body is still a failure
+                provider.record_error()
+                detail = response.text[:200]
+                response.close()
+                raise ProviderError(f"API call returned invalid JSON: {detail}")
+            provider.record_success(time.monotonic() - start)
+            return body
+
+        # SSE is always UTF-8; without a charset requests would assume Latin-1
+        response.encoding = 'utf-8'
+        # A stream has won once it produces its first data line
+        lines = response.iter_lines(decode_unicode=True)
+        try:
+            first = next(line for line in lines if line and not line.startswith(':'))
+        except StopIteration:
+            first = ''
+        except Exception:
+            response.close()
+            provider.record_error()
+            raise
+        provider.record_success(time.monotonic() - start, stream=True)
+        return response, chain([first], lines)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [dict(provider.stats(), healthy=self.healthy(provider)) for provider in self.providers]
+
+
+def _discard(future):
+    """Release whatever a losing hedged attempt produced"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if isinstance(result, tuple):
+        result[0].close()
+
+
+def providers_from_settings() -> List[Provider]:
+    """Providers from LLM_PROVIDERS, or the single legacy endpoint"""
+    configured = getattr(settings, 'LLM_PROVIDERS', None) or []
+    default_model = getattr(settings, 'LLM_MODEL', 'llama3-70b-8192')
+    alpha = getattr(settings, 'LLM_LATENCY_EWMA_ALPHA', 0.1)
+    default_rpm = getattr(settings, 'LLM_UPSTREAM_RATE_PER_MINUTE', None)
+    providers = []
+    for index, entry in enumerate(configured):
+        api_key = entry.get('api_key') or os.getenv(entry.get('api_key_env', ''), '')
+        name = entry.get('name') or f'provider-{index + 1}'
+        providers.append(Provider(
+            name=name,
+            base_url=entry['base_url'],
+            model=entry.get('model') or default_model,
+            api_key=api_key,
+            weight=entry.get('weight', 1.0),
+            alpha=alpha,
+            bucket=upstream_bucket(name, entry.get('rpm', default_rpm)),
+        ))
+    if not providers and getattr(settings, 'NEWS_VERIFICATION_API_KEY', None):
+        providers.append(Provider(
+            name='default',
+            base_url=getattr(settings, 'LLM_API_BASE_URL', 'https://api.groq.com/openai/v1'),
+            model=default_model,
+            api_key=settings.NEWS_VERIFICATION_API_KEY,
+            alpha=alpha,
+            bucket=upstream_bucket('default', default_rpm),
+        ))
+    return providers
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_provider_router() -> ProviderRouter:
+    """Return the process-wide provider router configured from settings"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ProviderRouter(
+                    providers_from_settings(),
+                    hedge_enabled=getattr(settings, 'LLM_HEDGE_ENABLED', True),
+                    hedge_delay=getattr(settings, 'LLM_HEDGE_DELAY', None),
+                    hedge_min_delay=getattr(settings, 'LLM_HEDGE_MIN_DELAY', 0.25),
+                    hedge_max_delay=getattr(settings, 'LLM_HEDGE_MAX_DELAY', 5.0),
+                    max_workers=getattr(settings, 'LLM_ROUTER_MAX_WORKERS', 32),
+                    max_wait=getattr(settings, 'LLM_UPSTREAM_MAX_WAIT', 5.0),
+                )
+    return _router
@@ -0,0 +1,69 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from verifier.models import TrendingTopic, TrendingTopicBucket, VerificationResult
+from verifier.trending import current_hour, extract_topics_many, refresh_scores, write_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute trending-topic counts from stored verification history using the '
+        'keyword extractor. Replaces the existing counts unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Articles per extraction pass')
+        parser.add_argument('--keep', action='store_true',
+                            help='Add to the existing counts instead of replacing them')
+
+    def handle(self, *args, **options):
+        window_start = current_hour() - timedelta(
+            hours=getattr(settings, 'TRENDING_WINDOW_HOURS', 48)
+        )
+        older = Counter()
+        hourly = defaultdict(Counter)
+
+        rows = VerificationResult.objects.values_list(
+            'category', 'title', 'content', 'created_at'
+        ).order_by()
+        batch, processed = [], 0
+        for row in rows.iterator(chunk_size=options['batch_size']):
+            batch.append(row)
+            if len(batch) == options['batch_size']:
+                processed += self._count(batch, older, hourly, window_start)
+                batch = []
+                self.stdout.write(f'  {processed} articles')
+        if batch:
+            processed += self._count(batch, older, hourly, window_start)
+
+        with transaction.atomic():
+            if not options['keep']:
+                TrendingTopicBucket.objects.all().delete()
+                TrendingTopic.objects.all().delete()
+            # Rows older than the trending window only feed the all-time totals
+            write_counts(older, buckets=False)
+            for hour, counts in hourly.items():
+                write_counts(counts, now=hour)
+        refresh_scores()
+
+        topics = set(older).union(*hourly.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Counted {len(topics)} topics from {processed} articles.'
+        ))
+
+    def _count(self, rows, older, hourly, window_start):
+        topics = extract_topics_many(
+            (category, title, content) for category, title, content, _ in rows
+        )
+        for (_, _, _, created_at), article_topics in zip(rows, topics):
+            if created_at >= window_start:
+                hourly[current_hour(created_at)].update(article_topics)
+            else:
+                older.update(article_topics)
+        return len(rows)
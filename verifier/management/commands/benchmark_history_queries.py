@@ -0,0 +1,164 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from dashboard.stats import get_user_stats
+from verifier.models import VerificationResult, TrendingTopic
+
+
+BENCH_USER_PREFIX = 'bench_history_'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic verification history and compare query plans and timings for the '
+        'history and dashboard queries with and without the composite indexes. '
+        'Writes to the configured database: run it against a scratch copy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Rows to seed')
+        parser.add_argument('--users', type=int, default=20, help='Users to spread rows across')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+
+    def handle(self, *args, **options):
+        users = self._seed(options['rows'], options['users'])
+        user = users[0]
+
+        queries = [
+            ('history page 1', lambda: list(VerificationResult.objects.filter(user=user)[:10])),
+            ('history page 500', lambda: list(VerificationResult.objects.filter(user=user)[4990:5000])),
+            ('history by prediction', lambda: list(
+                VerificationResult.objects.filter(user=user, prediction='Fake')[:10])),
+            ('history by category', lambda: list(
+                VerificationResult.objects.filter(user=user, category='Health')[:10])),
+            ('bookmarked count', lambda: VerificationResult.objects.filter(
+                user=user, is_bookmarked=True).count()),
+            ('recent week', lambda: VerificationResult.objects.filter(
+                user=user, created_at__gte=timezone.now() - timedelta(days=14)).count()),
+            ('dashboard stats', lambda: get_user_stats(user)),
+            ('trending top 10', lambda: list(TrendingTopic.objects.all()[:10])),
+        ]
+        explained = {
+            'history page 1': VerificationResult.objects.filter(user=user)[:10],
+            'history by prediction': VerificationResult.objects.filter(user=user, prediction='Fake')[:10],
+            'bookmarked count': VerificationResult.objects.filter(user=user, is_bookmarked=True).order_by(),
+            'trending top 10': TrendingTopic.objects.all()[:10],
+        }
+
+        try:
+            self._set_indexes(enabled=False)
+            before = self._run(queries, explained, options['repeat'], 'WITHOUT composite indexes')
+            self._set_indexes(enabled=True)
+            after = self._run(queries, explained, options['repeat'], 'WITH composite indexes')
+        finally:
+            self._set_indexes(enabled=True)
+            if not options['keep']:
+                self._cleanup(users)
+
+        self.stdout.write('\n%-24s %12s %12s %9s' % ('query', 'before ms', 'after ms', 'speedup'))
+        for name, _ in queries:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write('%-24s %12.3f %12.3f %8.1fx' % (name, before[name], after[name], speedup))
+
+    def _seed(self, rows, user_count):
+        users = [
+            User.objects.get_or_create(username=f'{BENCH_USER_PREFIX}{i}')[0]
+            for i in range(user_count)
+        ]
+        existing = VerificationResult.objects.filter(user__in=users).count()
+        if existing >= rows:
+            self.stdout.write(f'Reusing {existing} seeded rows')
+            return users
+
+        self.stdout.write(f'Seeding {rows - existing} rows across {user_count} users...')
+        predictions = [value for value, _ in VerificationResult.PREDICTION_CHOICES]
+        categories = [value for value, _ in VerificationResult.CATEGORY_CHOICES]
+        now = timezone.now()
+        rng = random.Random(42)
+
+        # Spread rows over two years; auto_now_add would stamp them all "now"
+        created_at = VerificationResult._meta.get_field('created_at')
+        created_at.auto_now_add = False
+        try:
+            remaining = rows - existing
+            while remaining:
+                batch = min(remaining, 10_000)
+                VerificationResult.objects.bulk_create([
+                    VerificationResult(
+                        user=rng.choice(users),
+                        title=f'Benchmark article {rng.random():.8f}',
+                        content='Lorem ipsum dolor sit amet ' * 20,
+                        prediction=rng.choice(predictions),
+                        confidence=rng.random(),
+                        category=rng.choice(categories),
+                        is_bookmarked=rng.random() < 0.05,
+                        created_at=now - timedelta(seconds=rng.randint(0, 2 * 365 * 86400)),
+                    )
+                    for _ in range(batch)
+                ], batch_size=1000)
+                remaining -= batch
+        finally:
+            created_at.auto_now_add = True
+
+        self._analyze()
+        return users
+
+    def _index_models(self):
+        return [
+            (model, index)
+            for model in (VerificationResult, TrendingTopic)
+            for index in model._meta.indexes
+        ]
+
+    def _set_indexes(self, enabled):
+        with connection.cursor() as cursor:
+            existing = {
+                name
+                for model in (VerificationResult, TrendingTopic)
+                for name in connection.introspection.get_constraints(cursor, model._meta.db_table)
+            }
+        with connection.schema_editor() as editor:
+            for model, index in self._index_models():
+                if enabled and index.name not in existing:
+                    editor.add_index(model, index)
+                elif not enabled and index.name in existing:
+                    editor.remove_index(model, index)
+        self._analyze()
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _run(self, queries, explained, repeat, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label} =='))
+        for name, queryset in explained.items():
+            self.stdout.write(f'-- {name}\n{queryset.explain()}')
+
+        timings = {}
+        for name, query in queries:
+            query()  # warm the page cache
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(samples)
+        return timings
+
+    def _cleanup(self, users):
+        # Raw delete: collecting a million rows for CASCADE would exhaust memory
+        ids = [user.id for user in users]
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {VerificationResult._meta.db_table} WHERE user_id IN ({placeholders})', ids
+            )
+        User.objects.filter(id__in=ids).delete()
@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from verifier.keywords import get_keyword_extractor
+from verifier.models import VerificationResult
+
+
+SYNTHETIC_WORDS = (
+    'election senate president minister climate change vaccine health hospital economy '
+    'inflation market stocks bitcoin cryptocurrency artificial intelligence technology '
+    'company court ruling police investigation border immigration football championship '
+    'space launch satellite university students protest government budget energy oil '
+    'the a of and to in that for on with as was is by at from it his her their'
+).split()
+
+
+def legacy_topics(category, title, content):
+    """The original first-words heuristic, for comparison"""
+    keywords = title.split() if title else []
+    if content:
+        keywords.extend([w for w in content.lower().split() if len(w) > 4 and w.isalpha()][:5])
+    return [category or 'Other'] + [k.title() for k in keywords[:2] if len(k) > 4]
+
+
+class Command(BaseCommand):
+    help = 'Measure per-article keyword extraction cost, inline and batched'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=2000, help='Articles to extract from')
+        parser.add_argument('--csv', default=None, help='Read articles from a training CSV')
+        parser.add_argument('--batch-sizes', default='1,32,256,2000',
+                            help='Comma-separated batch sizes to time')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+        parser.add_argument('--show', type=int, default=5, help='Print keywords for N articles')
+
+    def handle(self, *args, **options):
+        articles = self._articles(options['articles'], options['csv'])
+        titles = [title for title, _ in articles]
+        contents = [content for _, content in articles]
+        extractor = get_keyword_extractor()
+        extractor.extract('warm up', 'load the idf table')
+        self.stdout.write(
+            f'{len(articles)} articles, IDF source: {extractor.idf_source} '
+            f'({len(extractor.idf)} terms)'
+        )
+
+        results = [('legacy heuristic', self._time(
+            lambda: [legacy_topics('Other', t, c) for t, c in articles], len(articles),
+            options['repeat'],
+        ))]
+        for size in [int(s) for s in options['batch_sizes'].split(',') if s.strip()]:
+            def run(size=size):
+                for start in range(0, len(articles), size):
+                    extractor.extract_many(titles[start:start + size],
+                                           contents[start:start + size])
+            label = 'inline (1 article)' if size == 1 else f'batch of {size}'
+            results.append((label, self._time(run, len(articles), options['repeat'])))
+
+        self.stdout.write('\n%-22s %14s' % ('mode', 'us / article'))
+        for label, micros in results:
+            self.stdout.write('%-22s %14.1f' % (label, micros))
+
+        shown = extractor.extract_many(titles[:options['show']], contents[:options['show']])
+        for (title, content), keywords in zip(articles, shown):
+            self.stdout.write(f'\n{title[:70]!r}\n  legacy:   {legacy_topics("", title, content)[1:]}'
+                              f'\n  keywords: {keywords}')
+
+    def _time(self, func, count, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1e6 / max(count, 1))
+        return statistics.median(samples)
+
+    def _articles(self, count, csv_path):
+        if csv_path:
+            import pandas as pd
+
+            frame = pd.read_csv(csv_path, usecols=['title', 'text'], nrows=count, dtype=str)
+            frame = frame.fillna('')
+            return list(zip(frame['title'], frame['text']))
+
+        articles = list(
+            VerificationResult.objects.values_list('title', 'content').order_by('-id')[:count]
+        )
+        rng = random.Random(42)
+        while len(articles) < count:
+            words = [rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(150, 600))]
+            articles.append((' '.join(words[:10]).capitalize(), ' '.join(words)))
+        return articles
@@ -0,0 +1,97 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from verifier.http_client import PooledHTTPClient
+from verifier.llm_providers import Provider, ProviderRouter
+from verifier.management.commands.run_fake_llm_server import DEFAULT_REPLY, make_handler
+from verifier.streaming import iter_completion_deltas
+
+
+class Command(BaseCommand):
+    help = (
+        'Start two local stub providers with injected delays and compare request '
+        'latency with and without hedged routing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--fast-delay', type=float, default=0.08,
+                            help='Usual latency of provider "fast"')
+        parser.add_argument('--slow-rate', type=float, default=0.1,
+                            help='Fraction of "fast" requests that stall')
+        parser.add_argument('--slow-delay', type=float, default=2.0, help='Length of a stall')
+        parser.add_argument('--steady-delay', type=float, default=0.25,
+                            help='Latency of provider "steady"')
+        parser.add_argument('--hedge-delay', type=float, default=None,
+                            help='Fixed hedge delay (default: adaptive p95)')
+        parser.add_argument('--stream', action='store_true', help='Race streamed completions')
+
+    def handle(self, *args, **options):
+        reply = json.dumps(DEFAULT_REPLY)
+        servers = [
+            self._serve(make_handler(reply, options['fast_delay'], 0.0, len(reply),
+                                     options['slow_rate'], options['slow_delay'])),
+            self._serve(make_handler(reply, options['steady_delay'], 0.0, len(reply))),
+        ]
+        try:
+            for label, hedge in (('single provider', None), ('weighted, no hedging', False),
+                                 ('weighted + hedging', True)):
+                self._run(label, hedge, servers, options)
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+    def _serve(self, handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _run(self, label, hedge, servers, options):
+        client = PooledHTTPClient(pool_size=32, max_retries=0)
+        providers = [
+            Provider(name, f'http://127.0.0.1:{server.server_address[1]}/v1', 'stub')
+            for name, server in zip(('fast', 'steady'), servers)
+        ]
+        if hedge is None:
+            providers = providers[:1]
+        router = ProviderRouter(providers, http_client=client, hedge_enabled=bool(hedge),
+                                hedge_delay=options['hedge_delay'])
+        payload = {'messages': [{'role': 'user', 'content': 'benchmark'}], 'stream': options['stream']}
+
+        def one(_):
+            start = time.perf_counter()
+            if options['stream']:
+                _, response, lines = router.stream(lambda provider: dict(payload, model=provider.model))
+                with response:
+                    ''.join(iter_completion_deltas(lines))
+            else:
+                router.complete(lambda provider: dict(payload, model=provider.model))
+            return time.perf_counter() - start
+
+        # Warm the latency estimates before measuring
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(one, range(20)))
+            samples = np.array(list(pool.map(one, range(options['requests'])))) * 1000
+
+        self.stdout.write(
+            f"\n{label}: p50 {np.percentile(samples, 50):.0f} ms, "
+            f"p95 {np.percentile(samples, 95):.0f} ms, p99 {np.percentile(samples, 99):.0f} ms, "
+            f"max {samples.max():.0f} ms, mean {statistics.fmean(samples):.0f} ms"
+        )
+        for stats in router.stats():
+            p95 = stats['first_token_p95' if options['stream'] else 'p95']
+            self.stdout.write(
+                f"  {stats['name']:<7} requests {stats['requests']:>4}  wins {stats['wins']:>4}  "
+                f"hedges {stats['hedges']:>4}  errors {stats['errors']:>3}  "
+                f"p95 estimate {p95 * 1000 if p95 is not None else 0:.0f} ms"
+            )
+        router.executor.shutdown(wait=False)
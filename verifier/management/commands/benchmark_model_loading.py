@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import joblib
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.ml_engine import HASHING_VECTORIZER_FILE, LOGISTIC_FILE, TREE_FILE, load_vectorizer
+from verifier.model_arrays import export_arrays
+
+
+SAMPLE = (
+    'The government said on Tuesday that the new policy would take effect next month, '
+    'and officials confirmed the figures were based on a survey of hospitals.'
+)
+
+
+def _memory_kb():
+    """Rss, Pss and private memory of this process, from /proc (Linux)"""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as handle:
+            for line in handle:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+    except OSError:
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss': rss, 'pss': rss, 'private': rss}
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def _worker(model_dir, loaded, measured, results):
+    import django
+
+    django.setup()
+    from verifier.ml_engine import LocalModelEngine
+
+    before = _memory_kb()
+    start = time.perf_counter()
+    engine = LocalModelEngine(model_dir=model_dir)
+    result = engine.predict(SAMPLE)
+    cold_start = time.perf_counter() - start
+    # Measure only once every worker has loaded, so shared pages are split
+    loaded.wait()
+    after = _memory_kb()
+    results.put({
+        'cold_start': cold_start,
+        'error': result.get('error'),
+        **{key: after[key] - before[key] for key in after},
+    })
+    measured.wait()
+
+
+class Command(BaseCommand):
+    help = (
+        'Start worker processes that load the local models from pickles and from '
+        'memory-mapped arrays, and compare cold start and per-worker memory'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=None,
+                            help='Pickled model directory or bundle (default: ML_MODEL_DIR)')
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        source = str(options['source'] or settings.ML_MODEL_DIR)
+        try:
+            vectorizer = load_vectorizer(source)
+            logistic_model = joblib.load(os.path.join(source, LOGISTIC_FILE))
+            tree_model = joblib.load(os.path.join(source, TREE_FILE))
+        except Exception as e:
+            raise CommandError(f'Cannot load pickled models from {source}: {e}')
+
+        with tempfile.TemporaryDirectory(prefix='model-arrays-') as arrays_dir:
+            export_arrays(vectorizer, logistic_model, tree_model, arrays_dir)
+            if os.path.exists(os.path.join(source, HASHING_VECTORIZER_FILE)):
+                shutil.copy(os.path.join(source, HASHING_VECTORIZER_FILE), arrays_dir)
+
+            self.stdout.write(f'{options["workers"]} workers per format; memory is what loading '
+                              f'the models and one prediction added to each worker\n')
+            self.stdout.write('%-8s %14s %14s %11s %11s %13s' % (
+                'format', 'cold start p50', 'cold start max', 'RSS / worker', 'PSS / worker',
+                'private / wkr',
+            ))
+            for label, model_dir in (('pickle', source), ('arrays', arrays_dir)):
+                self._run(label, model_dir, options['workers'])
+
+    def _run(self, label, model_dir, workers):
+        context = multiprocessing.get_context('spawn')
+        loaded = context.Barrier(workers)
+        measured = context.Event()
+        results = context.Queue()
+        processes = [
+            context.Process(target=_worker, args=(model_dir, loaded, measured, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        samples = [results.get(timeout=300) for _ in processes]
+        measured.set()
+        for process in processes:
+            process.join()
+
+        errors = {sample['error'] for sample in samples if sample['error']}
+        if errors:
+            raise CommandError(f'{label}: {errors.pop()}')
+        cold = [sample['cold_start'] * 1000 for sample in samples]
+        self.stdout.write('%-8s %11.0f ms %11.0f ms %8.1f MB %8.1f MB %10.1f MB' % (
+            label, statistics.median(cold), max(cold),
+            statistics.fmean(sample['rss'] for sample in samples) / 1024,
+            statistics.fmean(sample['pss'] for sample in samples) / 1024,
+            statistics.fmean(sample['private'] for sample in samples) / 1024,
+        ))
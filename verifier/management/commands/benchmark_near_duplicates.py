@@ -0,0 +1,129 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from verifier.models import ContentSignature, SignatureBand, VerificationResult
+from verifier.near_duplicates import (
+    BANDS, NUM_PERM, find_near_duplicate, index_signatures, minhash,
+)
+
+
+BENCH_USERNAME = 'bench_near_duplicates'
+WORDS = (
+    'government election minister president senate vote policy economy market bank '
+    'virus vaccine hospital doctors climate storm flood wildfire police court judge '
+    'company shares profit launch rocket satellite team match season coach player '
+    'report claims officials sources statement video photo viral post shared'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic signatures and time near-duplicate lookups. '
+        'Writes to the configured database: run it against a scratch copy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=1_000_000, help='Signatures to seed')
+        parser.add_argument('--lookups', type=int, default=200, help='Timed lookups')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows afterwards')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        rng = random.Random(7)
+        try:
+            self._seed(user, options['docs'], rng)
+            originals = [self._article(rng) for _ in range(options['lookups'])]
+            index_signatures(
+                (result, '', text)
+                for result, text in zip(self._results(user, originals), originals)
+            )
+
+            near = [self._edit(text, rng) for text in originals]
+            unrelated = [self._article(rng) for _ in originals]
+            for label, texts in (('near-duplicate', near), ('unrelated', unrelated)):
+                signing, lookups, hits = [], [], 0
+                for text in texts:
+                    start = time.perf_counter()
+                    minhash(text)
+                    signing.append((time.perf_counter() - start) * 1000)
+                    start = time.perf_counter()
+                    hits += find_near_duplicate(text) is not None
+                    lookups.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(
+                    f'{label:15} signature {statistics.median(signing):.3f} ms, '
+                    f'signature + lookup {statistics.median(lookups):.3f} ms (median), '
+                    f'{hits}/{len(texts)} matched'
+                )
+            self.stdout.write(
+                f'Index: {ContentSignature.objects.count()} signatures, '
+                f'{SignatureBand.objects.count()} band rows ({connection.vendor})'
+            )
+        finally:
+            if not options['keep']:
+                self._cleanup(user)
+
+    def _article(self, rng):
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(80, 400)))
+
+    def _edit(self, text, rng):
+        """A re-paste: tracking link, changed whitespace and a few edited words"""
+        words = text.split()
+        for _ in range(max(1, len(words) // 100)):
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+        return 'BREAKING:  ' + '\n'.join(words) + ' https://example.com/story?utm_source=share'
+
+    def _results(self, user, texts):
+        return VerificationResult.objects.bulk_create([
+            VerificationResult(user=user, title='', content=text, prediction='Fake', confidence=0.9)
+            for text in texts
+        ])
+
+    def _seed(self, user, docs, rng):
+        existing = ContentSignature.objects.filter(result__user=user).count()
+        if existing >= docs:
+            self.stdout.write(f'Reusing {existing} seeded signatures')
+            return
+        self.stdout.write(f'Seeding {docs - existing} signatures...')
+        now = timezone.now()
+        remaining = docs - existing
+        while remaining:
+            batch = min(remaining, 10_000)
+            with transaction.atomic():
+                results = self._results(user, [''] * batch)
+                # Random signatures: the lookup cost depends on index size, not on content
+                ContentSignature.objects.bulk_create([
+                    ContentSignature(
+                        result_id=result.id,
+                        signature=rng.randbytes(NUM_PERM * 4),
+                        created_at=now,
+                    )
+                    for result in results
+                ], batch_size=1000)
+                SignatureBand.objects.bulk_create([
+                    SignatureBand(signature_id=result.id, key=rng.getrandbits(63))
+                    for result in results for _ in range(BANDS)
+                ], batch_size=10_000)
+            remaining -= batch
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _cleanup(self, user):
+        # Raw deletes: collecting millions of rows for CASCADE would exhaust memory
+        ids = f'SELECT id FROM {VerificationResult._meta.db_table} WHERE user_id = %s'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SignatureBand._meta.db_table} WHERE signature_id IN ({ids})', [user.id]
+            )
+            cursor.execute(
+                f'DELETE FROM {ContentSignature._meta.db_table} WHERE result_id IN ({ids})', [user.id]
+            )
+            cursor.execute(
+                f'DELETE FROM {VerificationResult._meta.db_table} WHERE user_id = %s', [user.id]
+            )
+        user.delete()
@@ -0,0 +1,71 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from verifier.prompt_budget import STRATEGIES, article_budget, estimate_tokens, fit_to_budget
+
+
+WORDS = (
+    'the government said on tuesday that the new policy would take effect next month '
+    'officials confirmed the figures were based on a survey of hospitals across the country '
+    'critics argued that the data had been selectively reported and called for an inquiry '
+    'according to the ministry spending on energy subsidies rose sharply during the winter'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Time token estimation and article shortening for long inputs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', default='500,2000,10000,50000',
+                            help='Comma-separated article lengths in words')
+        parser.add_argument('--budget', type=int, default=None,
+                            help='Token budget (default: the configured article budget)')
+        parser.add_argument('--csv', default=None,
+                            help='Build articles by concatenating texts from a training CSV')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+        parser.add_argument('--show', action='store_true', help='Print the shortened text')
+
+    def handle(self, *args, **options):
+        budget = options['budget'] or article_budget(overhead_tokens=250)
+        source = self._source_words(options['csv'])
+        self.stdout.write(f'Budget: {budget} tokens')
+        self.stdout.write('\n%8s %9s %-14s %9s %11s' % ('words', 'tokens', 'strategy', 'kept', 'ms'))
+
+        for count in [int(n) for n in options['words'].split(',') if n.strip()]:
+            article = self._article(source, count)
+            tokens = estimate_tokens(article)
+            for strategy in STRATEGIES:
+                samples = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    shortened, info = fit_to_budget(article, budget, strategy)
+                    samples.append((time.perf_counter() - start) * 1000)
+                self.stdout.write('%8d %9d %-14s %9d %11.2f' % (
+                    count, tokens, strategy, info['tokens'], statistics.median(samples),
+                ))
+                if options['show'] and info['truncated']:
+                    self.stdout.write(f'\n{shortened}\n')
+
+    def _source_words(self, csv_path):
+        if not csv_path:
+            return None
+        import pandas as pd
+
+        frame = pd.read_csv(csv_path, usecols=['text'], nrows=5000, dtype=str).fillna('')
+        return ' '.join(frame['text']).split()
+
+    def _article(self, source, count):
+        if source:
+            return ' '.join(source[:count])
+        rng = random.Random(count)
+        sentences, total = [], 0
+        while total < count:
+            length = rng.randint(8, 30)
+            words = [rng.choice(WORDS) for _ in range(length)]
+            sentences.append(' '.join(words).capitalize() + '.')
+            total += length
+        # Paragraphs of about five sentences
+        return '\n\n'.join(' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
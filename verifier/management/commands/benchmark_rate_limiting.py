@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from verifier.http_client import PooledHTTPClient
+from verifier.llm_providers import Provider, ProviderError, ProviderRouter
+from verifier.management.commands.run_fake_llm_server import DEFAULT_REPLY, make_handler
+from verifier.rate_limit import MemoryBucketStore, RateLimited, TokenBucket
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a burst from one heavy user alongside steady light users against a '
+        'quota-limited stub provider, with and without admission control'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quota-rpm', type=int, default=240, help='Stub provider quota')
+        parser.add_argument('--latency', type=float, default=0.2, help='Stub provider latency')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of traffic')
+        parser.add_argument('--heavy-rps', type=float, default=40.0,
+                            help='Requests per second from the heavy user')
+        parser.add_argument('--light-users', type=int, default=4)
+        parser.add_argument('--light-rps', type=float, default=0.5,
+                            help='Requests per second from each light user')
+        parser.add_argument('--user-rpm', type=int, default=30, help='Per-user bucket rate')
+        parser.add_argument('--user-burst', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for label, limited in (('no admission control', False), ('token buckets', True)):
+            server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(
+                json.dumps(DEFAULT_REPLY), options['latency'], 0.0, 10 ** 6,
+                quota_per_minute=options['quota_rpm'],
+            ))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                self._run(label, limited, server, options)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    def _run(self, label, limited, server, options):
+        store = MemoryBucketStore()
+        upstream = None
+        user_bucket = None
+        if limited:
+            # Stay 10% under the provider's quota
+            upstream = TokenBucket('upstream:stub', options['quota_rpm'] * 0.9 / 60.0, 5, store)
+            user_bucket = TokenBucket('user', options['user_rpm'] / 60.0,
+                                      options['user_burst'], store)
+        provider = Provider('stub', f'http://127.0.0.1:{server.server_address[1]}/v1', 'stub',
+                            bucket=upstream)
+        router = ProviderRouter([provider], http_client=PooledHTTPClient(pool_size=64, max_retries=0),
+                                max_workers=64, max_wait=5.0)
+        payload = {'messages': [{'role': 'user', 'content': 'benchmark'}]}
+
+        outcomes = {}
+        lock = threading.Lock()
+
+        def request(user):
+            start = time.perf_counter()
+            try:
+                if user_bucket is not None:
+                    user_bucket.acquire(user)
+                router.complete(lambda p: dict(payload, model=p.model))
+                outcome = 'ok'
+            except RateLimited:
+                outcome = 'refused (429 + Retry-After)'
+            except ProviderError:
+                outcome = 'upstream error'
+            with lock:
+                outcomes.setdefault(user, []).append((outcome, time.perf_counter() - start))
+
+        schedule = [(t, 'heavy') for t in np.arange(0, options['duration'], 1 / options['heavy_rps'])]
+        for index in range(options['light_users']):
+            offset = index / (options['light_users'] * options['light_rps'])
+            schedule.extend((t, f'light-{index}') for t in
+                            np.arange(offset, options['duration'], 1 / options['light_rps']))
+        schedule.sort()
+
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=200) as pool:
+            for at, user in schedule:
+                delay = at - (time.perf_counter() - begin)
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(request, user)
+
+        self.stdout.write(f'\n{label}:')
+        for group in ('heavy', 'light'):
+            results = [r for user, rs in outcomes.items() if user.startswith(group) for r in rs]
+            counts = {}
+            for outcome, _ in results:
+                counts[outcome] = counts.get(outcome, 0) + 1
+            ok = np.array([seconds for outcome, seconds in results if outcome == 'ok']) * 1000
+            latency = (f'p50 {np.percentile(ok, 50):.0f} ms, p95 {np.percentile(ok, 95):.0f} ms'
+                       if len(ok) else 'no successes')
+            summary = ', '.join(f'{name} {count}' for name, count in sorted(counts.items()))
+            self.stdout.write(f'  {group:<6} {len(results):>4} requests: {summary}; {latency}')
+        stats = provider.stats()
+        self.stdout.write(f"  upstream errors (provider 429s): {stats['errors']}")
+        router.executor.shutdown(wait=False)
@@ -0,0 +1,180 @@
+import json
+import random
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.verdict_parsing import PREDICTIONS, JSONObjectScanner, parse_verdict
+
+
+# Replies in the shapes models actually produce; extend with --file
+SAMPLE_OUTPUTS = [
+    '{"prediction": "Fake", "confidence": 0.9, "analysis": "The quote is fabricated and no outlet '
+    'reported it.", "key_issues": ["No source", "Sensational wording"], "credibility_score": 0.1}',
+
+    'Here is my assessment:\n\n```json\n{\n  "prediction": "True",\n  "confidence": 0.82,\n'
+    '  "analysis": "Matches the agency statement of 12 March.",\n  "key_issues": [],\n'
+    '  "credibility_score": 0.85\n}\n```\nLet me know if you need more detail.',
+
+    '{"prediction": "Partially True", "confidence": 0.6, "analysis": "The figure {42%} is real '
+    'but the chart in the post is from 2019.", "key_issues": ["Outdated chart"], '
+    '"credibility_score": 0.5}',
+
+    'The required format is {"prediction": ..., "confidence": ...}. My answer:\n'
+    '{"prediction": "Fake", "confidence": 0.75, "analysis": "Doctored screenshot.", '
+    '"key_issues": ["Image manipulation"], "credibility_score": 0.2}',
+
+    '{"prediction": "True", "confidence": 0.7, "analysis": "He said \\"we will act\\" at the '
+    'press conference}.", "key_issues": ["Paraphrased quote",], "credibility_score": 0.7,}',
+
+    '{"prediction": "fake", "confidence": "85%", "analysis": "Satire site presented as news.", '
+    '"key_issues": "Satire source", "credibility_score": 15}',
+
+    '{"prediction": "Partially True", "confidence": 0.55, "analysis": "The vote happened, but '
+    'the numbers in the second paragraph do not match the official record and the',
+
+    'I cannot determine the accuracy of this article without more context.',
+
+    '{"verdict": "Fake", "score": 0.8}',
+
+    '{"prediction": "Likely fake", "confidence": 0.8, "analysis": "Unclear.", "key_issues": [], '
+    '"credibility_score": 0.3}',
+]
+
+_LEGACY_RE = re.compile(r'\{.*?\}', re.DOTALL)
+
+
+def legacy_parse(content):
+    """The original non-greedy regex extraction, for comparison"""
+    match = _LEGACY_RE.search(content)
+    if not match:
+        return None
+    data = json.loads(match.group())  # raised straight into the demo fallback
+    return data if data.get('prediction') in PREDICTIONS else None
+
+
+def mutate(content, rng):
+    """A randomly damaged or re-wrapped variant of a reply"""
+    choice = rng.randrange(8)
+    if choice == 0:
+        return content[:rng.randrange(len(content) + 1)]  # cut off at max_tokens
+    if choice == 1:
+        return f'Sure! {rng.choice(["```json", "Result:", ""])}\n{content}\n```\nHope this helps.'
+    if choice == 2:
+        return content.replace('", "', '",\n  "', rng.randint(1, 3))
+    if choice == 3:
+        index = rng.randrange(len(content) + 1)
+        return content[:index] + rng.choice('{}[]",:\\') + content[index:]
+    if choice == 4:
+        index = rng.randrange(len(content) + 1)
+        return content[:index] + content[index + 1:]
+    if choice == 5:
+        return content.replace('"analysis": "', '"analysis": "See {note} and [1]: ', 1)
+    if choice == 6:
+        return '{"example": true}\n' + content
+    return content.replace('}', ', }', 1)
+
+
+class Command(BaseCommand):
+    help = 'Fuzz and time LLM verdict extraction over sample and recorded model replies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None,
+                            help='JSON lines of recorded replies (see LLM_OUTPUT_RECORD_PATH)')
+        parser.add_argument('--mutations', type=int, default=20000, help='Fuzzed variants to check')
+        parser.add_argument('--seed', type=int, default=17)
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+
+    def handle(self, *args, **options):
+        corpus = list(SAMPLE_OUTPUTS)
+        if options['file']:
+            corpus.extend(self._recorded(options['file']))
+
+        rng = random.Random(options['seed'])
+        fuzzed = [mutate(rng.choice(corpus), rng) for _ in range(options['mutations'])]
+        self.stdout.write(f'{len(corpus)} replies, {len(fuzzed)} fuzzed variants')
+
+        for label, replies in (('corpus', corpus), ('fuzzed', fuzzed)):
+            self._report(label, replies)
+
+        self._check_incremental(corpus + fuzzed[:2000], rng)
+
+        self.stdout.write('\n%-22s %14s' % ('parser', 'us / reply'))
+        for label, func in (('legacy regex', self._safe_legacy), ('scanner', parse_verdict)):
+            micros = self._time(lambda: [func(reply) for reply in fuzzed], len(fuzzed),
+                                options['repeat'])
+            self.stdout.write('%-22s %14.1f' % (label, micros))
+
+    def _report(self, label, replies):
+        legacy_ok = legacy_errors = 0
+        statuses = {}
+        for reply in replies:
+            try:
+                legacy_ok += legacy_parse(reply) is not None
+            except ValueError:
+                legacy_errors += 1
+            try:
+                verdict, status = parse_verdict(reply)
+            except Exception as e:
+                raise CommandError(f'parse_verdict raised {e!r} on {reply!r}')
+            if verdict is not None:
+                self._check_verdict(verdict, reply)
+            status = status.split(':', 1)[0]
+            statuses[status] = statuses.get(status, 0) + 1
+
+        total = len(replies) or 1
+        parsed = statuses.get('ok', 0) + statuses.get('lenient', 0)
+        self.stdout.write(
+            f'\n{label}: legacy parsed {legacy_ok / total:.1%} '
+            f'(raised on {legacy_errors / total:.1%}), scanner parsed {parsed / total:.1%}'
+        )
+        for status, count in sorted(statuses.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'  {status:<14} {count:>7} {count / total:>7.1%}')
+
+    def _check_verdict(self, verdict, reply):
+        if (verdict['prediction'] not in PREDICTIONS
+                or not 0.0 <= verdict['confidence'] <= 1.0
+                or not 0.0 <= verdict['credibility_score'] <= 1.0
+                or not all(isinstance(issue, str) for issue in verdict['key_issues'])):
+            raise CommandError(f'Invalid verdict {verdict!r} from {reply!r}')
+
+    def _check_incremental(self, replies, rng):
+        """Feeding a reply in random pieces must give the same answer as all at once"""
+        for reply in replies:
+            scanner = JSONObjectScanner()
+            position = 0
+            while position < len(reply):
+                step = rng.randint(1, 12)
+                scanner.feed(reply[position:position + step])
+                position += step
+            if parse_verdict(reply, scanner) != parse_verdict(reply):
+                raise CommandError(f'Incremental parse differs for {reply!r}')
+        self.stdout.write(f'\nincremental feeding matched on {len(replies)} replies')
+
+    @staticmethod
+    def _safe_legacy(reply):
+        try:
+            return legacy_parse(reply)
+        except ValueError:
+            return None
+
+    def _time(self, func, count, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1e6 / max(count, 1))
+        return statistics.median(samples)
+
+    def _recorded(self, path):
+        replies = []
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                replies.append(record['content'] if isinstance(record, dict) else str(record))
+        return replies
@@ -0,0 +1,68 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.keywords import document_frequencies, save_idf_table
+from verifier.models import VerificationResult
+
+
+CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the corpus IDF table used for trending-topic keyword extraction from the '
+        'training CSVs (title/text columns, e.g. Fake.csv and True.csv) and/or verification history'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', action='append', default=[], help='Training CSV (repeatable)')
+        parser.add_argument('--history', action='store_true',
+                            help='Include stored verification results')
+        parser.add_argument('--min-df', type=int, default=2,
+                            help='Drop terms seen in fewer documents (they score as unseen)')
+        parser.add_argument('--output', default=None, help='Defaults to KEYWORD_IDF_PATH')
+
+    def handle(self, *args, **options):
+        if not options['csv'] and not options['history']:
+            raise CommandError('Give at least one --csv file or --history.')
+
+        df_counts = Counter()
+        n_docs = 0
+        for chunk in self._documents(options['csv'], options['history']):
+            counts, docs = document_frequencies(chunk)
+            df_counts.update(counts)
+            n_docs += docs
+            self.stdout.write(f'  {n_docs} documents, {len(df_counts)} terms')
+
+        df_counts = {term: df for term, df in df_counts.items() if df >= options['min_df']}
+        output = options['output'] or settings.KEYWORD_IDF_PATH
+        save_idf_table(output, df_counts, n_docs)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(df_counts)} terms from {n_docs} documents to {output}'
+        ))
+
+    def _documents(self, csv_paths, history):
+        """Yield lists of "title\\ncontent" documents"""
+        if csv_paths:
+            import pandas as pd
+
+            for path in csv_paths:
+                for frame in pd.read_csv(path, usecols=lambda c: c in ('title', 'text'),
+                                         chunksize=CHUNK_SIZE, dtype=str):
+                    frame = frame.fillna('')
+                    titles = frame['title'] if 'title' in frame else [''] * len(frame)
+                    texts = frame['text'] if 'text' in frame else [''] * len(frame)
+                    yield [f'{title}\n{text}' for title, text in zip(titles, texts)]
+
+        if history:
+            chunk = []
+            rows = VerificationResult.objects.values_list('title', 'content').order_by()
+            for title, content in rows.iterator(chunk_size=CHUNK_SIZE):
+                chunk.append(f'{title}\n{content}')
+                if len(chunk) == CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.api_auth import create_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Issue a bearer token for the JSON API (e.g. /api/batch/) so a non-browser client '
+        'can call it as the given user. The token is shown once; only its hash is stored.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--name', default='', help='Label for the token, e.g. the pipeline using it')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user {options["username"]!r}')
+        key = create_token(user, options['name'])
+        self.stdout.write(self.style.SUCCESS(f'Token for {user.username}:'))
+        self.stdout.write(key)
+        self.stdout.write('Send it as "Authorization: Bearer <token>".')
@@ -0,0 +1,48 @@
+import json
+import os
+
+import joblib
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.ml_engine import (
+    HASHING_VECTORIZER_FILE, LOGISTIC_FILE, TREE_FILE, VECTORIZER_FILE, load_vectorizer,
+)
+from verifier.training import install_bundle, write_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert pickled local models (a model directory or bundle) into a versioned bundle '
+        'that also holds them as memory-mapped .npy arrays'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=None, help='Defaults to ML_MODEL_DIR')
+        parser.add_argument('--output', default=None, help='Defaults to ML_BUNDLE_DIR')
+        parser.add_argument('--install', action='store_true',
+                            help='Install the new bundle into ML_MODEL_DIR')
+
+    def handle(self, *args, **options):
+        source = str(options['source'] or settings.ML_MODEL_DIR)
+        try:
+            vectorizer = load_vectorizer(source)
+            logistic_model = joblib.load(os.path.join(source, LOGISTIC_FILE))
+            tree_model = joblib.load(os.path.join(source, TREE_FILE))
+        except Exception as e:
+            raise CommandError(f'Cannot load pickled models from {source}: {e}')
+
+        artifacts = {LOGISTIC_FILE: logistic_model, TREE_FILE: tree_model}
+        hashing_path = os.path.join(source, HASHING_VECTORIZER_FILE)
+        if os.path.exists(hashing_path):
+            with open(hashing_path) as handle:
+                artifacts[HASHING_VECTORIZER_FILE] = json.load(handle)
+        else:
+            artifacts[VECTORIZER_FILE] = vectorizer
+        bundle = write_bundle(options['output'] or settings.ML_BUNDLE_DIR, artifacts,
+                              {'exported_from': source}, sources=[], arrays=True)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {bundle}'))
+
+        if options['install']:
+            install_bundle(bundle, settings.ML_MODEL_DIR)
+            self.stdout.write(self.style.SUCCESS(f'Installed into {settings.ML_MODEL_DIR}'))
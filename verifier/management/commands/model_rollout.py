@@ -0,0 +1,110 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.ml_engine import MANIFEST_FILE, LocalModelEngine
+from verifier.model_registry import INSTALLED, bundle_path, read_config, write_config
+from verifier.training import METRICS_FILE, verify_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        'Show or change which model bundles serve as champion and candidate. Running '
+        'processes hot-swap to the new setting within ML_REGISTRY_POLL_SECONDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--champion', default=None,
+                            help=f'Bundle version to serve ("{INSTALLED}": the models in ML_MODEL_DIR)')
+        parser.add_argument('--candidate', default=None, help='Bundle version to try out')
+        parser.add_argument('--no-candidate', action='store_true', help='Stop routing to the candidate')
+        parser.add_argument('--percent', type=int, default=None,
+                            help='Share of articles (0-100) the candidate answers')
+        parser.add_argument('--shadow', action='store_true',
+                            help='Also score the champion\'s articles with the candidate in the '
+                                 'background and log agreement and latency')
+        parser.add_argument('--no-shadow', action='store_true')
+        parser.add_argument('--promote', action='store_true',
+                            help='Make the candidate the champion and clear the candidate')
+
+    def handle(self, *args, **options):
+        bundle_dir = str(settings.ML_BUNDLE_DIR)
+        config = read_config(bundle_dir)
+        updated = dict(config)
+
+        if options['promote']:
+            if not config['candidate']:
+                raise CommandError('There is no candidate to promote.')
+            updated.update(champion=config['candidate'], candidate=None, candidate_percent=0, shadow=False)
+        if options['champion']:
+            updated['champion'] = None if options['champion'] == INSTALLED else options['champion']
+        if options['candidate']:
+            updated['candidate'] = options['candidate']
+        if options['no_candidate']:
+            updated.update(candidate=None, candidate_percent=0, shadow=False)
+        if options['percent'] is not None:
+            if not 0 <= options['percent'] <= 100:
+                raise CommandError('--percent must be between 0 and 100.')
+            updated['candidate_percent'] = options['percent']
+        if options['shadow'] or options['no_shadow']:
+            updated['shadow'] = options['shadow']
+        if (updated['candidate_percent'] or updated['shadow']) and not updated['candidate']:
+            raise CommandError('Set a --candidate to route or shadow traffic to.')
+
+        if updated != config:
+            for role in ('champion', 'candidate'):
+                if updated[role] and updated[role] != config[role]:
+                    self._check(bundle_dir, updated[role])
+            write_config(bundle_dir, updated)
+            self.stdout.write(self.style.SUCCESS(
+                f'Updated {os.path.join(bundle_dir, "registry.json")}; running processes switch '
+                f'within {getattr(settings, "ML_REGISTRY_POLL_SECONDS", 5)}s.'
+            ))
+        self._show(bundle_dir, updated)
+
+    def _check(self, bundle_dir, version):
+        """Refuse bundles that are missing, corrupt or that do not load"""
+        try:
+            path = bundle_path(bundle_dir, version)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise CommandError(f'No bundle {version} in {bundle_dir}')
+        corrupt = verify_bundle(path)
+        if corrupt:
+            raise CommandError(f'Bundle {version} does not match its manifest: {", ".join(corrupt)}')
+        engine = LocalModelEngine(model_dir=path)
+        if not engine.available:
+            raise CommandError(engine.load_error)
+
+    def _show(self, bundle_dir, config):
+        percent = config['candidate_percent'] if config['candidate'] else 0
+        self.stdout.write(f'Champion:  {config["champion"] or INSTALLED} ({100 - percent}% of traffic)')
+        if config['candidate']:
+            shadow = ', shadow' if config['shadow'] else ''
+            self.stdout.write(f'Candidate: {config["candidate"]} ({percent}% of traffic{shadow})')
+
+        versions = sorted(
+            name for name in os.listdir(bundle_dir)
+            if os.path.exists(os.path.join(bundle_dir, name, MANIFEST_FILE))
+        ) if os.path.isdir(bundle_dir) else []
+        if not versions:
+            return
+        self.stdout.write('\n%-32s %-8s %-10s %9s %9s' % ('bundle', 'format', 'mode', 'accuracy', 'macro F1'))
+        roles = {config['champion']: ' *champion', config['candidate']: ' *candidate'}
+        for version in versions:
+            with open(os.path.join(bundle_dir, version, MANIFEST_FILE)) as handle:
+                manifest = json.load(handle)
+            metrics = {}
+            if os.path.exists(os.path.join(bundle_dir, version, METRICS_FILE)):
+                with open(os.path.join(bundle_dir, version, METRICS_FILE)) as handle:
+                    metrics = json.load(handle)
+            combined = metrics.get('models', {}).get('combined', {})
+            self.stdout.write('%-32s %-8s %-10s %9s %9s%s' % (
+                version, manifest.get('format', 'pickle'), metrics.get('mode', '-'),
+                f'{combined["accuracy"]:.4f}' if 'accuracy' in combined else '-',
+                f'{combined["macro_f1"]:.4f}' if 'macro_f1' in combined else '-',
+                roles.get(version, ''),
+            ))
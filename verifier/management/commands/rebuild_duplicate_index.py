@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from verifier.models import ContentSignature, SignatureBand, VerificationResult
+from verifier.near_duplicates import index_signatures
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the near-duplicate (MinHash/LSH) index from the LLM verdicts in '
+        'verification history within NEAR_DUPLICATE_MAX_AGE_DAYS. Results from other tiers, '
+        'borrowed verdicts and rows saved before the tier was recorded are left out.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Index results from the last N days (default: NEAR_DUPLICATE_MAX_AGE_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        days = options['days'] or getattr(settings, 'NEAR_DUPLICATE_MAX_AGE_DAYS', 30)
+        batch_size = options['batch_size']
+
+        SignatureBand.objects.all().delete()
+        ContentSignature.objects.all().delete()
+
+        results = (
+            VerificationResult.objects
+            .filter(created_at__gte=timezone.now() - timedelta(days=days), source='llm')
+            .only('id', 'title', 'content', 'created_at')
+            .order_by()
+        )
+        indexed, batch = 0, []
+        for result in results.iterator(chunk_size=batch_size):
+            batch.append((result, result.title, result.content))
+            if len(batch) == batch_size:
+                indexed += index_signatures(batch)
+                batch = []
+                self.stdout.write(f'  {indexed} signatures')
+        indexed += index_signatures(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} result(s) from the last {days} days.'))
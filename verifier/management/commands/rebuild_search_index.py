@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from verifier.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index over verification history'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                'No full-text index on this database; run migrate first.'
+            ))
+            return
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
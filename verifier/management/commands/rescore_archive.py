@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from verifier.batch_scoring import combined_verdicts, default_workers, iter_chunks, score_chunks
+from verifier.ml_engine import get_local_engine
+from verifier.models import VerificationResult
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-score stored verification results with the local classifiers in vectorized '
+        'chunks and report agreement with the stored verdicts and throughput. Read-only: '
+        'the stored verdicts are what users were shown and stay as they are'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Scoring processes (0: one per available core)')
+        parser.add_argument('--days', type=int, default=None,
+                            help='Only results from the last N days')
+        parser.add_argument('--limit', type=int, default=None)
+
+    def handle(self, *args, **options):
+        engine = get_local_engine()
+        if not engine.available:
+            raise CommandError(engine.load_error)
+
+        workers = options['workers'] or default_workers()
+        results = VerificationResult.objects.all()
+        if options['days']:
+            results = results.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        if options['limit']:
+            results = results.filter(pk__in=list(
+                results.order_by('-pk').values_list('pk', flat=True)[:options['limit']]
+            ))
+
+        scored = agreed = differing = 0
+        scoring_seconds = 0.0
+        start = time.perf_counter()
+        for ids, logistic_true, tree_true, seconds in score_chunks(
+            iter_chunks(results, options['chunk_size']), workers,
+        ):
+            labels, _ = combined_verdicts(logistic_true, tree_true)
+            stored = dict(
+                VerificationResult.objects.filter(pk__in=ids).values_list('pk', 'prediction')
+            )
+            for pk, label in zip(ids, labels):
+                if pk not in stored:
+                    continue  # deleted since it was read
+                if stored[pk] == label:
+                    agreed += 1
+                else:
+                    differing += 1
+            scored += len(ids)
+            scoring_seconds += seconds
+            self.stdout.write(f'  {scored} scored')
+
+        elapsed = time.perf_counter() - start
+        if not scored:
+            self.stdout.write('No verification results to score.')
+            return
+
+        self.stdout.write(
+            f'\nScored {scored} result(s) in {elapsed:.2f}s with {workers} worker(s): '
+            f'{scored / elapsed:,.0f} docs/sec end to end, '
+            f'{scored / scoring_seconds:,.0f} docs/sec per worker in scoring'
+        )
+        self.stdout.write(f'Agreement with stored verdicts: {agreed / scored:.1%} '
+                          f'({differing} differ)')
@@ -0,0 +1,136 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+DEFAULT_REPLY = {
+    'prediction': 'Partially True',
+    'confidence': 0.72,
+    'analysis': (
+        'The article mixes verifiable claims with unsourced statements. '
+        'Key figures match public records, but the headline overstates them.'
+    ),
+    'key_issues': ['Unsourced quotes', 'Sensational headline'],
+    'credibility_score': 0.6,
+}
+
+
+def make_handler(reply, first_token_delay, token_delay, chunk_size,
+                 slow_rate=0.0, slow_delay=0.0, error_rate=0.0, quota_per_minute=0):
+    recent = deque()
+    recent_lock = threading.Lock()
+
+    def over_quota():
+        """Sliding one-minute window, like a provider's requests-per-minute limit"""
+        if not quota_per_minute:
+            return False
+        now = time.monotonic()
+        with recent_lock:
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if len(recent) >= quota_per_minute:
+                return True
+            recent.append(now)
+            return False
+
+    class FakeCompletionsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if random.random() < error_rate:
+                self.send_error(503)
+                return
+            if over_quota():
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            # Injected tail latency: a fraction of requests stall before the first token
+            delay = first_token_delay + (slow_delay if random.random() < slow_rate else 0.0)
+            if body.get('stream'):
+                self._stream(delay)
+            else:
+                self._complete(delay)
+
+        def _complete(self, delay):
+            time.sleep(delay + token_delay * (len(reply) / chunk_size))
+            payload = json.dumps({
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': reply}}],
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, delay):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            time.sleep(delay)
+            for start in range(0, len(reply), chunk_size):
+                chunk = {'choices': [{'index': 0, 'delta': {'content': reply[start:start + chunk_size]}}]}
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+                self.wfile.flush()
+                time.sleep(token_delay)
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeCompletionsHandler
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local OpenAI-compatible chat completions server (plain and stream: true SSE) '
+        'that returns a canned verdict. Point LLM_API_BASE_URL at it to exercise streaming '
+        'and latency handling without a provider account.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--first-token-delay', type=float, default=0.3,
+                            help='Seconds before the first token')
+        parser.add_argument('--token-delay', type=float, default=0.02,
+                            help='Seconds between streamed chunks')
+        parser.add_argument('--chunk-size', type=int, default=4, help='Characters per chunk')
+        parser.add_argument('--slow-rate', type=float, default=0.0,
+                            help='Fraction of requests that get --slow-delay extra seconds')
+        parser.add_argument('--slow-delay', type=float, default=0.0)
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Fraction of requests answered with 503')
+        parser.add_argument('--quota-rpm', type=int, default=0,
+                            help='Answer 429 beyond this many requests per minute')
+
+    def handle(self, *args, **options):
+        reply = json.dumps(DEFAULT_REPLY, indent=2)
+        handler = make_handler(reply, options['first_token_delay'],
+                               options['token_delay'], options['chunk_size'],
+                               options['slow_rate'], options['slow_delay'], options['error_rate'],
+                               options['quota_rpm'])
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), handler)
+        self.stdout.write(
+            f"Fake LLM listening on http://127.0.0.1:{options['port']}/v1 "
+            f"(set LLM_API_BASE_URL to this)"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import signal
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def worker_main(worker_number, poll_interval, stale_after, heartbeat_interval):
+    """Drain the job queue until told to stop"""
+    django.setup()
+    # Imported after setup so the child also works with the spawn start method
+    from verifier.jobs import (
+        JobHeartbeat, claim_next_job, complete_job, defer_job, fail_job, requeue_stale_jobs,
+    )
+    from verifier.rate_limit import RateLimited
+    from verifier.trending import trending_buffer
+    from verifier.views import detector, save_verification_results
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    last_sweep = 0.0
+    while not stopping:
+        if worker_number == 0 and time.monotonic() - last_sweep > stale_after:
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued:
+                print(f"[worker {worker_number}] requeued {requeued} stale job(s)")
+            last_sweep = time.monotonic()
+
+        job = claim_next_job()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            text_to_analyze = f"{job.title} {job.content}".strip() if job.title else job.content
+            with JobHeartbeat(job, heartbeat_interval):
+                result = detector.verify_news(text_to_analyze, category=job.category)
+
+            def save_result():
+                return save_verification_results(job.user, [{
+                    'title': job.title,
+                    'content': job.content,
+                    'category': job.category,
+                    'result': result,
+                }])[0]
+
+            if not complete_job(job, result, save_result if job.save_to_history else None):
+                print(f"[worker {worker_number}] job {job.id} was requeued meanwhile; result dropped")
+        except RateLimited as e:
+            # Upstream quota is used up: leave the job for later instead of failing it
+            defer_job(job)
+            time.sleep(e.retry_after)
+        except Exception as e:
+            print(f"[worker {worker_number}] job {job.id} failed: {e}")
+            fail_job(job)
+
+    # multiprocessing children leave through os._exit, which skips atexit
+    trending_buffer.flush()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Start a pool of worker processes that drain the verification job queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int,
+            default=getattr(settings, 'VERIFICATION_WORKER_PROCESSES', 2),
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=0.5,
+            help='Seconds to sleep when the queue is empty',
+        )
+        parser.add_argument(
+            '--stale-after', type=float,
+            default=getattr(settings, 'VERIFICATION_JOB_STALE_SECONDS', 120),
+            help='Requeue running jobs without a heartbeat for this many seconds',
+        )
+        parser.add_argument(
+            '--heartbeat', type=float,
+            default=getattr(settings, 'VERIFICATION_JOB_HEARTBEAT_SECONDS', 15),
+            help='Seconds between heartbeats of a running job',
+        )
+
+    def handle(self, *args, **options):
+        # Children must not share the parent's database sockets
+        connections.close_all()
+
+        workers = []
+        for number in range(options['processes']):
+            process = multiprocessing.Process(
+                target=worker_main,
+                args=(number, options['poll_interval'], options['stale_after'], options['heartbeat']),
+                name=f'verification-worker-{number}',
+            )
+            process.start()
+            workers.append(process)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Started {len(workers)} verification worker(s) (pid {os.getpid()})"
+        ))
+
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping workers...')
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.join()
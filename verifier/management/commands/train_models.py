@@ -0,0 +1,114 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from verifier.batch_scoring import default_workers
+from verifier.model_registry import INSTALLED, read_config
+from verifier.training import (
+    ENGINE_MODELS, LABELED_FILES, MODELS, install_bundle, train_bundle, train_streaming_bundle,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Train the TF-IDF vectorizer and local classifiers from the Fake/True CSVs and '
+        'write a versioned model bundle (models, metrics and content hashes)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fake', default=None, help='Defaults to ML_DATASET_DIR/Fake.csv')
+        parser.add_argument('--true', default=None, help='Defaults to ML_DATASET_DIR/True.csv')
+        parser.add_argument('--models', default=','.join(ENGINE_MODELS),
+                            help=f'Comma-separated, from: {", ".join(MODELS)}')
+        parser.add_argument('--output', default=None, help='Defaults to ML_BUNDLE_DIR')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--test-size', type=float, default=0.25)
+        parser.add_argument('--chunk-size', type=int, default=5000, help='CSV rows per chunk')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Preprocessing processes (0: one per available core)')
+        parser.add_argument('--jobs', type=int, default=-1,
+                            help='n_jobs for estimators that support it')
+        parser.add_argument('--streaming', action='store_true',
+                            help='Out-of-core training: hashed features, SGD logistic regression '
+                                 'and a tree on a reservoir sample, in bounded memory')
+        parser.add_argument('--n-features', type=int, default=2 ** 20,
+                            help='Hashed feature space size (--streaming)')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Articles per SGD batch (--streaming)')
+        parser.add_argument('--epochs', type=int, default=3, help='SGD passes (--streaming)')
+        parser.add_argument('--tree-sample', type=int, default=20000,
+                            help='Training rows sampled for the decision tree (--streaming)')
+        parser.add_argument('--arrays', action='store_true',
+                            help='Also export the serving models as memory-mapped .npy arrays')
+        parser.add_argument('--install', action='store_true',
+                            help='Copy the new vectorizer and classifiers into ML_MODEL_DIR')
+
+    def handle(self, *args, **options):
+        dataset_dir = getattr(settings, 'ML_DATASET_DIR', '')
+        paths = {
+            'Fake.csv': options['fake'] or os.path.join(dataset_dir, 'Fake.csv'),
+            'True.csv': options['true'] or os.path.join(dataset_dir, 'True.csv'),
+        }
+        sources = [(paths[filename], label) for filename, label in LABELED_FILES]
+        missing = [path for path, _ in sources if not os.path.exists(path)]
+        if missing:
+            raise CommandError(f'Training CSV not found: {", ".join(missing)}')
+
+        models = [name.strip() for name in options['models'].split(',') if name.strip()]
+        if options['streaming'] and models != list(ENGINE_MODELS):
+            raise CommandError('--streaming trains logistic_regression and decision_tree only')
+        if options['install'] and not set(ENGINE_MODELS) <= set(models):
+            raise CommandError(f'--install needs {" and ".join(ENGINE_MODELS)} in --models')
+        output = options['output'] or settings.ML_BUNDLE_DIR
+
+        common = {
+            'seed': options['seed'],
+            'test_size': options['test_size'],
+            'workers': options['workers'] or default_workers(),
+            'arrays': options['arrays'],
+            'log': lambda line: self.stdout.write(f'  {line}'),
+        }
+        start = time.perf_counter()
+        try:
+            if options['streaming']:
+                bundle, metrics = train_streaming_bundle(
+                    sources, output, n_features=options['n_features'],
+                    batch_size=options['batch_size'], epochs=options['epochs'],
+                    tree_sample=options['tree_sample'], **common,
+                )
+            else:
+                bundle, metrics = train_bundle(
+                    sources, output, models=models, n_jobs=options['jobs'],
+                    chunk_size=options['chunk_size'], **common,
+                )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'\n{"model":<20} {"accuracy":>9} {"macro F1":>9} {"fit s":>8}')
+        for name, scores in metrics['models'].items():
+            macro_f1 = f'{scores["macro_f1"]:.4f}' if 'macro_f1' in scores else '-'
+            fit_seconds = f'{scores["fit_seconds"]:.1f}' if 'fit_seconds' in scores else '-'
+            self.stdout.write(f'{name:<20} {scores["accuracy"]:>9.4f} {macro_f1:>9} {fit_seconds:>8}')
+        with open(os.path.join(bundle, 'manifest.json')) as handle:
+            version = json.load(handle)['version']
+        if metrics['peak_rss_mb'] is not None:
+            self.stdout.write(f'\nPeak memory: {metrics["peak_rss_mb"]:.0f} MB')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nWrote bundle {version} to {bundle} in {time.perf_counter() - start:.1f}s'
+        ))
+
+        if options['install']:
+            install_bundle(bundle, settings.ML_MODEL_DIR)
+            self.stdout.write(self.style.SUCCESS(
+                f'Installed {version} into {settings.ML_MODEL_DIR}; running processes pick it up '
+                f'within {getattr(settings, "ML_REGISTRY_POLL_SECONDS", 5)}s.'
+            ))
+            champion = read_config(settings.ML_BUNDLE_DIR)['champion']
+            if champion not in (None, INSTALLED):
+                self.stdout.write(self.style.WARNING(
+                    f'The registry serves champion {champion}, not the installed models; '
+                    f'run manage.py model_rollout --champion {INSTALLED} to serve them.'
+                ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0002_verificationjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trendingtopic',
+            index=models.Index(fields=['-verification_count', '-updated_at'], name='verifier_topic_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationresult',
+            index=models.Index(fields=['user', '-created_at'], name='verifier_vr_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationresult',
+            index=models.Index(fields=['user', 'prediction', '-created_at'], name='verifier_vr_user_pred_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationresult',
+            index=models.Index(fields=['user', 'category', '-created_at'], name='verifier_vr_user_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationresult',
+            index=models.Index(fields=['user', 'is_bookmarked', '-created_at'], name='verifier_vr_user_bookmark_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'verifier_verificationresult_fts'
+PG_INDEX_NAME = 'verifier_vr_search_gin_idx'
+PG_VECTOR_SQL = (
+    "to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(content, ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"title, content, content='verifier_verificationresult', content_rowid='id', "
+                f"tokenize='porter unicode61')"
+            )
+        except Exception as e:
+            # SQLite built without FTS5: history search falls back to icontains
+            print(f"FTS5 unavailable, full-text search disabled: {e}")
+            return
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {PG_INDEX_NAME} '
+            f'ON verifier_verificationresult USING GIN (({PG_VECTOR_SQL}))'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PG_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0003_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
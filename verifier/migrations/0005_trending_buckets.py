@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0004_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingTopicBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='trendingtopic',
+            name='score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='trendingtopic',
+            index=models.Index(fields=['-score', '-verification_count'], name='verifier_topic_score_idx'),
+        ),
+        migrations.AddField(
+            model_name='trendingtopicbucket',
+            name='topic',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='verifier.trendingtopic'),
+        ),
+        migrations.AddIndex(
+            model_name='trendingtopicbucket',
+            index=models.Index(fields=['hour'], name='verifier_bucket_hour_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingtopicbucket',
+            constraint=models.UniqueConstraint(fields=('topic', 'hour'), name='verifier_unique_topic_hour'),
+        ),
+    ]
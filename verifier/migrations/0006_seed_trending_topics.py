@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+INITIAL_TOPICS = [
+    ('Artificial Intelligence', 1250),
+    ('Climate Change', 980),
+    ('Cryptocurrency', 875),
+    ('Space Exploration', 750),
+    ('Healthcare', 690),
+    ('Politics', 650),
+    ('Technology', 580),
+    ('Sports', 520),
+    ('Entertainment', 480),
+    ('Education', 420),
+]
+
+
+def seed_trending_topics(apps, schema_editor):
+    """Give a fresh install something to show until real verifications arrive"""
+    TrendingTopic = apps.get_model('verifier', 'TrendingTopic')
+    if TrendingTopic.objects.exists():
+        return
+    TrendingTopic.objects.bulk_create([
+        TrendingTopic(topic=topic, verification_count=count)
+        for topic, count in INITIAL_TOPICS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0005_trending_buckets'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_trending_topics, migrations.RunPython.noop),
+    ]
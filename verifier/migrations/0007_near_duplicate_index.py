@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0006_seed_trending_topics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentSignature',
+            fields=[
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='verifier.verificationresult')),
+                ('signature', models.BinaryField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='verifier_sig_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='verifier.contentsignature')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='verifier_band_key_idx')],
+            },
+        ),
+    ]
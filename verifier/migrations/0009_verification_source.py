@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifier', '0008_api_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verificationresult',
+            name='source',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,290 @@
+"""
+Offline inference with the classifiers trained in ML_Model_Training.
+
+The TF-IDF vectorizer, logistic regression and decision tree are loaded once
+per process and scored locally, so a verdict costs a sparse dot product
+instead of a network round trip.
+"""
+import json
+import os
+import re
+import string
+import threading
+from array import array
+from functools import partial
+from operator import is_not
+from typing import Dict, Any, Iterable, List, Tuple
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+
+VECTORIZER_FILE = 'tfidf_vectorizer.pkl'
+# Parameters of a stateless HashingVectorizer (out-of-core training); used
+# instead of VECTORIZER_FILE when present
+HASHING_VECTORIZER_FILE = 'hashing_vectorizer.json'
+# Version and checksums of a bundle written by manage.py train_models
+MANIFEST_FILE = 'manifest.json'
+LOGISTIC_FILE = 'logistic_regression.pkl'
+TREE_FILE = 'decision_tree.pkl'
+
+_BRACKETED_RE = re.compile(r"\[.*?\]")
+_URL_RE = re.compile(r"https?://S+|www\.\S+")
+_TAG_RE = re.compile(r"<.*?>+")
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+# Also turns the ASCII control characters that are neither word characters
+# nor whitespace into spaces, after which str.split() on ASCII text yields
+# the same words as the vectorizer's token regex
+_TOKEN_TABLE = str.maketrans({
+    **{char: None for char in string.punctuation},
+    **{chr(code): ' ' for code in (*range(0x00, 0x09), *range(0x0e, 0x1c), 0x7f)},
+})
+# Same matches as the notebook's r'\w*\d\w*' (a whole word run holding a
+# digit), but anchored at word starts so it does not backtrack through
+# every position of every word
+_DIGIT_WORD_RE = re.compile(r'\b[^\W\d]*\d\w*')
+
+
+def _strip_markup(text, table=_PUNCTUATION_TABLE):
+    """Every step of wordopt except the removal of words containing digits.
+
+    The substring checks skip regexes that cannot match, and the punctuation
+    class is deleted with str.translate; the output is unchanged.
+    """
+    text = text.lower()
+    if '[' in text:
+        text = _BRACKETED_RE.sub('', text)
+    text = text.replace('\\w', '')
+    if 'http' in text or 'www.' in text:
+        text = _URL_RE.sub('', text)
+    if '<' in text:
+        text = _TAG_RE.sub('', text)
+    text = text.translate(table)
+    return text.replace('\n', '')
+
+
+def wordopt(text):
+    """Preprocessing applied in the training notebook.
+
+    Kept byte-for-byte compatible with the notebook (including its quirks) so
+    inputs land in the same feature space the models were fitted on.
+    """
+    return _DIGIT_WORD_RE.sub('', _strip_markup(text))
+
+
+_DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+_find_tokens = re.compile(_DEFAULT_TOKEN_PATTERN).findall
+_is_feature = partial(is_not, None)
+
+
+def _supports_fast_counts(vectorizer) -> bool:
+    """Whether _count_features reproduces ``vectorizer.transform``"""
+    return (
+        isinstance(vectorizer, TfidfVectorizer)
+        and vectorizer.analyzer == 'word'
+        and tuple(vectorizer.ngram_range) == (1, 1)
+        and vectorizer.token_pattern == _DEFAULT_TOKEN_PATTERN
+        and vectorizer.tokenizer is None
+        and vectorizer.preprocessor is None
+        and vectorizer.stop_words is None
+        and vectorizer.strip_accents is None
+        and not vectorizer.binary
+        and not vectorizer.sublinear_tf
+    )
+
+
+def load_vectorizer(model_dir):
+    """The bundle's hashing vectorizer if it has one, else its pickled TF-IDF vectorizer"""
+    hashing_path = os.path.join(model_dir, HASHING_VECTORIZER_FILE)
+    if os.path.exists(hashing_path):
+        with open(hashing_path) as handle:
+            return HashingVectorizer(**json.load(handle))
+    return joblib.load(os.path.join(model_dir, VECTORIZER_FILE))
+
+
+def smoothed_tree_probability(tree_model, features):
+    """P(True) from a decision tree with Laplace smoothing on leaf sample counts.
+
+    A fully grown tree has pure leaves, so raw predict_proba is always 0 or
+    1; smoothing by the number of training samples in the leaf gives a
+    usable confidence. Both the class distribution and the sample count
+    are read from the leaf, so the tree is traversed once.
+    """
+    tree = tree_model.tree_
+    leaves = tree_model.apply(features)
+    value = tree.value[leaves, 0, :]
+    proba = value[:, 1] / value.sum(axis=1)
+    samples = tree.n_node_samples[leaves]
+    return (proba * samples + 1.0) / (samples + 2.0)
+
+
+class LocalModelEngine:
+    """Local TF-IDF (or hashed) features + logistic regression / decision tree classifier"""
+
+    # Class 0 is Fake.csv and class 1 is True.csv in the notebook
+    LABELS = {0: 'Fake', 1: 'True'}
+
+    def __init__(self, model_dir=None):
+        self.model_dir = str(model_dir or settings.ML_MODEL_DIR)
+        self.vectorizer = None
+        self.logistic_model = None
+        self.tree_model = None
+        self.fast_counts = False
+        self.version = None
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def available(self):
+        self._ensure_loaded()
+        return self.load_error is None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                self._load_models()
+            except Exception as e:
+                self.load_error = f'Local models unavailable: {e}'
+                print(self.load_error)
+            self._loaded = True
+
+    def _load_models(self):
+        # Imported here: model_arrays imports this module
+        from .model_arrays import MappedTfidfVectorizer, has_arrays, load_array_models
+
+        if has_arrays(self.model_dir):
+            models = load_array_models(self.model_dir)
+            self.vectorizer = models['vectorizer']
+            self.logistic_model = models['logistic_model']
+            self.tree_model = models['tree_model']
+            self.fast_counts = isinstance(self.vectorizer, MappedTfidfVectorizer)
+        else:
+            self.vectorizer = load_vectorizer(self.model_dir)
+            self.logistic_model = joblib.load(os.path.join(self.model_dir, LOGISTIC_FILE))
+            self.tree_model = joblib.load(os.path.join(self.model_dir, TREE_FILE))
+            self.fast_counts = _supports_fast_counts(self.vectorizer)
+
+        manifest_path = os.path.join(self.model_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as handle:
+                self.version = json.load(handle).get('version')
+
+    def _tree_probability(self, features):
+        return smoothed_tree_probability(self.tree_model, features)
+
+    def score_many(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """P(True) from the logistic regression and the tree for every text.
+
+        The texts are vectorized into one sparse matrix and each model scores
+        it in a single call, so the per-article cost is the preprocessing and
+        a row of sparse arithmetic rather than a Python round trip per model.
+        """
+        self._ensure_loaded()
+        if self.load_error:
+            raise RuntimeError(self.load_error)
+        features = self._vectorize(texts)
+        if features.shape[0] == 0:
+            return np.empty(0), np.empty(0)
+        logistic_true = self.logistic_model.predict_proba(features)[:, 1]
+        return logistic_true, self._tree_probability(features)
+
+    def _vectorize(self, texts: Iterable[str]):
+        """TF-IDF rows equal to ``vectorizer.transform`` of the wordopt texts.
+
+        For a plain TfidfVectorizer (or its memory-mapped form) the term
+        counts are built here, one C-level vocabulary lookup per word,
+        instead of by the vectorizer's per-token Python loop. Its tokens are whole word runs and its
+        vocabulary was fitted on wordopt output, so no feature contains a
+        digit: a word with one maps to nothing whether or not it is removed,
+        and wordopt's costliest step is skipped.
+        """
+        if not self.fast_counts:
+            return self.vectorizer.transform([wordopt(text or '') for text in texts])
+
+        vectorizer = self.vectorizer
+        mapped = not isinstance(vectorizer, TfidfVectorizer)
+        if mapped:
+            # A memory-mapped vocabulary is searched once for the whole batch
+            words, lengths = [], []
+            for text in texts:
+                tokens = self._tokens(text)
+                words.extend(tokens)
+                lengths.append(len(tokens))
+            ids = vectorizer.feature_ids(words)
+            rows = np.repeat(np.arange(len(lengths)), lengths)[ids >= 0]
+            indices = ids[ids >= 0]
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(lengths)))])
+            n_features, idf = vectorizer.n_features, vectorizer.idf_
+        else:
+            lookup = vectorizer.vocabulary_.get
+            indptr, indices = [0], array('q')
+            for text in texts:
+                indices.extend(filter(_is_feature, map(lookup, self._tokens(text))))
+                indptr.append(len(indices))
+            indices = np.frombuffer(indices, dtype=np.int64) if indices else np.empty(0, dtype=np.int64)
+            n_features = len(vectorizer.vocabulary_)
+            idf = vectorizer.idf_ if vectorizer.use_idf else None
+
+        counts = sp.csr_matrix(
+            (np.ones(len(indices), dtype=vectorizer.dtype), indices, np.asarray(indptr)),
+            shape=(len(indptr) - 1, n_features),
+        )
+        counts.sum_duplicates()
+        if idf is not None:
+            counts.data *= idf[counts.indices]
+        if vectorizer.norm:
+            normalize(counts, norm=vectorizer.norm, copy=False)
+        return counts
+
+    @staticmethod
+    def _tokens(text):
+        text = _strip_markup(text or '', _TOKEN_TABLE)
+        return text.split() if text.isascii() else _find_tokens(text)
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """Score one article with both local models"""
+        return self.predict_many([text])[0]
+
+    def predict_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Score a batch of articles with both local models"""
+        texts = list(texts)
+        self._ensure_loaded()
+        if self.load_error:
+            return [{
+                'prediction': 'Error',
+                'confidence': 0.0,
+                'error': self.load_error,
+            } for _ in texts]
+
+        logistic_true, tree_true = self.score_many(texts)
+        return [self._result(float(lr), float(tree)) for lr, tree in zip(logistic_true, tree_true)]
+
+    def _result(self, logistic_true: float, tree_true: float) -> Dict[str, Any]:
+        combined_true = (logistic_true + tree_true) / 2.0
+        return {
+            'prediction': self.LABELS[int(combined_true >= 0.5)],
+            'confidence': max(combined_true, 1.0 - combined_true),
+            'logistic_prediction': self.LABELS[int(logistic_true >= 0.5)],
+            'tree_prediction': self.LABELS[int(tree_true >= 0.5)],
+            'logistic_confidence': max(logistic_true, 1.0 - logistic_true),
+            'tree_confidence': max(tree_true, 1.0 - tree_true),
+            'error': None,
+            'source': 'local',
+        }
+
+
+def get_local_engine() -> LocalModelEngine:
+    """Return the engine this process currently serves as champion (see model_registry)"""
+    # Imported here: model_registry imports this module
+    from .model_registry import get_model_registry
+
+    return get_model_registry().champion
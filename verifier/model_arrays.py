@@ -0,0 +1,186 @@
+"""
+Memory-mapped model format for the local classifiers.
+
+Unpickling the vectorizer and classifiers gives every web/worker process
+its own copy of the vocabulary dict and weight arrays. In this format each
+array is a ``.npy`` file opened with ``mmap_mode='r'``: the processes share
+one page-cached copy, and opening it reads only the headers.
+
+    tfidf.json / hashing_vectorizer.json   vectorizer parameters
+    tfidf_terms.npy       vocabulary as sorted UTF-8 byte strings
+    tfidf_term_ids.npy    feature index of each sorted term
+    tfidf_idf.npy         idf weights
+    logistic_*.npy        coefficients and intercept
+    tree_*.npy            the decision tree's node arrays
+
+The classes below stand in for the sklearn objects LocalModelEngine uses
+and give the same results: terms are looked up with a vectorized binary
+search instead of a dict, the logistic regression is one sparse dot
+product, and the tree is walked one level at a time for the whole batch.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import expit
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from .ml_engine import HASHING_VECTORIZER_FILE
+
+
+TFIDF_FILE = 'tfidf.json'
+TFIDF_ARRAYS = ('tfidf_terms.npy', 'tfidf_term_ids.npy', 'tfidf_idf.npy')
+LOGISTIC_ARRAYS = ('logistic_coef.npy', 'logistic_intercept.npy')
+TREE_FIELDS = ('children_left', 'children_right', 'feature', 'threshold', 'value', 'n_node_samples')
+TREE_ARRAYS = tuple(f'tree_{field}.npy' for field in TREE_FIELDS)
+ARRAY_FILES = TFIDF_ARRAYS + LOGISTIC_ARRAYS + TREE_ARRAYS + (TFIDF_FILE,)
+
+
+def has_arrays(model_dir) -> bool:
+    return all(os.path.exists(os.path.join(model_dir, name)) for name in LOGISTIC_ARRAYS + TREE_ARRAYS)
+
+
+def _save(directory, name, array) -> str:
+    np.save(os.path.join(directory, name), np.ascontiguousarray(array))
+    return name
+
+
+def export_arrays(vectorizer, logistic_model, tree_model, directory) -> List[str]:
+    """Write the models as ``.npy`` arrays into ``directory``; returns the file names"""
+    written = []
+    if isinstance(vectorizer, HashingVectorizer):
+        n_features = vectorizer.n_features
+    else:
+        # Byte order, which is how numpy compares the stored terms
+        terms = sorted(vectorizer.vocabulary_, key=lambda term: term.encode('utf-8'))
+        encoded = np.array([term.encode('utf-8') for term in terms], dtype=bytes)
+        term_ids = np.fromiter((vectorizer.vocabulary_[term] for term in terms), dtype=np.int32,
+                               count=len(terms))
+        n_features = len(terms)
+        written += [
+            _save(directory, 'tfidf_terms.npy', encoded),
+            _save(directory, 'tfidf_term_ids.npy', term_ids),
+            _save(directory, 'tfidf_idf.npy', vectorizer.idf_ if vectorizer.use_idf else np.ones(n_features)),
+        ]
+        with open(os.path.join(directory, TFIDF_FILE), 'w') as handle:
+            json.dump({'n_features': n_features, 'norm': vectorizer.norm,
+                       'dtype': np.dtype(vectorizer.dtype).name}, handle, indent=2)
+        written.append(TFIDF_FILE)
+
+    coef = logistic_model.coef_
+    coef = coef.toarray() if sp.issparse(coef) else np.asarray(coef)
+    written += [
+        _save(directory, 'logistic_coef.npy', coef[0].astype(np.float64)),
+        _save(directory, 'logistic_intercept.npy', np.asarray(logistic_model.intercept_, dtype=np.float64)),
+    ]
+
+    tree = tree_model.tree_
+    value = tree.value[:, 0, :]
+    arrays = {
+        'children_left': tree.children_left,
+        'children_right': tree.children_right,
+        'feature': tree.feature,
+        'threshold': tree.threshold,
+        # Class fractions, whether this sklearn stores counts or fractions
+        'value': value / value.sum(axis=1, keepdims=True),
+        'n_node_samples': tree.n_node_samples,
+    }
+    written += [_save(directory, f'tree_{field}.npy', arrays[field]) for field in TREE_FIELDS]
+    return written
+
+
+def _load(directory, name):
+    return np.load(os.path.join(directory, name), mmap_mode='r')
+
+
+class MappedTfidfVectorizer:
+    """The fitted TF-IDF vocabulary and weights, memory-mapped"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, TFIDF_FILE)) as handle:
+            params = json.load(handle)
+        self.n_features = params['n_features']
+        self.norm = params['norm']
+        self.dtype = np.dtype(params['dtype'])
+        self.terms, self.term_ids, self.idf_ = (_load(directory, name) for name in TFIDF_ARRAYS)
+
+    def get_feature_names_out(self) -> np.ndarray:
+        """Terms in feature index order, as TfidfVectorizer returns them"""
+        names = np.empty(self.n_features, dtype=object)
+        names[self.term_ids] = np.char.decode(self.terms, 'utf-8')
+        return names
+
+    def feature_ids(self, words: List[str]) -> np.ndarray:
+        """Feature index of every word, or -1 for words outside the vocabulary"""
+        if not words:
+            return np.empty(0, dtype=np.int64)
+        try:
+            keys = np.array(words, dtype=bytes)
+        except UnicodeEncodeError:
+            keys = np.array([word.encode('utf-8') for word in words], dtype=bytes)
+        # Longer than every term: cannot match, and would be truncated below
+        too_long = np.char.str_len(keys) > self.terms.dtype.itemsize
+        keys = keys.astype(self.terms.dtype)
+        position = np.searchsorted(self.terms, keys)
+        position[position == len(self.terms)] = 0
+        found = (self.terms[position] == keys) & ~too_long
+        return np.where(found, self.term_ids[position], -1)
+
+
+class MappedLogisticRegression:
+    """Binary logistic regression (or SGD log-loss) weights, memory-mapped"""
+
+    def __init__(self, directory):
+        self.coef, self.intercept = (_load(directory, name) for name in LOGISTIC_ARRAYS)
+
+    def predict_proba(self, features) -> np.ndarray:
+        true = expit(features @ self.coef + self.intercept[0])
+        return np.column_stack([1.0 - true, true])
+
+
+class MappedDecisionTree:
+    """A fitted decision tree's node arrays, memory-mapped.
+
+    ``tree_`` is the tree itself, so smoothed_tree_probability can read
+    ``value`` and ``n_node_samples`` as it does from sklearn's Tree.
+    """
+
+    def __init__(self, directory):
+        for field, name in zip(TREE_FIELDS, TREE_ARRAYS):
+            setattr(self, field, _load(directory, name))
+        self.value = self.value[:, np.newaxis, :]
+        self.tree_ = self
+
+    def apply(self, features) -> np.ndarray:
+        """Leaf index of every row, walking all rows down the tree together"""
+        features = sp.csr_matrix(features)
+        nodes = np.zeros(features.shape[0], dtype=np.intp)
+        active = np.arange(features.shape[0])
+        while active.size:
+            current = nodes[active]
+            inner = self.children_left[current] != -1
+            active, current = active[inner], current[inner]
+            if not active.size:
+                break
+            values = np.asarray(features[active, self.feature[current]]).ravel()
+            # sklearn compares float32 feature values against the thresholds
+            left = values.astype(np.float32) <= self.threshold[current]
+            nodes[active] = np.where(left, self.children_left[current], self.children_right[current])
+        return nodes
+
+
+def load_array_models(directory) -> Dict[str, Optional[object]]:
+    """Memory-mapped stand-ins for the vectorizer and both classifiers"""
+    hashing_path = os.path.join(directory, HASHING_VECTORIZER_FILE)
+    if os.path.exists(hashing_path):
+        with open(hashing_path) as handle:
+            vectorizer = HashingVectorizer(**json.load(handle))
+    else:
+        vectorizer = MappedTfidfVectorizer(directory)
+    return {
+        'vectorizer': vectorizer,
+        'logistic_model': MappedLogisticRegression(directory),
+        'tree_model': MappedDecisionTree(directory),
+    }
@@ -0,0 +1,350 @@
+"""
+Hot-swappable local models, with a candidate for A/B routing and shadow scoring.
+
+Each process serves a *champion* and optionally a *candidate*, both
+LocalModelEngines over bundles written by ``manage.py train_models``. Which
+bundles they are is set in ``registry.json`` in ML_BUNDLE_DIR (see
+``manage.py model_rollout``):
+
+    {"champion": "<version>", "candidate": "<version>",
+     "candidate_percent": 10, "shadow": true}
+
+Without a champion the installed models in ML_MODEL_DIR are served, as
+before. Every process checks that file and the installed manifest at most
+every ML_REGISTRY_POLL_SECONDS. On a change the new engines are verified and
+loaded on a background thread, then swapped in with a single assignment, so
+no request waits for a load or sees a half-loaded model.
+
+``candidate_percent`` of articles, bucketed by a hash of the text so an
+article always gets the same model, are answered by the candidate. With
+``shadow`` the articles the champion answers are also scored by the
+candidate on a background thread after the response is ready, and its
+agreement and latency against the champion are logged.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+from .ml_engine import MANIFEST_FILE, LocalModelEngine
+
+
+REGISTRY_FILE = 'registry.json'
+# Champion name for the models installed in ML_MODEL_DIR
+INSTALLED = 'installed'
+DEFAULT_CONFIG = {'champion': None, 'candidate': None, 'candidate_percent': 0, 'shadow': False}
+
+
+def read_config(bundle_dir) -> Dict[str, Any]:
+    """The registry settings in ``bundle_dir``, with defaults for missing keys"""
+    path = os.path.join(bundle_dir, REGISTRY_FILE)
+    if not os.path.exists(path):
+        return dict(DEFAULT_CONFIG)
+    with open(path) as handle:
+        config = json.load(handle)
+    return {key: config.get(key, default) for key, default in DEFAULT_CONFIG.items()}
+
+
+def write_config(bundle_dir, config: Dict[str, Any]) -> None:
+    """Replace the registry settings atomically; running processes pick them up"""
+    os.makedirs(bundle_dir, exist_ok=True)
+    staged = os.path.join(bundle_dir, f'.{REGISTRY_FILE}.tmp')
+    with open(staged, 'w') as handle:
+        json.dump(config, handle, indent=2)
+    os.replace(staged, os.path.join(bundle_dir, REGISTRY_FILE))
+
+
+def bundle_path(bundle_dir, version: str) -> str:
+    if not version or os.path.basename(version) != version or version.startswith('.'):
+        raise ValueError(f'Invalid bundle version: {version!r}')
+    return os.path.join(bundle_dir, version)
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _bucket(text: str) -> int:
+    return zlib.crc32((text or '').encode('utf-8', 'replace')) % 100
+
+
+class Deployment:
+    """The engines one process serves; replaced as a whole, never modified"""
+
+    def __init__(self, champion: LocalModelEngine, candidate: Optional[LocalModelEngine] = None,
+                 candidate_percent: int = 0, shadow: bool = False):
+        self.champion = champion
+        self.candidate = candidate
+        self.candidate_percent = candidate_percent if candidate else 0
+        self.shadow = shadow and candidate is not None
+
+    def describe(self) -> str:
+        description = f'champion {self.champion.version or INSTALLED}'
+        if self.candidate:
+            modes = [f'{self.candidate_percent}% of traffic'] + (['shadow'] if self.shadow else [])
+            description += f', candidate {self.candidate.version} ({", ".join(modes)})'
+        return description
+
+
+class ShadowStats:
+    """Agreement and latency of the candidate against the champion on shadowed articles"""
+
+    def __init__(self, log_every: int = 100, window: int = 1000):
+        self.log_every = log_every
+        self.window = window
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, pair):
+        self.pair = pair
+        self.compared = self.agreed = self.failed = self.dropped = 0
+        self.champion_latency = deque(maxlen=self.window)
+        self.candidate_latency = deque(maxlen=self.window)
+
+    def record(self, deployment: Deployment, champion_result, candidate_result,
+               champion_latency: float, candidate_latency: float) -> None:
+        pair = (deployment.champion.version, deployment.candidate.version)
+        with self._lock:
+            if pair != self.pair:
+                self._reset(pair)
+            if candidate_result.get('error'):
+                self.failed += 1
+                return
+            self.compared += 1
+            self.agreed += candidate_result['prediction'] == champion_result['prediction']
+            self.champion_latency.append(champion_latency)
+            self.candidate_latency.append(candidate_latency)
+            if self.compared % self.log_every == 0:
+                print(self.summary())
+
+    def drop(self) -> None:
+        with self._lock:
+            self.dropped += 1
+
+    def summary(self) -> str:
+        champion, candidate = self.pair or (None, None)
+        if not self.compared:
+            return f'Shadow {candidate}: no articles compared yet'
+
+        def percentiles(samples):
+            p50, p95 = np.percentile(np.asarray(samples) * 1000, [50, 95])
+            return f'{p50:.1f}/{p95:.1f} ms'
+
+        return (
+            f'Shadow {candidate} vs {champion or INSTALLED}: '
+            f'{self.agreed / self.compared:.1%} agreement over {self.compared} articles; '
+            f'p50/p95 latency champion {percentiles(self.champion_latency)}, '
+            f'candidate {percentiles(self.candidate_latency)}; '
+            f'{self.failed} failed, {self.dropped} dropped'
+        )
+
+
+class ModelRegistry:
+    """Routes local predictions between the champion and candidate and hot-swaps them.
+
+    It answers the same calls as LocalModelEngine (``available``,
+    ``predict``, ``predict_many``), so the verifier can hold it in place of
+    a single engine. Batches always go to the champion.
+    """
+
+    def __init__(self, model_dir=None, bundle_dir=None, poll_seconds: float = 5,
+                 shadow_queue_size: int = 1000, shadow_log_every: int = 100):
+        self.model_dir = str(model_dir or settings.ML_MODEL_DIR)
+        self.bundle_dir = str(bundle_dir or settings.ML_BUNDLE_DIR)
+        self.poll_seconds = poll_seconds
+        self.shadow_stats = ShadowStats(log_every=shadow_log_every)
+        self._deployment = None
+        self._engines = {}
+        self._signature = None
+        self._next_check = 0.0
+        self._reloading = False
+        self._build_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._shadow_queue = queue.Queue(maxsize=shadow_queue_size)
+        self._shadow_thread = None
+
+    def _watched_signature(self):
+        return (_stat(os.path.join(self.bundle_dir, REGISTRY_FILE)),
+                _stat(os.path.join(self.model_dir, MANIFEST_FILE)))
+
+    def _engine_for(self, version, load: bool):
+        if version in (None, INSTALLED):
+            directory = self.model_dir
+            key = (directory, _stat(os.path.join(directory, MANIFEST_FILE)))
+        else:
+            directory = bundle_path(self.bundle_dir, version)
+            key = (directory, None)  # bundles are never modified in place
+
+        engine = self._engines.get(key)
+        if engine is None or engine.load_error:
+            if directory != self.model_dir:
+                # Imported here: training pulls in the training-only estimators
+                from .training import verify_bundle
+
+                if not os.path.isdir(directory):
+                    raise ValueError(f'No bundle {version} in {self.bundle_dir}')
+                corrupt = verify_bundle(directory)
+                if corrupt:
+                    raise ValueError(f'Bundle {version} does not match its manifest: {", ".join(corrupt)}')
+            engine = LocalModelEngine(model_dir=directory)
+        if load and not engine.available:
+            raise RuntimeError(engine.load_error)
+        return key, engine
+
+    def _build(self, config: Dict[str, Any], load: bool) -> Deployment:
+        engines = {}
+        key, champion = self._engine_for(config['champion'], load)
+        engines[key] = champion
+        candidate = None
+        if config['candidate']:
+            key, candidate = self._engine_for(config['candidate'], load)
+            engines[key] = candidate
+        self._engines = engines
+        percent = min(max(int(config['candidate_percent'] or 0), 0), 100)
+        return Deployment(champion, candidate, percent, bool(config['shadow']))
+
+    def _current(self) -> Deployment:
+        if self._deployment is None:
+            with self._build_lock:
+                if self._deployment is None:
+                    self._signature = self._watched_signature()
+                    try:
+                        deployment = self._build(read_config(self.bundle_dir), load=False)
+                    except Exception as e:
+                        print(f'Model registry: {e}; serving the installed models')
+                        deployment = Deployment(self._engine_for(INSTALLED, load=False)[1])
+                    self._deployment = deployment
+                    self._next_check = time.monotonic() + self.poll_seconds
+        return self._deployment
+
+    def refresh(self) -> None:
+        """Start a background reload if the watched files changed since the last one"""
+        # The first deployment is built from the files as they are then
+        if self._deployment is None or time.monotonic() < self._next_check or self._reloading:
+            return
+        self._next_check = time.monotonic() + self.poll_seconds
+        if self._watched_signature() == self._signature:
+            return
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self.reload, name='model-registry-reload', daemon=True).start()
+
+    def reload(self) -> Optional[Deployment]:
+        """Load the configured engines and swap them in; keeps the old ones on failure"""
+        try:
+            with self._build_lock:
+                signature = self._watched_signature()
+                # Not retried until the files change again
+                self._signature = signature
+                try:
+                    deployment = self._build(read_config(self.bundle_dir), load=True)
+                except Exception as e:
+                    print(f'Model registry reload failed, keeping the current models: {e}')
+                    return self._deployment
+                self._deployment = deployment
+                print(f'Model registry: serving {deployment.describe()}')
+                return deployment
+        finally:
+            self._reloading = False
+
+    @property
+    def champion(self) -> LocalModelEngine:
+        self.refresh()
+        return self._current().champion
+
+    @property
+    def candidate(self) -> Optional[LocalModelEngine]:
+        self.refresh()
+        return self._current().candidate
+
+    @property
+    def available(self) -> bool:
+        return self.champion.available
+
+    @property
+    def load_error(self) -> Optional[str]:
+        return self.champion.load_error
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """Score one article with the champion or, for its share of traffic, the candidate"""
+        self.refresh()
+        deployment = self._current()
+        candidate = deployment.candidate
+        if candidate is not None and _bucket(text) < deployment.candidate_percent and candidate.available:
+            return self._label(candidate.predict(text), candidate, 'candidate')
+
+        start = time.perf_counter()
+        result = deployment.champion.predict(text)
+        latency = time.perf_counter() - start
+        if deployment.shadow and not result.get('error'):
+            self._shadow(deployment, text, result, latency)
+        return self._label(result, deployment.champion, 'champion')
+
+    def predict_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Score a batch of articles with the champion"""
+        champion = self.champion
+        return [self._label(result, champion, 'champion') for result in champion.predict_many(texts)]
+
+    @staticmethod
+    def _label(result: Dict[str, Any], engine: LocalModelEngine, variant: str) -> Dict[str, Any]:
+        if not result.get('error'):
+            result['model_version'] = engine.version
+            result['model_variant'] = variant
+        return result
+
+    def _shadow(self, deployment: Deployment, text: str, result, latency: float) -> None:
+        try:
+            self._shadow_queue.put_nowait((deployment, text, result, latency))
+        except queue.Full:
+            # Shadow scoring never holds up or piles behind the live traffic
+            self.shadow_stats.drop()
+            return
+        if self._shadow_thread is None:
+            with self._lock:
+                if self._shadow_thread is None:
+                    self._shadow_thread = threading.Thread(
+                        target=self._run_shadow, name='model-shadow', daemon=True
+                    )
+                    self._shadow_thread.start()
+
+    def _run_shadow(self):
+        while True:
+            deployment, text, champion_result, champion_latency = self._shadow_queue.get()
+            try:
+                start = time.perf_counter()
+                candidate_result = deployment.candidate.predict(text)
+                self.shadow_stats.record(deployment, champion_result, candidate_result,
+                                         champion_latency, time.perf_counter() - start)
+            except Exception as e:
+                print(f'Shadow scoring failed: {e}')
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(
+                    poll_seconds=getattr(settings, 'ML_REGISTRY_POLL_SECONDS', 5),
+                    shadow_queue_size=getattr(settings, 'ML_SHADOW_QUEUE_SIZE', 1000),
+                    shadow_log_every=getattr(settings, 'ML_SHADOW_LOG_EVERY', 100),
+                )
+    return _registry
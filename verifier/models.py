@@ -26,28 +26,152 @@ class VerificationResult(models.Model):
     prediction = models.CharField(max_length=20, choices=PREDICTION_CHOICES)
     confidence = models.FloatField(default=0.0)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='Other')
+    # Tier that produced the verdict ('llm', 'local', 'demo', 'reused', ...); blank when unknown
+    source = models.CharField(max_length=20, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     is_bookmarked = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['-created_at']
+        # Every history/dashboard query filters by user and orders newest first
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='verifier_vr_user_created_idx'),
+            models.Index(fields=['user', 'prediction', '-created_at'], name='verifier_vr_user_pred_idx'),
+            models.Index(fields=['user', 'category', '-created_at'], name='verifier_vr_user_cat_idx'),
+            models.Index(fields=['user', 'is_bookmarked', '-created_at'], name='verifier_vr_user_bookmark_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title[:50]} - {self.prediction}"
     
+    @property
+    def content_excerpt(self):
+        """Start of the article; uses the DB-side ``content_head`` annotation when present"""
+        head = getattr(self, 'content_head', None)
+        return head if head is not None else self.content
+
     @property
     def content_preview(self):
-        return self.content[:100] + '...' if len(self.content) > 100 else self.content
+        content = self.content_excerpt
+        return content[:100] + '...' if len(content) > 100 else content
 
 
 class TrendingTopic(models.Model):
     topic = models.CharField(max_length=200, unique=True)
     verification_count = models.IntegerField(default=0)
+    # Time-decayed count over the trending window (see verifier/trending.py)
+    score = models.FloatField(default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-verification_count', '-updated_at']
+        indexes = [
+            models.Index(fields=['-verification_count', '-updated_at'], name='verifier_topic_rank_idx'),
+            models.Index(fields=['-score', '-verification_count'], name='verifier_topic_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.topic} - {self.verification_count} checks"
+
+
+class TrendingTopicBucket(models.Model):
+    """Verifications of a topic within one clock hour"""
+    topic = models.ForeignKey(TrendingTopic, on_delete=models.CASCADE, related_name='buckets')
+    hour = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['topic', 'hour'], name='verifier_unique_topic_hour'),
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='verifier_bucket_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic.topic} @ {self.hour:%Y-%m-%d %H:00} - {self.count}"
+
+
+class VerificationJob(models.Model):
+    """A verification queued for the background workers (see run_verification_workers)"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    title = models.CharField(max_length=500, blank=True)
+    content = models.TextField()
+    category = models.CharField(max_length=20, default='Other')
+    save_to_history = models.BooleanField(default=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    verification_result = models.ForeignKey(
+        VerificationResult, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='verifier_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status}) - {self.user.username}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class ContentSignature(models.Model):
+    """MinHash signature of a verified article (see verifier/near_duplicates.py)"""
+    result = models.OneToOneField(
+        VerificationResult, on_delete=models.CASCADE, primary_key=True, related_name='signature'
+    )
+    signature = models.BinaryField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='verifier_sig_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Signature of result {self.result_id}"
+
+
+class SignatureBand(models.Model):
+    """One LSH band of a ContentSignature; equal keys mark candidate near-duplicates"""
+    signature = models.ForeignKey(ContentSignature, on_delete=models.CASCADE, related_name='bands')
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['key'], name='verifier_band_key_idx'),
+        ]
+
+
+class ApiToken(models.Model):
+    """Bearer token for the JSON API (manage.py create_api_token); only its hash is stored"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='api_tokens')
+    name = models.CharField(max_length=100, blank=True)
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"API token {self.name or self.id} - {self.user.username}"
@@ -0,0 +1,162 @@
+"""
+Near-duplicate detection for submitted articles (MinHash + LSH).
+
+Re-pasted viral stories differ by tracking links, whitespace or a reworded
+headline, so the exact-hash verdict cache misses them. Each verified
+article gets a MinHash signature over word 3-shingles of its
+TextPreprocessor-cleaned text, split into LSH bands whose hashed keys are
+stored in SignatureBand. A lookup hashes the new article's bands, fetches
+the few signatures sharing a key through the ``key`` index (one query, cost
+independent of the number of stored articles), and estimates Jaccard
+similarity from the signatures themselves.
+
+Band and permutation constants are derived from fixed strings, so stored
+keys stay valid across processes and library upgrades. Changing NUM_PERM,
+BANDS or SHINGLE_SIZE requires ``manage.py rebuild_duplicate_index``.
+"""
+import hashlib
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .ml_utils import TextPreprocessor
+from .models import ContentSignature, SignatureBand
+
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: candidates above ~0.7 Jaccard similarity
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MAX_CANDIDATES = 50
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+def _constants(label, count, modulus):
+    values = []
+    for i in range(count):
+        digest = hashlib.blake2b(f'{label}-{i}'.encode(), digest_size=8).digest()
+        values.append(int.from_bytes(digest, 'little') % modulus)
+    return np.array(values, dtype=np.uint64)
+
+
+# Universal hash family h(x) = (a*x + b) mod p, one per permutation
+_PERM_A = _constants('minhash-a', NUM_PERM, (1 << 31) - 2) + np.uint64(1)
+_PERM_B = _constants('minhash-b', NUM_PERM, (1 << 31) - 1)
+# Odd multipliers combining a band's rows into one 64-bit key
+_BAND_MULT = _constants('lsh-row', ROWS, 1 << 64) | np.uint64(1)
+_BAND_SALT = _constants('lsh-band', BANDS, 1 << 64)
+_SHINGLE_MULT = _constants('shingle', SHINGLE_SIZE, 1 << 32) | np.uint64(1)
+
+_preprocessor = TextPreprocessor()
+
+
+def signature_text(title, content):
+    """Text that identifies an article: headline (if a real one) plus body"""
+    title = (title or '').strip()
+    content = content or ''
+    # History titles default to the start of the article; don't count it twice
+    if title and content.startswith(title.rstrip('.').rstrip()):
+        title = ''
+    return f"{title} {content}"
+
+
+def minhash(text):
+    """``NUM_PERM`` uint32 MinHash values for ``text``, or None if it has no words"""
+    words = _preprocessor.clean_text(text).split()
+    if not words:
+        return None
+    tokens = np.fromiter(
+        (zlib.crc32(word.encode()) for word in words), dtype=np.uint64, count=len(words)
+    )
+    if len(tokens) < SHINGLE_SIZE:
+        tokens = np.concatenate([tokens, np.zeros(SHINGLE_SIZE - len(tokens), dtype=np.uint64)])
+
+    # Hash each run of SHINGLE_SIZE words into one 32-bit shingle id
+    windows = np.lib.stride_tricks.sliding_window_view(tokens, SHINGLE_SIZE)
+    shingles = np.unique((windows * _SHINGLE_MULT).sum(axis=1) & np.uint64(0xFFFFFFFF))
+
+    hashed = (_PERM_A[:, None] * (shingles[None, :] % _MERSENNE_PRIME) + _PERM_B[:, None])
+    return (hashed % _MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature):
+    """One signed 64-bit LSH key per band"""
+    rows = signature.astype(np.uint64).reshape(BANDS, ROWS)
+    keys = (rows * _BAND_MULT[None, :]).sum(axis=1) + _BAND_SALT
+    return keys.view(np.int64).tolist()
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(signature == other)) / NUM_PERM
+
+
+def index_signatures(items):
+    """Store signatures for ``(result, title, content)`` triples; returns how many"""
+    signatures, bands = [], []
+    for result, title, content in items:
+        signature = minhash(signature_text(title, content))
+        if signature is None:
+            continue
+        signatures.append(ContentSignature(
+            result_id=result.id, signature=signature.tobytes(), created_at=result.created_at,
+        ))
+        bands.extend(
+            SignatureBand(signature_id=result.id, key=key) for key in band_keys(signature)
+        )
+    if signatures:
+        with transaction.atomic():
+            ContentSignature.objects.bulk_create(signatures, batch_size=1000)
+            SignatureBand.objects.bulk_create(bands, batch_size=5000)
+    return len(signatures)
+
+
+def find_near_duplicate(text, threshold=None, max_age_days=None):
+    """Most similar recent verified article as ``(result_id, similarity)``, or None"""
+    threshold = threshold if threshold is not None else getattr(
+        settings, 'NEAR_DUPLICATE_THRESHOLD', 0.85
+    )
+    max_age_days = max_age_days if max_age_days is not None else getattr(
+        settings, 'NEAR_DUPLICATE_MAX_AGE_DAYS', 30
+    )
+    signature = minhash(text)
+    if signature is None:
+        return None
+
+    candidates = (
+        ContentSignature.objects
+        .filter(bands__key__in=band_keys(signature),
+                created_at__gte=timezone.now() - timedelta(days=max_age_days))
+        .order_by('-created_at')
+        .values_list('result_id', 'signature')[:MAX_CANDIDATES * BANDS]
+    )
+
+    best = None
+    seen = set()
+    for result_id, stored in candidates:
+        if result_id in seen:
+            continue
+        seen.add(result_id)
+        score = similarity(signature, np.frombuffer(bytes(stored), dtype=np.uint32))
+        if score >= threshold and (best is None or score > best[1]):
+            best = (result_id, score)
+        if len(seen) >= MAX_CANDIDATES:
+            break
+    return best
+
+
+def prune_signatures(max_age_days=None):
+    """Drop signatures too old to be reused; returns the number deleted"""
+    max_age_days = max_age_days if max_age_days is not None else getattr(
+        settings, 'NEAR_DUPLICATE_MAX_AGE_DAYS', 30
+    )
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    old = ContentSignature.objects.filter(created_at__lt=cutoff)
+    SignatureBand.objects.filter(signature__in=old).delete()
+    deleted, _ = old.delete()
+    return deleted
@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination for verification history.
+
+Pages are addressed by an opaque cursor holding the (created_at, id) of the
+row at the page boundary. Each page is a single index range scan of
+``per_page + 1`` rows, so page 5000 costs the same as page 1, and no
+COUNT(*) is needed to render it.
+"""
+import base64
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj, direction):
+    raw = f"{direction}|{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+class KeysetPage:
+    """One page of results plus cursors to its neighbours"""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.object_list[-1], 'next') if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor(self.object_list[0], 'prev') if self.has_previous else None
+
+
+class KeysetPaginator:
+    """Paginate a queryset newest-first on (created_at, id)"""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        """Page after/before ``cursor``; the first page for a missing or bad cursor"""
+        try:
+            direction, created_at, pk = decode_cursor(cursor) if cursor else (None, None, None)
+        except InvalidCursor:
+            direction = None
+
+        if direction == 'prev':
+            rows = list(
+                self.queryset
+                .filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                .order_by('created_at', 'id')[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset.order_by('-created_at', '-id')
+        if direction == 'next':
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next=has_next, has_previous=direction == 'next')
+
+
+class KnownCountPaginator(Paginator):
+    """Regular Paginator that uses a precomputed (possibly approximate) count"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
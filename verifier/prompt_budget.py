@@ -0,0 +1,134 @@
+"""
+Token budgeting for the article text sent to the LLM.
+
+A pasted article can be far larger than the model's context window, and
+every prompt token adds latency and cost. Before a request is built the
+article is measured with a local token estimate and, if it is over budget,
+shortened by one of two strategies:
+
+``head_tail``
+    Keep the opening (70% of the budget) and the ending, with a marker for
+    the words left out. Cheap and order-preserving.
+``key_sentences``
+    Always keep the lead sentences, then add the sentences with the highest
+    TF-IDF keyword weight (per token, via the trending-topic
+    KeywordExtractor) until the budget is spent, in their original order.
+    Falls back to ``head_tail`` for text without sentence breaks.
+
+The budget is the smaller of LLM_ARTICLE_TOKEN_BUDGET and what is left of
+LLM_CONTEXT_TOKENS after the prompt template and the completion.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+import numpy as np
+from django.conf import settings
+
+from .keywords import get_keyword_extractor
+
+
+STRATEGIES = ('head_tail', 'key_sentences')
+
+# Room left for tokenizer differences between this estimate and the model's
+SAFETY_MARGIN = 256
+MIN_BUDGET = 200
+LEAD_SENTENCES = 2
+HEAD_SHARE = 0.7
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_GAP = '[...]'
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|(?<=[.!?]["\')\]])\s+|\n\s*\n')
+
+
+def estimate_tokens(text):
+    """Approximate BPE token count: one per punctuation mark, one per word
+    plus one per further eight characters (long words split into pieces)."""
+    return sum(1 + len(piece) // 8 for piece in _PIECE_RE.findall(text or ''))
+
+
+_GAP_COST = estimate_tokens(_GAP)
+
+
+def article_budget(overhead_tokens=0):
+    """Tokens the article may use, given the rest of the prompt's size"""
+    configured = getattr(settings, 'LLM_ARTICLE_TOKEN_BUDGET', 3000)
+    room = (getattr(settings, 'LLM_CONTEXT_TOKENS', 8192)
+            - getattr(settings, 'LLM_MAX_COMPLETION_TOKENS', 500)
+            - overhead_tokens - SAFETY_MARGIN)
+    return max(MIN_BUDGET, min(configured, room))
+
+
+def head_tail(text, budget):
+    words = text.split()
+    costs = [estimate_tokens(word) for word in words]
+    if sum(costs) <= budget:
+        return text
+    budget -= estimate_tokens('[... 100000 words omitted ...]')
+    head = bisect_right(list(accumulate(costs)), budget * HEAD_SHARE)
+    remaining = budget - sum(costs[:head])
+    tail = bisect_right(list(accumulate(reversed(costs[head:]))), remaining)
+    omitted = len(words) - head - tail
+    parts = [' '.join(words[:head]), f'[... {omitted} words omitted ...]',
+             ' '.join(words[len(words) - tail:]) if tail else '']
+    return '\n\n'.join(part for part in parts if part)
+
+
+def key_sentences(text, budget):
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+    if len(sentences) <= LEAD_SENTENCES:
+        return head_tail(text, budget)
+    costs = np.array([estimate_tokens(sentence) for sentence in sentences])
+    if costs.sum() <= budget:
+        return text
+
+    scores, _ = get_keyword_extractor().score_matrix([''] * len(sentences), sentences)
+    weight = (np.asarray(scores.sum(axis=1)).ravel() if scores is not None
+              else np.zeros(len(sentences)))
+    density = weight / np.sqrt(np.maximum(costs, 1))
+
+    keep = np.zeros(len(sentences), dtype=bool)
+    spent = 0
+    # The lead carries who/what/when in news writing; rank the rest
+    order = list(range(LEAD_SENTENCES)) + [
+        int(i) for i in np.argsort(-density[LEAD_SENTENCES:], kind='stable') + LEAD_SENTENCES
+    ]
+    for index in order:
+        cost = costs[index] + _GAP_COST  # room for a gap marker
+        if spent + cost <= budget:
+            keep[index] = True
+            spent += cost
+    if not keep.any():
+        return head_tail(text, budget)
+
+    parts, previous = [], -1
+    for index in np.flatnonzero(keep):
+        if previous >= 0 and index != previous + 1:
+            parts.append(_GAP)
+        parts.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(_GAP)
+    return ' '.join(parts)
+
+
+def fit_to_budget(text, budget=None, strategy=None):
+    """Shorten ``text`` to ``budget`` tokens.
+
+    Returns ``(text, info)`` where ``info`` records the original and final
+    token estimates, the budget, the strategy and whether anything was cut.
+    """
+    budget = budget if budget is not None else article_budget()
+    strategy = strategy or getattr(settings, 'LLM_TRUNCATION_STRATEGY', 'key_sentences')
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown truncation strategy {strategy!r}; expected one of {STRATEGIES}")
+
+    original = estimate_tokens(text)
+    info = {'original_tokens': original, 'tokens': original, 'budget': budget,
+            'strategy': strategy, 'truncated': False}
+    if original <= budget:
+        return text, info
+
+    shortened = key_sentences(text, budget) if strategy == 'key_sentences' else head_tail(text, budget)
+    info.update(tokens=estimate_tokens(shortened), truncated=True)
+    return shortened, info
@@ -0,0 +1,210 @@
+"""
+Token-bucket admission control for verifications.
+
+Two kinds of bucket guard the upstream quota:
+
+* a per-user bucket (VERIFY_USER_RATE_PER_MINUTE / VERIFY_USER_BURST),
+  checked when a verification request arrives. Over the limit, the request is
+  refused at once with 429 and ``Retry-After``, so one user cannot starve
+  everyone else;
+* a global bucket per LLM provider (``rpm`` in LLM_PROVIDERS, default
+  LLM_UPSTREAM_RATE_PER_MINUTE), taken by ProviderRouter before every
+  upstream call. Set a little under the provider's quota, it keeps the
+  provider from answering 429. A call that finds the bucket empty reserves
+  the next free token and waits for it, up to LLM_UPSTREAM_MAX_WAIT. The
+  reservations form a queue, since tokens may go negative; a longer wait
+  raises RateLimited.
+
+Buckets live in a BucketStore. MemoryBucketStore is per process.
+CacheBucketStore keeps the state in a Django cache, so every web and worker
+process shares one budget; it is selected with RATE_LIMIT_CACHE_ALIAS.
+Point that alias at redis, memcached or DatabaseCache: their ``add`` is
+atomic, which the store uses as a lock.
+"""
+import math
+import threading
+import time
+import uuid
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class RateLimited(Exception):
+    """Raised when a bucket cannot admit a request soon enough"""
+
+    def __init__(self, retry_after: float, scope: str = ''):
+        self.retry_after = retry_after
+        self.scope = scope
+        super().__init__(f'{scope or "Rate"} limit exceeded; retry in {retry_after:.1f}s')
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds for the ``Retry-After`` header"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+    @property
+    def message(self) -> str:
+        """Explanation for the user"""
+        seconds = self.retry_after_header
+        if self.scope == 'user':
+            return f'You are sending verification requests too quickly. Please try again in {seconds} seconds.'
+        return f'The verification service is at capacity. Please try again in {seconds} seconds.'
+
+
+State = Optional[Tuple[float, float]]  # (tokens, updated_at)
+
+
+class MemoryBucketStore:
+    """Bucket state in this process"""
+
+    def __init__(self):
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: str, apply: Callable[[State], Tuple[State, object]], ttl: int):
+        with self._lock:
+            state, outcome = apply(self._state.get(key))
+            self._state[key] = state
+            return outcome
+
+
+class CacheBucketStore:
+    """Bucket state in a Django cache shared between processes.
+
+    Without the lock, concurrent read-modify-writes would hand out the same
+    tokens twice, so a caller that cannot get it is refused with
+    RateLimited rather than let through.
+    """
+
+    LOCK_TIMEOUT = 2
+    # Outlasts a lock left behind by a holder that died
+    LOCK_WAIT = 3.0
+
+    def __init__(self, alias: str, prefix: str = 'ratelimit'):
+        self.alias = alias
+        self.prefix = prefix
+
+    def update(self, key: str, apply: Callable[[State], Tuple[State, object]], ttl: int):
+        cache = caches[self.alias]
+        key = f'{self.prefix}:{key}'
+        lock_key = f'{key}:lock'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_WAIT
+        # cache.add is atomic on shared backends; a holder that died leaves a
+        # lock that expires after LOCK_TIMEOUT
+        while not cache.add(lock_key, token, timeout=self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise RateLimited(self.LOCK_TIMEOUT)
+            time.sleep(0.002)
+        try:
+            state, outcome = apply(cache.get(key))
+            cache.set(key, state, timeout=ttl)
+        finally:
+            # Our lock may have expired and been taken by another process
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        return outcome
+
+
+class TokenBucket:
+    """``rate`` tokens per second up to ``capacity``, kept in ``store``"""
+
+    def __init__(self, name: str, rate: float, capacity: float, store=None):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.store = store or MemoryBucketStore()
+        # Long enough for an idle bucket to refill completely
+        self.ttl = int(self.capacity / rate) + 60
+        self._counters = {'admitted': 0, 'waited': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str = '', cost: float = 1.0, max_wait: float = 0.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens if they are free within ``max_wait`` seconds.
+
+        Returns ``(True, wait)`` with the seconds to wait before proceeding,
+        or ``(False, retry_after)`` without taking anything.
+        """
+        cost = min(cost, self.capacity)
+        now = time.time()
+
+        def apply(state):
+            tokens, updated = state if state is not None else (self.capacity, now)
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            wait = max(0.0, (cost - tokens) / self.rate)
+            if wait > max_wait:
+                return (tokens, now), (False, wait)
+            return (tokens - cost, now), (True, wait)
+
+        try:
+            granted, wait = self.store.update(f'{self.name}:{key}', apply, self.ttl)
+        except RateLimited as e:
+            # The shared state is unreachable: refuse rather than overspend
+            granted, wait = False, e.retry_after
+        self._count('rejected' if not granted else 'waited' if wait > 0 else 'admitted')
+        return granted, wait
+
+    def acquire(self, key: str = '', cost: float = 1.0, max_wait: float = 0.0) -> float:
+        """Take tokens, sleeping up to ``max_wait``; raises RateLimited otherwise"""
+        granted, wait = self.reserve(key, cost, max_wait)
+        if not granted:
+            raise RateLimited(wait, self.name)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+def get_bucket_store():
+    alias = getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', None)
+    return CacheBucketStore(alias) if alias else MemoryBucketStore()
+
+
+def upstream_bucket(name: str, per_minute: Optional[float]) -> Optional[TokenBucket]:
+    """The global bucket for one LLM provider, or None if it is unlimited"""
+    if not per_minute:
+        return None
+    return TokenBucket(
+        f'upstream:{name}', per_minute / 60.0,
+        getattr(settings, 'LLM_UPSTREAM_BURST', 5), get_bucket_store(),
+    )
+
+
+_user_bucket = None
+_user_bucket_lock = threading.Lock()
+
+
+def get_user_bucket() -> Optional[TokenBucket]:
+    """The per-user verification bucket, or None when per-user limits are off"""
+    global _user_bucket
+    per_minute = getattr(settings, 'VERIFY_USER_RATE_PER_MINUTE', 0)
+    if not per_minute:
+        return None
+    if _user_bucket is None:
+        with _user_bucket_lock:
+            if _user_bucket is None:
+                _user_bucket = TokenBucket(
+                    'user', per_minute / 60.0,
+                    getattr(settings, 'VERIFY_USER_BURST', 10), get_bucket_store(),
+                )
+    return _user_bucket
+
+
+def check_user_rate(user, cost: int = 1) -> None:
+    """Admit ``cost`` verifications for ``user`` or raise RateLimited.
+
+    A batch larger than the burst takes the whole bucket rather than being
+    refused outright; the upstream buckets still pace its LLM calls.
+    """
+    bucket = get_user_bucket()
+    if bucket is not None:
+        bucket.acquire(str(user.pk), cost=cost)
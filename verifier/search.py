@@ -0,0 +1,132 @@
+"""
+Full-text search over verification history.
+
+SQLite uses an external-content FTS5 table over VerificationResult's title
+and content, ranked with bm25(). PostgreSQL uses a GIN index on the
+english tsvector of the same columns, ranked with ts_rank. Other backends
+fall back to an unindexed ``icontains`` filter. Matched rows are annotated
+with ``search_rank`` and a ``search_snippet`` whose hits are wrapped in
+SNIPPET_START / SNIPPET_END markers (rendered by the ``highlight_snippet``
+template filter).
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+
+FTS_TABLE = 'verifier_verificationresult_fts'
+
+# Control characters never appear in stored text, so they survive escaping
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+# Must match the expression SearchVector('title', 'content', config='english') compiles to
+PG_INDEX_NAME = 'verifier_vr_search_gin_idx'
+PG_VECTOR_SQL = (
+    "to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(content, ''))"
+)
+
+
+_fts_table_exists = False
+
+
+def fts_available():
+    """Whether the current database has a full-text index we can use"""
+    global _fts_table_exists
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        # Only cache the positive answer: the table appears when migrations run
+        if not _fts_table_exists:
+            _fts_table_exists = FTS_TABLE in connection.introspection.table_names()
+        return _fts_table_exists
+    return False
+
+
+def _fts5_query(query):
+    """Turn free text into a safe FTS5 query: every word, prefix-matched"""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def apply_search(queryset, query):
+    """Filter a VerificationResult queryset by ``query``, best matches first"""
+    if connection.vendor == 'postgresql':
+        return _postgres_search(queryset, query)
+    if connection.vendor == 'sqlite' and fts_available():
+        return _sqlite_search(queryset, query)
+    return queryset.filter(Q(title__icontains=query) | Q(content__icontains=query))
+
+
+def _sqlite_search(queryset, query):
+    match = _fts5_query(query)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={
+            # bm25() is lower-is-better; negate so higher means more relevant
+            'search_rank': f'-bm25({FTS_TABLE}, 2.0, 1.0)',
+            'search_snippet': f"snippet({FTS_TABLE}, 1, %s, %s, '…', 24)",
+        },
+        select_params=[SNIPPET_START, SNIPPET_END],
+    ).order_by('-search_rank', '-created_at')
+
+
+def _postgres_search(queryset, query):
+    from django.contrib.postgres.search import (
+        SearchHeadline, SearchQuery, SearchRank, SearchVector,
+    )
+
+    vector = SearchVector('title', 'content', config='english')
+    search_query = SearchQuery(query, config='english', search_type='websearch')
+    return (
+        queryset
+        .annotate(search_vector=vector)
+        .filter(search_vector=search_query)
+        .annotate(
+            search_rank=SearchRank(vector, search_query),
+            search_snippet=SearchHeadline(
+                'content', search_query, config='english',
+                start_sel=SNIPPET_START, stop_sel=SNIPPET_END, max_words=35, min_words=15,
+            ),
+        )
+        .order_by('-search_rank', '-created_at')
+    )
+
+
+def index_results(results):
+    """Add newly created VerificationResult rows to the SQLite FTS index"""
+    if connection.vendor != 'sqlite' or not results or not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (%s, %s, %s)',
+            [(result.id, result.title, result.content) for result in results],
+        )
+
+
+def unindex_result(result):
+    """Remove a deleted row from the SQLite FTS index (needs its old values)"""
+    if connection.vendor != 'sqlite' or not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', %s, %s, %s)",
+            [result.id, result.title, result.content],
+        )
+
+
+def rebuild_index():
+    """Regenerate the full-text index from the VerificationResult table"""
+    if connection.vendor == 'sqlite' and fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'REINDEX INDEX {PG_INDEX_NAME}')
+
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import VerificationResult
+from .search import index_results, unindex_result
+
+
+# bulk_create() sends no signals, so save_verification_results() indexes its rows itself
+
+@receiver(post_save, sender=VerificationResult)
+def index_verification_result(sender, instance, created, **kwargs):
+    if created:
+        index_results([instance])
+
+
+@receiver(post_delete, sender=VerificationResult)
+def unindex_verification_result(sender, instance, **kwargs):
+    unindex_result(instance)
@@ -0,0 +1,154 @@
+"""
+Server-sent events: reading the LLM's token stream and relaying it.
+
+The upstream provider speaks the OpenAI-compatible ``stream: true`` protocol:
+``data: {json chunk}`` lines carrying ``choices[0].delta.content``, ended by
+``data: [DONE]``. AnalysisStreamParser follows the JSON verdict the model is
+writing and yields the decoded text of its ``"analysis"`` string as the
+characters arrive, so the browser can show the explanation while the rest
+of the completion is still being generated.
+"""
+import json
+
+
+def iter_sse_data(lines):
+    """Yield the ``data:`` payloads of an SSE line stream up to ``[DONE]``"""
+    buffer = []
+    for line in lines:
+        if line is None:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line:
+            # A blank line ends an event
+            if buffer:
+                payload = '\n'.join(buffer)
+                buffer = []
+                if payload == '[DONE]':
+                    return
+                yield payload
+            continue
+        if line.startswith(':'):
+            continue  # comment / keep-alive
+        if line.startswith('data:'):
+            buffer.append(line[5:].lstrip(' '))
+    if buffer and '\n'.join(buffer) != '[DONE]':
+        yield '\n'.join(buffer)
+
+
+def iter_completion_deltas(lines):
+    """Text deltas from an OpenAI-compatible chat completion stream"""
+    for payload in iter_sse_data(lines):
+        try:
+            chunk = json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+        choices = chunk.get('choices') or [{}]
+        delta = (choices[0].get('delta') or {}).get('content')
+        if delta:
+            yield delta
+
+
+def sse_event(event, data):
+    """One server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class AnalysisStreamParser:
+    """Incrementally decode the ``"analysis"`` string out of a streamed JSON object"""
+
+    KEY = '"analysis"'
+
+    # States
+    SEEKING, BEFORE_VALUE, IN_VALUE, DONE = range(4)
+
+    def __init__(self):
+        self.text = ''
+        self.state = self.SEEKING
+        self._scan_from = 0
+        self._value_start = 0
+        self._pending_escape = ''
+        self._high_surrogate = ''
+
+    def feed(self, delta):
+        """Add streamed text; returns newly decoded analysis characters (may be '')"""
+        self.text += delta
+        out = []
+        while True:
+            if self.state == self.SEEKING:
+                index = self.text.find(self.KEY, self._scan_from)
+                if index < 0:
+                    # Keep enough tail to match a key split across deltas
+                    self._scan_from = max(0, len(self.text) - len(self.KEY))
+                    break
+                self._scan_from = index + len(self.KEY)
+                self.state = self.BEFORE_VALUE
+            elif self.state == self.BEFORE_VALUE:
+                rest = self.text[self._scan_from:].lstrip()
+                if not rest:
+                    break
+                if rest[0] == ':':
+                    self._scan_from = len(self.text) - len(rest) + 1
+                    continue
+                if rest[0] != '"':
+                    # "analysis" was a value or a non-string; keep looking
+                    self.state = self.SEEKING
+                    continue
+                self._scan_from = len(self.text) - len(rest) + 1
+                self.state = self.IN_VALUE
+            elif self.state == self.IN_VALUE:
+                out.append(self._read_string())
+                break
+            else:
+                break
+        return ''.join(out)
+
+    def _read_string(self):
+        out = []
+        text = self.text
+        i = self._scan_from
+        while i < len(text):
+            char = text[i]
+            if self._pending_escape or char == '\\':
+                escape = self._pending_escape + char if self._pending_escape else char
+                if len(escape) < 2 or (escape[1] == 'u' and len(escape) < 6):
+                    self._pending_escape = escape
+                    i += 1
+                    continue
+                self._pending_escape = ''
+                if escape[1] == 'u':
+                    try:
+                        out.append(self._decode_unit(int(escape[2:6], 16)))
+                    except ValueError:
+                        pass
+                else:
+                    out.append(self._flush_surrogate() + _ESCAPES.get(escape[1], escape[1]))
+            elif char == '"':
+                out.append(self._flush_surrogate())
+                self.state = self.DONE
+                i += 1
+                break
+            else:
+                out.append(self._flush_surrogate() + char)
+            i += 1
+        self._scan_from = i
+        return ''.join(out)
+
+    def _decode_unit(self, code):
+        """A ``\\uXXXX`` code unit; characters outside the BMP arrive as two"""
+        if 0xD800 <= code < 0xDC00:
+            pending, self._high_surrogate = self._flush_surrogate(), chr(code)
+            return pending
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate:
+            high, self._high_surrogate = ord(self._high_surrogate), ''
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return self._flush_surrogate() + chr(code)
+
+    def _flush_surrogate(self):
+        # An unpaired surrogate cannot be encoded; show the replacement character
+        pending, self._high_surrogate = self._high_surrogate, ''
+        return '\ufffd' if pending else ''
+
@@ -0,0 +1,16 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from verifier.search import SNIPPET_START, SNIPPET_END
+
+register = template.Library()
+
+
+@register.filter
+def highlight_snippet(snippet):
+    """Escape a search snippet and wrap its matched terms in <mark>"""
+    if not snippet:
+        return ''
+    html = escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+    return mark_safe(html)
@@ -0,0 +1,80 @@
+"""In-process HTTP stubs for the upstream-facing tests"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """Local HTTP server on a free port, running ``handler`` on a daemon thread"""
+
+    def __init__(self, handler):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def scripted_handler(script, default=(200, {'ok': True})):
+    """Handler answering POSTs with ``(status, body[, delay])`` entries from ``script`` in order.
+
+    Once the script runs out every request gets ``default``. The paths
+    requested are appended to ``handler.requests``.
+    """
+    script = list(script)
+    lock = threading.Lock()
+
+    class ScriptedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        requests = []
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            with lock:
+                ScriptedHandler.requests.append(self.path)
+                entry = script.pop(0) if script else default
+            status, body, delay = (tuple(entry) + (0.0,))[:3]
+            time.sleep(delay)
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScriptedHandler
+
+
+def chunked_handler(chunks, content_type='text/event-stream', delay=0.0):
+    """Handler answering every POST with ``chunks`` (bytes) as separate HTTP chunks.
+
+    Each chunk is flushed on its own, so the client sees the body split at
+    exactly those byte offsets (give ``delay`` to keep them apart on the wire).
+    """
+
+    class ChunkedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in chunks:
+                if chunk:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                    self.wfile.flush()
+                    time.sleep(delay)
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, format, *args):
+            pass
+
+    return ChunkedHandler
@@ -0,0 +1,72 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from verifier import views
+from verifier.api_auth import create_token
+
+
+def fake_verdict(text, title='', category=None):
+    return {'prediction': 'True', 'confidence': 0.9, 'analysis': category, 'source': 'local', 'error': None}
+
+
+class BatchVerifyApiTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('pipeline', password='secret')
+        self.client = Client(enforce_csrf_checks=True)
+        self.url = reverse('verifier:batch_verify_api')
+        patcher = mock.patch.object(views.detector, 'verify_news', side_effect=fake_verdict)
+        self.verify_news = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Keep the fake verdicts out of the process-wide trending buffer
+        patcher = mock.patch.object(views, 'record_trending')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, articles, **headers):
+        body = json.dumps({'articles': articles, 'save_to_history': False})
+        return self.client.post(self.url, body, content_type='application/json', headers=headers)
+
+    def test_anonymous_gets_401_json_not_a_redirect(self):
+        response = self.post([{'content': 'Some article text here.'}])
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+    def test_invalid_token_is_rejected(self):
+        response = self.post([{'content': 'Some article text here.'}], Authorization='Bearer nope')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_works_without_session_or_csrf(self):
+        key = create_token(self.user, 'ingest')
+        response = self.post([{'content': 'Some article text here.'}], Authorization=f'Bearer {key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['prediction'], 'True')
+        self.assertIsNotNone(self.user.api_tokens.get().last_used_at)
+
+    def test_session_requests_still_need_csrf(self):
+        self.client.force_login(self.user)
+        response = self.post([{'content': 'Some article text here.'}])
+        self.assertEqual(response.status_code, 403)
+
+    def test_same_content_in_different_categories_is_verified_per_category(self):
+        key = create_token(self.user)
+        article = 'The same article body, submitted twice.'
+        response = self.post([
+            {'content': article, 'category': 'Health'},
+            {'content': article, 'category': 'Sports'},
+            {'content': article, 'category': 'Health'},
+        ], Authorization=f'Bearer {key}')
+        results = response.json()['results']
+        self.assertEqual(self.verify_news.call_count, 2)
+        self.assertEqual([r['analysis'] for r in results], ['Health', 'Sports', 'Health'])
+        self.assertEqual([r['duplicate'] for r in results], [False, False, True])
+
+    def test_tokens_cannot_be_added_in_the_admin(self):
+        admin = User.objects.create_superuser('admin', password='secret')
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get(reverse('admin:verifier_apitoken_add')).status_code, 403)
+        self.assertContains(self.client.get(reverse('admin:verifier_apitoken_changelist')), 'create_api_token')
@@ -0,0 +1,113 @@
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from verifier.http_client import CircuitBreaker, CircuitOpenError, PooledHTTPClient
+from verifier.tests.stubs import StubServer, scripted_handler
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def test_opens_after_threshold_then_probes_and_closes(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only the one probe is let through
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+
+class PooledHTTPClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+
+    def serve(self, script, **kwargs):
+        handler = scripted_handler(script, **kwargs)
+        server = StubServer(handler)
+        self.servers.append(server)
+        return server.url, handler
+
+    def http_client(self, **kwargs):
+        options = {'max_retries': 2, 'backoff_base': 0.0, 'failure_threshold': 2, 'reset_timeout': 0.1}
+        options.update(kwargs)
+        return PooledHTTPClient(**options)
+
+    def test_retries_transient_statuses(self):
+        url, handler = self.serve([(503, {}), (429, {})])
+        response = self.http_client().post(url + '/v1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(handler.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        url, handler = self.serve([(400, {'error': 'bad request'})])
+        response = self.http_client().post(url + '/v1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(handler.requests), 1)
+
+    def test_breaker_open_half_open_closed_against_stub(self):
+        url, handler = self.serve([(503, {})] * 2)
+        client = self.http_client(max_retries=0)
+        breaker = client.breaker_for(url)
+
+        for _ in range(2):
+            self.assertEqual(client.post(url + '/v1').status_code, 503)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            client.post(url + '/v1')
+        self.assertEqual(len(handler.requests), 2)
+
+        time.sleep(0.11)
+        self.assertEqual(client.post(url + '/v1').status_code, 200)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_non_connection_error_on_half_open_probe_reopens_circuit(self):
+        client = self.http_client(max_retries=0, failure_threshold=1)
+        url = 'http://upstream.invalid/v1'
+        breaker = client.breaker_for(url)
+        breaker.record_failure()
+        time.sleep(0.11)
+
+        with mock.patch.object(client.session, 'post',
+                               side_effect=requests.exceptions.ChunkedEncodingError('truncated')):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                client.post(url)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # The next probe is allowed once the reset timeout passes again
+        time.sleep(0.11)
+        self.assertTrue(breaker.allow_request())
+
+    def test_connection_errors_are_retried_then_raised(self):
+        client = self.http_client(failure_threshold=1)
+        url = 'http://upstream.invalid/v1'
+        with mock.patch.object(client.session, 'post',
+                               side_effect=requests.exceptions.ConnectionError('refused')) as post:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.post(url)
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(client.breaker_for(url).state, CircuitBreaker.OPEN)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from verifier.jobs import (
+    FAILED_JOB_MESSAGE, claim_next_job, complete_job, defer_job, enqueue_job, fail_job, heartbeat, requeue_stale_jobs,
+)
+from verifier.models import VerificationJob
+
+
+class JobOwnershipTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('worker-test')
+        self.job = enqueue_job(self.user, 'Title', 'Article body', 'Other')
+
+    def age(self, seconds):
+        VerificationJob.objects.filter(id=self.job.id).update(
+            started_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_claim_counts_the_attempt(self):
+        job = claim_next_job()
+        self.assertEqual((job.id, job.status, job.attempts), (self.job.id, VerificationJob.STATUS_RUNNING, 1))
+        self.assertIsNone(claim_next_job())
+
+    def test_heartbeat_keeps_a_slow_job_from_going_stale(self):
+        job = claim_next_job()
+        self.age(300)
+        self.assertTrue(heartbeat(job))
+        self.assertEqual(requeue_stale_jobs(120), 0)
+        self.assertTrue(complete_job(job, {'prediction': 'True'}))
+
+    def test_requeued_job_cannot_be_completed_by_its_old_worker(self):
+        first = claim_next_job()
+        self.age(300)
+        self.assertEqual(requeue_stale_jobs(120), 1)
+        second = claim_next_job()
+        self.assertEqual(second.attempts, 2)
+
+        saved = []
+        self.assertFalse(heartbeat(first))
+        self.assertFalse(complete_job(first, {'prediction': 'Fake'}, lambda: saved.append(1)))
+        self.assertFalse(fail_job(first))
+        self.assertFalse(defer_job(first))
+        self.assertEqual(saved, [])
+
+        self.assertTrue(complete_job(second, {'prediction': 'True'}))
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.result), (VerificationJob.STATUS_DONE, {'prediction': 'True'}))
+
+    def test_complete_saves_the_history_row_once(self):
+        job = claim_next_job()
+        calls = []
+
+        def save_result():
+            calls.append(1)
+            return None
+
+        self.assertTrue(complete_job(job, {'prediction': 'True'}, save_result))
+        self.assertFalse(complete_job(job, {'prediction': 'True'}, save_result))
+        self.assertEqual(calls, [1])
+
+    def test_failure_shows_a_fixed_message(self):
+        job = claim_next_job()
+        self.assertTrue(fail_job(job))
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('verifier:job_detail', args=[job.id]))
+        self.assertContains(response, FAILED_JOB_MESSAGE)
@@ -0,0 +1,88 @@
+import time
+
+from django.test import SimpleTestCase
+
+from verifier.http_client import PooledHTTPClient
+from verifier.llm_providers import Provider, ProviderError, ProviderRouter
+
+from .stubs import StubServer, scripted_handler
+
+
+def completion(content):
+    return {'choices': [{'message': {'content': content}}]}
+
+
+class ProviderRouterTests(SimpleTestCase):
+
+    def stub(self, script, default=None):
+        handler = scripted_handler(script, default=default or (200, completion('ok')))
+        server = StubServer(handler)
+        self.addCleanup(server.close)
+        return server, handler
+
+    def router(self, *servers, **kwargs):
+        # The first provider's weight makes it the primary; the rest are hedges/fallbacks
+        providers = [
+            Provider(f'p{i}', server.url, f'model-{i}', weight=1.0 if i == 0 else 1e-9)
+            for i, server in enumerate(servers)
+        ]
+        kwargs.setdefault('hedge_enabled', False)
+        router = ProviderRouter(providers, http_client=PooledHTTPClient(max_retries=0), **kwargs)
+        self.addCleanup(router.executor.shutdown, wait=False)
+        return router, providers
+
+    def complete(self, router):
+        return router.complete(lambda provider: {'model': provider.model})
+
+    def test_fails_over_when_the_primary_errors(self):
+        down, _ = self.stub([(503, {'error': 'overloaded'})])
+        up, _ = self.stub([(200, completion('from backup'))])
+        router, (primary, backup) = self.router(down, up)
+
+        provider, body = self.complete(router)
+        self.assertIs(provider, backup)
+        self.assertEqual(body['choices'][0]['message']['content'], 'from backup')
+        self.assertEqual(primary.stats()['errors'], 1)
+        self.assertGreater(primary.error_rate, 0)
+        self.assertEqual(backup.stats()['wins'], 1)
+
+    def test_non_json_200_counts_as_an_error_and_fails_over(self):
+        broken, _ = self.stub([(200, b'<html>Bad gateway</html>')])
+        up, _ = self.stub([])
+        router, (primary, backup) = self.router(broken, up)
+
+        provider, _ = self.complete(router)
+        self.assertIs(provider, backup)
+        self.assertEqual(primary.stats()['errors'], 1)
+        self.assertIsNone(primary.latency.mean)
+
+    def test_raises_when_every_provider_fails(self):
+        first, _ = self.stub([], default=(500, {'error': 'down'}))
+        second, _ = self.stub([], default=(200, b'not json'))
+        router, _ = self.router(first, second)
+        with self.assertRaises(ProviderError):
+            self.complete(router)
+
+    def test_hedge_beats_a_slow_primary(self):
+        slow, slow_handler = self.stub([(200, completion('slow'), 2.0)])
+        fast, fast_handler = self.stub([(200, completion('fast'))])
+        router, (primary, backup) = self.router(slow, fast, hedge_enabled=True, hedge_delay=0.05)
+
+        start = time.monotonic()
+        provider, body = self.complete(router)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIs(provider, backup)
+        self.assertEqual(body['choices'][0]['message']['content'], 'fast')
+        self.assertEqual(len(slow_handler.requests), 1)
+        self.assertEqual(len(fast_handler.requests), 1)
+        self.assertEqual((backup.stats()['hedges'], backup.stats()['wins']), (1, 1))
+        self.assertEqual(primary.stats()['wins'], 0)
+
+    def test_no_hedge_when_the_primary_answers_in_time(self):
+        quick, _ = self.stub([])
+        spare, spare_handler = self.stub([])
+        router, (primary, _) = self.router(quick, spare, hedge_enabled=True, hedge_delay=1.0)
+
+        provider, _ = self.complete(router)
+        self.assertIs(provider, primary)
+        self.assertEqual(spare_handler.requests, [])
@@ -0,0 +1,141 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from verifier.ml_engine import (
+    HASHING_VECTORIZER_FILE, LOGISTIC_FILE, TREE_FILE, VECTORIZER_FILE, LocalModelEngine, wordopt,
+)
+from verifier.model_arrays import MappedTfidfVectorizer, export_arrays
+
+
+FAKE_WORDS = ['shocking', 'secret', 'exposed', 'miracle', 'hoax', 'naïve', 'straße']
+TRUE_WORDS = ['officials', 'report', 'study', 'minister', 'budget', 'café', 'résumé']
+COMMON_WORDS = ['the', 'city', 'plan', 'news', 'week', 'people', 'said', 'covid19', 'under_score']
+
+# Every branch of the preprocessing: markup, URLs, brackets, words with
+# digits, punctuation, control characters, non-ASCII and empty text
+TEXTS = [
+    'SHOCKING secret EXPOSED!!! The miracle hoax, people said.',
+    'Officials report the budget study; the minister said so.',
+    'Read http://example.com/a and www.example.org <b>bold</b> [citation needed] now',
+    'covid19 v2 2020 results from the h1n1 study in week 3',
+    'Café résumé from the naïve straße — officials said',
+    'secret\x01officials\x7fhoax\x0bbudget\x1fminister\tstudy',
+    'multi\nline\ntext with the \\w escape and under_score words',
+    'ｆｕｌｌ width and ٣ digits beside the report',
+    'unknownword zzzz qqqq',
+    'minister ' * 40,
+    '',
+    '   ',
+]
+
+
+def corpus(size=300, seed=2):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(size):
+        label = i % 2
+        words = rng.choices(TRUE_WORDS if label else FAKE_WORDS, k=rng.randint(2, 6))
+        words += rng.choices(FAKE_WORDS + TRUE_WORDS + COMMON_WORDS, k=rng.randint(3, 10))
+        rng.shuffle(words)
+        texts.append(' '.join(words))
+        labels.append(label)
+    return [wordopt(text) for text in texts], np.array(labels)
+
+
+class EngineEquivalenceTests(SimpleTestCase):
+    """The pickled, fast-path and memory-mapped engines must score identically"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        texts, labels = corpus()
+        cls.tfidf = cls.write_bundles('tfidf', TfidfVectorizer(), texts, labels)
+        cls.hashing = cls.write_bundles(
+            'hashing', HashingVectorizer(n_features=2 ** 12, alternate_sign=False), texts, labels,
+            params={'n_features': 2 ** 12, 'alternate_sign': False},
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def write_bundles(cls, name, vectorizer, texts, labels, params=None):
+        """``(pickled_dir, arrays_dir)`` holding the same fitted models"""
+        features = vectorizer.fit_transform(texts)
+        logistic = LogisticRegression(max_iter=1000).fit(features, labels)
+        tree = DecisionTreeClassifier(random_state=0, max_depth=6).fit(features, labels)
+
+        pickled, arrays = os.path.join(cls.root, name), os.path.join(cls.root, f'{name}-arrays')
+        os.makedirs(pickled)
+        os.makedirs(arrays)
+        if params is None:
+            joblib.dump(vectorizer, os.path.join(pickled, VECTORIZER_FILE))
+        else:
+            for directory in (pickled, arrays):
+                with open(os.path.join(directory, HASHING_VECTORIZER_FILE), 'w') as handle:
+                    json.dump(params, handle)
+        joblib.dump(logistic, os.path.join(pickled, LOGISTIC_FILE))
+        joblib.dump(tree, os.path.join(pickled, TREE_FILE))
+        export_arrays(vectorizer, logistic, tree, arrays)
+        return pickled, arrays
+
+    def engines(self, bundles):
+        pickled, arrays = bundles
+        engines = LocalModelEngine(pickled), LocalModelEngine(pickled), LocalModelEngine(arrays)
+        for engine in engines:
+            self.assertTrue(engine.available, engine.load_error)
+        engines[0].fast_counts = False  # vectorizer.transform of the wordopt texts
+        return engines
+
+    def assertSameScores(self, reference, engine):
+        expected_features = reference._vectorize(TEXTS)
+        features = engine._vectorize(TEXTS)
+        self.assertEqual(features.shape, expected_features.shape)
+        np.testing.assert_allclose(features.toarray(), expected_features.toarray(), rtol=0, atol=1e-12)
+
+        expected_lr, expected_tree = reference.score_many(TEXTS)
+        logistic_true, tree_true = engine.score_many(TEXTS)
+        np.testing.assert_allclose(logistic_true, expected_lr, rtol=1e-9, atol=1e-12)
+        np.testing.assert_array_equal(tree_true, expected_tree)
+        self.assertEqual(
+            [result['prediction'] for result in engine.predict_many(TEXTS)],
+            [result['prediction'] for result in reference.predict_many(TEXTS)],
+        )
+
+    def test_tfidf_fast_path_and_mapped_bundle_match_sklearn(self):
+        reference, fast, mapped = self.engines(self.tfidf)
+        self.assertTrue(fast.fast_counts)
+        self.assertIsInstance(mapped.vectorizer, MappedTfidfVectorizer)
+        self.assertTrue(mapped.fast_counts)
+        self.assertSameScores(reference, fast)
+        self.assertSameScores(reference, mapped)
+
+    def test_hashing_mapped_bundle_matches_pickled(self):
+        reference, pickled, mapped = self.engines(self.hashing)
+        self.assertIsInstance(mapped.vectorizer, HashingVectorizer)
+        self.assertSameScores(reference, pickled)
+        self.assertSameScores(reference, mapped)
+
+    def test_predictions_are_not_trivial(self):
+        # Guards the equivalence checks against a corpus that scores everything alike
+        reference = self.engines(self.tfidf)[0]
+        predictions = {result['prediction'] for result in reference.predict_many(TEXTS[:2])}
+        self.assertEqual(predictions, {'Fake', 'True'})
+
+    def test_missing_models_report_an_error(self):
+        engine = LocalModelEngine(os.path.join(self.root, 'missing'))
+        self.assertFalse(engine.available)
+        self.assertEqual(engine.predict('text')['prediction'], 'Error')
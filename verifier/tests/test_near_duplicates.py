@@ -0,0 +1,74 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from verifier import views
+from verifier.models import ContentSignature, VerificationResult
+from verifier.near_duplicates import index_signatures
+from verifier.trending import TrendingBuffer
+
+
+ARTICLE = (
+    'City officials announced on Monday that the downtown bridge will close for repairs '
+    'next month, with traffic diverted to the river road for about six weeks.'
+)
+
+
+class NearDuplicateTierTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('dup-test')
+        # Keep the saved rows out of the process-wide trending buffer
+        patcher = mock.patch.object(views, 'record_trending')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def result(self, source, content=ARTICLE):
+        return VerificationResult.objects.create(
+            user=self.user, title='', content=content, prediction='True', confidence=0.9, source=source,
+        )
+
+    def test_saved_results_record_their_tier(self):
+        rows = views.save_verification_results(self.user, [
+            {'title': '', 'content': 'one', 'category': 'Other',
+             'result': {'prediction': 'Fake', 'confidence': 0.8, 'source': 'local'}},
+            {'title': '', 'content': 'two', 'category': 'Other',
+             'result': {'prediction': 'Fake', 'confidence': 0.8, 'source': 'llm', 'reused': True}},
+        ])
+        self.assertEqual([row.source for row in rows], ['local', 'reused'])
+
+    def test_rebuild_indexes_only_llm_verdicts(self):
+        llm = self.result('llm')
+        for source in ('local', 'heuristic', 'reused', ''):
+            self.result(source, ARTICLE + f' ({source})')
+        call_command('rebuild_duplicate_index', stdout=StringIO())
+        self.assertEqual(list(ContentSignature.objects.values_list('result_id', flat=True)), [llm.id])
+
+    def test_cache_miss_reuses_only_stored_llm_verdicts(self):
+        original = self.result('local')
+        index_signatures([(original, '', ARTICLE)])
+        with mock.patch.object(views.detector.cache, 'get', return_value=None):
+            self.assertIsNone(views.detector._near_duplicate_verdict(ARTICLE + ' Updated.'))
+
+            VerificationResult.objects.filter(pk=original.pk).update(source='llm')
+            reused = views.detector._near_duplicate_verdict(ARTICLE + ' Updated.')
+        self.assertEqual((reused['source'], reused['reused_from']), ('llm', original.id))
+
+    def test_flusher_prunes_expired_signatures(self):
+        fresh, old = self.result('llm'), self.result('llm', ARTICLE + ' Older copy.')
+        index_signatures([(fresh, '', fresh.content), (old, '', old.content)])
+        ContentSignature.objects.filter(result=old).update(created_at=timezone.now() - timedelta(days=365))
+
+        buffer = TrendingBuffer(prune_interval=3600)
+        buffer.prune_signatures()
+        self.assertEqual(list(ContentSignature.objects.values_list('result_id', flat=True)), [fresh.id])
+
+        # Rate limited to once per prune_interval
+        ContentSignature.objects.filter(result=fresh).update(created_at=timezone.now() - timedelta(days=365))
+        buffer.prune_signatures()
+        self.assertEqual(ContentSignature.objects.count(), 1)
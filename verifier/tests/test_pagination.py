@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from verifier.models import VerificationResult
+from verifier.pagination import KeysetPaginator, encode_cursor
+
+
+class KeysetPaginatorTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('pager', password='secret')
+        base = timezone.now() - timedelta(days=1)
+        predictions = ['True', 'Fake', 'Partially True']
+        for i in range(23):
+            result = VerificationResult.objects.create(
+                user=self.user, title=f'Article {i}', content=f'Body {i}',
+                prediction=predictions[i % 3], confidence=0.5,
+            )
+            # Runs of equal timestamps, so the id tiebreak matters
+            VerificationResult.objects.filter(pk=result.pk).update(created_at=base + timedelta(minutes=i // 4))
+
+    def queryset(self, **filters):
+        return VerificationResult.objects.filter(user=self.user, **filters)
+
+    def expected(self, **filters):
+        return list(self.queryset(**filters).order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, paginator):
+        """Every page from the first, following next cursors"""
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def ids(self, page):
+        return [row.id for row in page]
+
+    def test_next_cursors_visit_every_row_once_in_order(self):
+        pages = self.walk(KeysetPaginator(self.queryset(), 5))
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([row_id for page in pages for row_id in self.ids(page)], self.expected())
+        self.assertFalse(pages[0].has_previous)
+        self.assertFalse(pages[-1].has_next)
+
+    def test_previous_cursors_round_trip(self):
+        paginator = KeysetPaginator(self.queryset(), 5)
+        pages = self.walk(paginator)
+        for earlier, page in zip(pages, pages[1:]):
+            back = paginator.get_page(page.previous_cursor)
+            self.assertEqual(self.ids(back), self.ids(earlier))
+            self.assertEqual(back.has_previous, earlier.has_previous)
+            self.assertEqual(self.ids(paginator.get_page(back.next_cursor)), self.ids(page))
+
+    def test_filtered_listing(self):
+        paginator = KeysetPaginator(self.queryset(prediction='Fake'), 3)
+        pages = self.walk(paginator)
+        self.assertEqual([row_id for page in pages for row_id in self.ids(page)], self.expected(prediction='Fake'))
+        self.assertEqual(self.ids(paginator.get_page(pages[-1].previous_cursor)), self.ids(pages[-2]))
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        paginator = KeysetPaginator(self.queryset(), 5)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        VerificationResult.objects.create(user=self.user, title='New', content='Fresh', prediction='Fake',
+                                          confidence=0.5)
+        self.assertEqual(self.ids(paginator.get_page(first.next_cursor)), self.ids(second))
+
+    def test_bad_cursor_gives_the_first_page(self):
+        first = self.ids(KeysetPaginator(self.queryset(), 5).get_page())
+        for cursor in ('garbage', encode_cursor(self.queryset().first(), 'next')[:-3] + '!!!', 'YWJj'):
+            self.assertEqual(self.ids(KeysetPaginator(self.queryset(), 5).get_page(cursor)), first)
+
+    def test_history_view_keeps_the_filter_across_pages(self):
+        self.client.force_login(self.user)
+        url = reverse('verifier:history')
+        seen = []
+        params = {'result_filter': 'True'}
+        while True:
+            page = self.client.get(url, params).context['page_obj']
+            seen.extend(self.ids(page))
+            if not page.has_next:
+                break
+            params['cursor'] = page.next_cursor
+        self.assertEqual(seen, self.expected(prediction='True'))
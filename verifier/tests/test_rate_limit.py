@@ -0,0 +1,55 @@
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from verifier.rate_limit import CacheBucketStore, RateLimited, TokenBucket
+
+
+class CacheBucketStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+        self.store = CacheBucketStore('default', prefix='test-ratelimit')
+        self.store.LOCK_WAIT = 0.05
+        self.lock_key = 'test-ratelimit:bucket::lock'
+
+    def bucket(self):
+        return TokenBucket('bucket', rate=1.0, capacity=2, store=self.store)
+
+    def test_tokens_are_shared_and_the_lock_released(self):
+        bucket, other_process = self.bucket(), self.bucket()
+        self.assertEqual(bucket.reserve(), (True, 0.0))
+        self.assertTrue(other_process.reserve()[0])
+        self.assertFalse(bucket.reserve()[0])
+        self.assertIsNone(self.cache.get(self.lock_key))
+
+    def test_held_lock_fails_closed(self):
+        self.cache.add(self.lock_key, 'other-process', timeout=60)
+        start = time.monotonic()
+        with self.assertRaises(RateLimited):
+            self.store.update('bucket:', lambda state: (state, 'applied'), ttl=60)
+        self.assertLess(time.monotonic() - start, 1.0)
+        # Someone else's lock is left alone
+        self.assertEqual(self.cache.get(self.lock_key), 'other-process')
+
+    def test_bucket_refuses_while_the_lock_is_held(self):
+        bucket = self.bucket()
+        self.cache.add(self.lock_key, 'other-process', timeout=60)
+        granted, retry_after = bucket.reserve()
+        self.assertFalse(granted)
+        self.assertGreater(retry_after, 0)
+        self.assertEqual(bucket.stats()['rejected'], 1)
+        with self.assertRaises(RateLimited) as raised:
+            bucket.acquire()
+        self.assertEqual(raised.exception.scope, 'bucket')
+
+    def test_expired_lock_taken_over_is_not_deleted(self):
+        def apply(state):
+            # Our lock expires mid-update and another process takes it
+            self.cache.set(self.lock_key, 'other-process', timeout=60)
+            return (1.0, 0.0), 'applied'
+
+        self.assertEqual(self.store.update('bucket:', apply, ttl=60), 'applied')
+        self.assertEqual(self.cache.get(self.lock_key), 'other-process')
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from dashboard.models import UserCategoryStats, UserMonthlyStats, UserStats
+from dashboard.rollups import rebuild_user_stats
+from verifier import views
+from verifier.models import VerificationResult
+
+
+def entry(content, prediction, category='Politics'):
+    return {'title': '', 'content': content, 'category': category,
+            'result': {'prediction': prediction, 'confidence': 0.8, 'source': 'local'}}
+
+
+class RollupTests(TestCase):
+    """The incrementally maintained rollups must match a recount of the history"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('rollups', password='secret')
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(views, 'record_trending')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.rows = views.save_verification_results(self.user, [
+            entry('one', 'True'), entry('two', 'Fake', 'Health'),
+            entry('three', 'Partially True'), entry('four', 'Fake', 'Science'),
+        ])
+
+    def snapshot(self):
+        stats = UserStats.objects.filter(user=self.user).values(
+            'total_checks', 'true_count', 'fake_count', 'partially_true_count', 'bookmarked_count',
+        ).get()
+        # Rows emptied by deletes stay at zero; a rebuild leaves them out
+        months = dict(UserMonthlyStats.objects.filter(user=self.user, checks__gt=0)
+                      .values_list('month', 'checks'))
+        categories = dict(UserCategoryStats.objects.filter(user=self.user, checks__gt=0)
+                          .values_list('category', 'checks'))
+        return stats, months, categories
+
+    def assertMatchesRecount(self):
+        incremental = self.snapshot()
+        rebuild_user_stats(self.user)
+        self.assertEqual(incremental, self.snapshot())
+        return incremental[0]
+
+    def toggle(self, result):
+        return self.client.post(reverse('verifier:toggle_bookmark', args=[result.id]))
+
+    def delete(self, result):
+        return self.client.post(reverse('verifier:delete_result', args=[result.id]))
+
+    def test_save(self):
+        stats = self.assertMatchesRecount()
+        self.assertEqual((stats['total_checks'], stats['fake_count']), (4, 2))
+
+        views.save_verification_results(self.user, [entry('five', 'True', 'Health')])
+        self.assertEqual(self.assertMatchesRecount()['total_checks'], 5)
+
+    def test_delete(self):
+        self.toggle(self.rows[1])
+        self.delete(self.rows[1])
+        self.delete(self.rows[2])
+        stats = self.assertMatchesRecount()
+        self.assertEqual((stats['total_checks'], stats['bookmarked_count']), (2, 0))
+
+    def test_bookmark(self):
+        self.toggle(self.rows[0])
+        self.toggle(self.rows[3])
+        self.assertEqual(self.assertMatchesRecount()['bookmarked_count'], 2)
+        self.toggle(self.rows[0])
+        self.assertEqual(self.assertMatchesRecount()['bookmarked_count'], 1)
+
+    def test_concurrent_toggles_move_the_counter_once(self):
+        # Both requests loaded the row before either saved
+        stale = [VerificationResult.objects.get(pk=self.rows[0].pk) for _ in range(2)]
+        with mock.patch.object(views, 'get_object_or_404', side_effect=stale):
+            self.toggle(self.rows[0])
+            self.toggle(self.rows[0])
+        self.assertTrue(VerificationResult.objects.get(pk=self.rows[0].pk).is_bookmarked)
+        self.assertEqual(self.assertMatchesRecount()['bookmarked_count'], 1)
+
+    def test_concurrent_deletes_uncount_once(self):
+        stale = [VerificationResult.objects.get(pk=self.rows[0].pk) for _ in range(2)]
+        with mock.patch.object(views, 'get_object_or_404', side_effect=stale):
+            self.delete(self.rows[0])
+            self.delete(self.rows[0])
+        self.assertEqual(self.assertMatchesRecount()['total_checks'], 3)
+
+    def test_stats_missing_are_rebuilt_on_first_touch(self):
+        UserStats.objects.filter(user=self.user).delete()
+        self.toggle(self.rows[0])
+        self.assertEqual(self.assertMatchesRecount()['bookmarked_count'], 1)
@@ -0,0 +1,159 @@
+import json
+import random
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from verifier import views
+
+from verifier.http_client import PooledHTTPClient
+from verifier.llm_providers import Provider, ProviderRouter
+from verifier.streaming import AnalysisStreamParser, iter_completion_deltas, iter_sse_data
+
+from .stubs import StubServer, chunked_handler
+
+
+ANALYSIS = 'Café claims "up 20%" \\ a\tb\nnext line — 😀 done'
+VERDICT = json.dumps({'prediction': 'Fake', 'confidence': 0.9, 'analysis': ANALYSIS})
+
+
+def completion_stream(content, delta_size=7):
+    """SSE bytes of an OpenAI-compatible stream writing ``content``"""
+    events = [b': keep-alive\n\n']
+    for start in range(0, len(content), delta_size):
+        chunk = {'choices': [{'delta': {'content': content[start:start + delta_size]}}]}
+        events.append(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n'.encode())
+    events.append(b'data: [DONE]\n\n')
+    return b''.join(events)
+
+
+def split_lines(chunks):
+    """Lines of a byte stream arriving as ``chunks``, the way requests yields them"""
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def parse(deltas):
+    parser = AnalysisStreamParser()
+    return ''.join(parser.feed(delta) for delta in deltas)
+
+
+class SSEParsingTests(SimpleTestCase):
+    def test_events_comments_and_done(self):
+        lines = [': ping', 'data: one', '', 'data: two', 'data: lines', '', 'data: [DONE]', '', 'data: late', '']
+        self.assertEqual(list(iter_sse_data(lines)), ['one', 'two\nlines'])
+
+    def test_deltas_survive_every_byte_split(self):
+        body = completion_stream(VERDICT)
+        for cut in range(len(body) + 1):
+            lines = split_lines([body[:cut], body[cut:]])
+            self.assertEqual(''.join(iter_completion_deltas(lines)), VERDICT, cut)
+
+    def test_deltas_survive_random_byte_splits(self):
+        body = completion_stream(VERDICT, delta_size=3)
+        rng = random.Random(16)
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(body)), rng.randint(2, 40)))
+            chunks = [body[a:b] for a, b in zip([0] + cuts, cuts + [len(body)])]
+            self.assertEqual(''.join(iter_completion_deltas(split_lines(chunks))), VERDICT)
+
+
+class AnalysisStreamParserTests(SimpleTestCase):
+    def test_one_character_at_a_time(self):
+        for text in (VERDICT, json.dumps(json.loads(VERDICT), ensure_ascii=False)):
+            self.assertEqual(parse(text), ANALYSIS)
+
+    def test_every_split_point(self):
+        for cut in range(len(VERDICT) + 1):
+            self.assertEqual(parse([VERDICT[:cut], VERDICT[cut:]]), ANALYSIS, cut)
+
+    def test_surrogate_pair_escapes(self):
+        self.assertIn('\\ud83d\\ude00', VERDICT)
+        self.assertEqual(parse(['{"analysis": "a \\ud83d', '\\ude00 b"}']), 'a 😀 b')
+        # A lone surrogate cannot be encoded; it is replaced, not passed on
+        self.assertEqual(parse('{"analysis": "a \\ud83d b"}'), 'a � b')
+
+    def test_analysis_key_as_a_value_is_skipped(self):
+        doc = '{"key_issues": ["analysis"], "note": "\\"analysis\\"", "analysis": "real"}'
+        self.assertEqual(parse(doc), 'real')
+
+
+class StreamOverHTTPTests(SimpleTestCase):
+    def stream_through(self, chunks):
+        server = StubServer(chunked_handler(chunks, delay=0.001))
+        self.addCleanup(server.close)
+        router = ProviderRouter(
+            [Provider('stub', server.url, 'stub-model')],
+            http_client=PooledHTTPClient(max_retries=0), hedge_enabled=False,
+        )
+        self.addCleanup(router.executor.shutdown)
+        _, response, lines = router.stream(lambda provider: {'model': provider.model})
+        try:
+            return parse(iter_completion_deltas(lines))
+        finally:
+            response.close()
+
+    def test_utf8_without_charset(self):
+        body = completion_stream(VERDICT)
+        self.assertEqual(self.stream_through([body]), ANALYSIS)
+
+    def test_chunks_split_inside_characters(self):
+        body = completion_stream(json.dumps(json.loads(VERDICT), ensure_ascii=False))
+        # Cut inside every multi-byte character as well as at random offsets
+        cuts = {i for i in range(1, len(body)) if body[i] & 0xC0 == 0x80}
+        cuts |= set(random.Random(16).sample(range(1, len(body)), 30))
+        cuts = sorted(cuts)
+        chunks = [body[a:b] for a, b in zip([0] + cuts, cuts + [len(body)])]
+        self.assertEqual(self.stream_through(chunks), ANALYSIS)
+
+
+class StreamViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('streamer', password='secret')
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(views, 'record_trending')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def events(self, result):
+        def verify_news_stream(text, title='', category=None):
+            yield 'analysis', 'Looks '
+            yield 'result', result
+
+        with mock.patch.object(views.detector, 'verify_news_stream', side_effect=verify_news_stream):
+            response = self.client.post(reverse('verifier:verify_stream'), {
+                'title': 'Title', 'content': 'Some article text long enough to verify.',
+                'category': 'Politics', 'save_to_history': 'on',
+            })
+            body = b''.join(response.streaming_content).decode()
+        return {
+            block.split('\n')[0][len('event: '):]: json.loads(block.split('\n')[1][len('data: '):])
+            for block in body.split('\n\n') if block.startswith('event:')
+        }
+
+    def test_result_carries_only_the_rendered_fields(self):
+        other = User.objects.create_user('someone-else')
+        original = views.VerificationResult.objects.create(
+            user=other, title='', content='x', prediction='Fake', confidence=0.9, source='llm',
+        )
+        events = self.events({
+            'prediction': 'Fake', 'confidence': 0.9, 'analysis': 'Looks fabricated.',
+            'key_issues': ['No sources'], 'error': None, 'source': 'llm',
+            'reused': True, 'reused_from': original.id, 'similarity': 0.97,
+            'api_response': {'raw': 'upstream'},
+        })
+        self.assertEqual(events['analysis'], {'text': 'Looks '})
+        result = events['result']
+        self.assertNotIn('reused_from', result)
+        self.assertNotIn('api_response', result)
+        self.assertEqual((result['prediction'], result['reused']), ('Fake', True))
+        saved = views.VerificationResult.objects.get(user=self.user)
+        self.assertEqual(result['verification_id'], saved.id)
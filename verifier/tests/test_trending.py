@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from verifier.models import TrendingTopic
+from verifier.trending import TrendingBuffer
+
+
+class TrendingBufferTests(TestCase):
+
+    def counts(self, topics):
+        # The data migration seeds some topics, so tests compare differences
+        found = dict(TrendingTopic.objects.filter(topic__in=topics).values_list('topic', 'verification_count'))
+        return {topic: found.get(topic, 0) for topic in topics}
+
+    def test_empty_flush_does_not_load_the_keyword_extractor(self):
+        buffer = TrendingBuffer()
+        with mock.patch('verifier.trending.get_keyword_extractor') as extractor, \
+                mock.patch('verifier.trending.refresh_scores') as refresh:
+            self.assertEqual(buffer.flush(), 0)
+        extractor.assert_not_called()
+        refresh.assert_not_called()
+
+    def test_flush_counts_categories_and_keywords(self):
+        buffer = TrendingBuffer()
+        buffer._entries.append(('Health', 'Vaccine trial results', 'The vaccine trial reported results.'))
+        with mock.patch('verifier.trending.get_keyword_extractor') as extractor, \
+                mock.patch('verifier.trending.refresh_scores'):
+            extractor.return_value.extract_many.return_value = [['vaccine trial']]
+            self.assertEqual(buffer.flush(), 2)
+
+    def test_failed_extraction_keeps_the_entries(self):
+        buffer = TrendingBuffer()
+        buffer._entries.append(('Health', 'Vaccine trial results', 'The vaccine trial reported results.'))
+        buffer._counts['Politics'] = 1  # left over from an earlier failed write
+        topics = ['Health', 'Vaccine Trial', 'Politics']
+        before = self.counts(topics)
+        with mock.patch('verifier.trending.get_keyword_extractor') as extractor, \
+                mock.patch('verifier.trending.refresh_scores'):
+            extractor.return_value.extract_many.side_effect = MemoryError
+            self.assertEqual(buffer.flush(), 0)
+            self.assertEqual(len(buffer._entries), 1)
+            self.assertEqual(buffer._counts, {'Politics': 1})
+
+            extractor.return_value.extract_many.side_effect = None
+            extractor.return_value.extract_many.return_value = [['vaccine trial']]
+            self.assertEqual(buffer.flush(), 3)
+        after = self.counts(topics)
+        self.assertEqual({topic: after[topic] - before[topic] for topic in topics}, dict.fromkeys(topics, 1))
+
+    def test_failed_rescore_does_not_count_twice(self):
+        buffer = TrendingBuffer()
+        buffer._counts['Health'] = 2
+        before = self.counts(['Health'])['Health']
+        with mock.patch('verifier.trending.refresh_scores', side_effect=RuntimeError):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(buffer._counts, {})
+        self.assertEqual(self.counts(['Health'])['Health'], before + 2)
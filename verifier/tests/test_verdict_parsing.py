@@ -0,0 +1,67 @@
+from django.test import SimpleTestCase
+
+from verifier.ml_utils import APINewsVerifier
+from verifier.verdict_parsing import (
+    VerdictSchemaError, normalize_prediction, parse_verdict, validate_verdict,
+)
+
+
+def verdict(**fields):
+    return dict({'prediction': 'True', 'confidence': 0.8}, **fields)
+
+
+class PredictionMappingTests(SimpleTestCase):
+    GRADED = {
+        'mostly true': 'True', 'mostly_true': 'True', 'Mostly-True': 'True',
+        'mostly false': 'Fake', 'MOSTLY_FALSE': 'Fake',
+        'half true': 'Partially True', 'half_true': 'Partially True',
+    }
+
+    def test_graded_ratings(self):
+        for label, expected in self.GRADED.items():
+            self.assertEqual(normalize_prediction(label), expected, label)
+            self.assertEqual(validate_verdict(verdict(prediction=label))['prediction'], expected, label)
+
+    def test_legacy_api_uses_the_same_mapping(self):
+        process = APINewsVerifier._process_api_response
+        for label, expected in self.GRADED.items():
+            result = process(None, {'verdict': label, 'confidence': 0.7})
+            self.assertEqual(result['prediction'], expected, label)
+        # Labels neither side knows are passed through by the legacy API
+        self.assertEqual(process(None, {'verdict': 'satire'})['prediction'], 'satire')
+
+    def test_unknown_prediction_is_rejected(self):
+        self.assertIsNone(normalize_prediction('satire'))
+        self.assertIsNone(normalize_prediction(None))
+        with self.assertRaises(VerdictSchemaError):
+            validate_verdict(verdict(prediction='satire'))
+
+
+class ProbabilityTests(SimpleTestCase):
+    def confidence(self, value):
+        return validate_verdict(verdict(confidence=value))['confidence']
+
+    def test_fractions_pass_through(self):
+        for value in (0, 0.0, 0.42, 1, 1.0, '0.9'):
+            self.assertEqual(self.confidence(value), float(value))
+
+    def test_percentages(self):
+        self.assertEqual(self.confidence(85), 0.85)
+        self.assertEqual(self.confidence('85'), 0.85)
+        self.assertEqual(self.confidence(100), 1.0)
+        self.assertEqual(self.confidence(10), 0.1)
+        self.assertEqual(self.confidence(85.5), 0.855)
+        self.assertEqual(self.confidence('5%'), 0.05)
+        self.assertEqual(self.confidence('85%'), 0.85)
+        self.assertEqual(self.confidence('72.5%'), 0.725)
+        self.assertEqual(self.confidence('0.5%'), 0.005)
+
+    def test_out_of_range_values_are_rejected(self):
+        for value in (1.5, '1.5', 2, '7', 9.9, 101, '150%', -0.1, 'high', None, True):
+            with self.assertRaises(VerdictSchemaError, msg=repr(value)):
+                self.confidence(value)
+
+    def test_bad_confidence_fails_the_parse(self):
+        result, status = parse_verdict('{"prediction": "Fake", "confidence": 1.5}')
+        self.assertIsNone(result)
+        self.assertTrue(status.startswith('schema:'))
@@ -0,0 +1,448 @@
+"""
+Headless training for the local classifiers, replacing the notebook.
+
+The Fake/True CSVs are read in chunks, and each chunk is cleaned with the
+same wordopt used at inference, in a process pool while the next chunk is
+read. The TF-IDF vectorizer is fitted once and the classifiers are fitted
+concurrently on the shared matrix (the tree builders and lbfgs release the
+GIL; a random forest also uses ``n_jobs`` cores itself).
+
+Each run writes a bundle directory named ``<UTC timestamp>-<hash>``:
+
+    tfidf_vectorizer.pkl, logistic_regression.pkl, decision_tree.pkl, ...
+    metrics.json    held-out scores, timings and training parameters
+    manifest.json   sha256 of every file and input CSV, and the bundle hash
+
+The file names match what LocalModelEngine loads, so a bundle directory can
+be used as ML_MODEL_DIR directly or installed into it with install_bundle().
+
+train_streaming_bundle() is the out-of-core variant for corpora that do not
+fit in memory. Features come from a stateless HashingVectorizer (saved as
+its parameters in hashing_vectorizer.json, so nothing is fitted and nothing
+grows with the corpus), and the logistic regression is an SGDClassifier
+with log loss trained by partial_fit on interleaved batches of both CSVs.
+The first pass cleans and hashes each batch once and spills it to a
+temporary directory; further epochs and the evaluation read the spill. The
+decision tree cannot learn incrementally, so it is fitted on a fixed-size
+reservoir sample of the training rows. Peak memory is about one batch plus
+the reservoir, whatever the size of the corpus.
+"""
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from .ml_engine import (
+    HASHING_VECTORIZER_FILE, LOGISTIC_FILE, MANIFEST_FILE, TREE_FILE, VECTORIZER_FILE,
+    smoothed_tree_probability, wordopt,
+)
+from .model_arrays import ARRAY_FILES, export_arrays
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Class 0 is Fake.csv and class 1 is True.csv, as in the notebook
+LABELED_FILES = (('Fake.csv', 0), ('True.csv', 1))
+
+# The notebook's estimators with its (default) settings; only the first two
+# are used at inference time
+MODELS = {
+    'logistic_regression': lambda seed, n_jobs: LogisticRegression(),
+    'decision_tree': lambda seed, n_jobs: DecisionTreeClassifier(random_state=seed),
+    'random_forest': lambda seed, n_jobs: RandomForestClassifier(random_state=seed, n_jobs=n_jobs),
+    'gradient_boosting': lambda seed, n_jobs: GradientBoostingClassifier(random_state=seed),
+}
+MODEL_FILES = {
+    'logistic_regression': LOGISTIC_FILE,
+    'decision_tree': TREE_FILE,
+    'random_forest': 'random_forest.pkl',
+    'gradient_boosting': 'gradient_boosting.pkl',
+}
+ENGINE_MODELS = ('logistic_regression', 'decision_tree')
+
+METRICS_FILE = 'metrics.json'
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_labeled_chunks(sources: Sequence[Tuple[str, int]], chunk_size: int) -> Iterator[Tuple[List[str], int]]:
+    """Yield ``(texts, label)`` chunks from each CSV's ``text`` column"""
+    import pandas as pd
+
+    for path, label in sources:
+        for frame in pd.read_csv(path, usecols=['text'], chunksize=chunk_size, dtype=str):
+            yield frame['text'].fillna('').tolist(), label
+
+
+def _clean_chunk(texts: List[str]) -> List[str]:
+    return [wordopt(text) for text in texts]
+
+
+def clean_chunks(chunks, workers: int = 1):
+    """Apply wordopt to ``(texts, label)`` chunks in order, in ``workers`` processes when > 1.
+
+    At most two chunks per worker are in flight, so reading overlaps cleaning
+    without holding the raw CSVs in memory.
+    """
+    if workers <= 1:
+        for texts, label in chunks:
+            yield _clean_chunk(texts), label
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for texts, label in chunks:
+            pending.append((pool.submit(_clean_chunk, texts), label))
+            if len(pending) >= workers * 2:
+                future, chunk_label = pending.popleft()
+                yield future.result(), chunk_label
+        while pending:
+            future, chunk_label = pending.popleft()
+            yield future.result(), chunk_label
+
+
+def preprocess(chunks, workers: int = 1) -> Tuple[List[str], np.ndarray]:
+    """Cleaned texts and their labels from ``(texts, label)`` chunks"""
+    texts, labels = [], []
+    for cleaned, label in clean_chunks(chunks, workers):
+        texts.extend(cleaned)
+        labels.extend([label] * len(cleaned))
+    return texts, np.asarray(labels, dtype=np.int64)
+
+
+def fit_models(names: Sequence[str], features, labels, seed: int, n_jobs: int) -> Dict[str, Tuple[object, float]]:
+    """Fit the named classifiers concurrently; returns ``{name: (model, seconds)}``"""
+
+    def fit(name):
+        start = time.perf_counter()
+        model = MODELS[name](seed, n_jobs).fit(features, labels)
+        return name, model, time.perf_counter() - start
+
+    fitted = Parallel(n_jobs=len(names), prefer='threads')(delayed(fit)(name) for name in names)
+    return {name: (model, seconds) for name, model, seconds in fitted}
+
+
+def evaluate(model, features, labels) -> Dict[str, object]:
+    predicted = model.predict(features)
+    report = classification_report(labels, predicted, target_names=['Fake', 'True'],
+                                   output_dict=True, zero_division=0)
+    return {
+        'accuracy': round(float(accuracy_score(labels, predicted)), 6),
+        'fake_f1': round(report['Fake']['f1-score'], 6),
+        'true_f1': round(report['True']['f1-score'], 6),
+        'macro_f1': round(report['macro avg']['f1-score'], 6),
+    }
+
+
+def train_bundle(sources, output_root, models=ENGINE_MODELS, seed=42, test_size=0.25,
+                 workers=1, n_jobs=-1, chunk_size=5000, arrays=False, log=print) -> Tuple[str, Dict[str, object]]:
+    """Train on ``sources`` (``(csv_path, label)`` pairs) and write a bundle under ``output_root``"""
+    unknown = [name for name in models if name not in MODELS]
+    if unknown:
+        raise ValueError(f'Unknown model(s): {", ".join(unknown)}')
+
+    timings = {}
+    start = time.perf_counter()
+    texts, labels = preprocess(read_labeled_chunks(sources, chunk_size), workers)
+    timings['read_and_preprocess'] = time.perf_counter() - start
+    log(f'Read and cleaned {len(texts)} articles in {timings["read_and_preprocess"]:.1f}s')
+    if len(set(labels.tolist())) < 2:
+        raise ValueError('Training needs articles of both classes')
+
+    x_train, x_test, y_train, y_test = train_test_split(
+        texts, labels, test_size=test_size, random_state=seed, stratify=labels,
+    )
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer()
+    train_features = vectorizer.fit_transform(x_train)
+    test_features = vectorizer.transform(x_test)
+    timings['vectorize'] = time.perf_counter() - start
+    log(f'Vectorized into {train_features.shape[1]} features in {timings["vectorize"]:.1f}s')
+
+    start = time.perf_counter()
+    fitted = fit_models(list(models), train_features, y_train, seed, n_jobs)
+    timings['fit'] = time.perf_counter() - start
+    log(f'Fitted {", ".join(models)} in {timings["fit"]:.1f}s')
+
+    scores = {}
+    for name, (model, seconds) in fitted.items():
+        scores[name] = dict(evaluate(model, test_features, y_test), fit_seconds=round(seconds, 3))
+    if all(name in fitted for name in ENGINE_MODELS):
+        # What the verifier actually serves: the average of both models
+        logistic_true = fitted['logistic_regression'][0].predict_proba(test_features)[:, 1]
+        tree_true = smoothed_tree_probability(fitted['decision_tree'][0], test_features)
+        combined = (logistic_true + tree_true) / 2.0
+        scores['combined'] = {'accuracy': round(float(np.mean((combined >= 0.5) == y_test)), 6)}
+
+    metrics = _metrics('tfidf', seed, test_size, len(x_train), len(x_test),
+                       train_features.shape[1], scores, timings)
+    artifacts = {VECTORIZER_FILE: vectorizer}
+    artifacts.update({MODEL_FILES[name]: model for name, (model, _) in fitted.items()})
+    bundle = write_bundle(output_root, artifacts, metrics, sources, arrays=arrays)
+    return bundle, metrics
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _metrics(mode, seed, test_size, train_articles, test_articles, features, scores, timings, **extra):
+    return dict({
+        'created_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__,
+        'mode': mode,
+        'seed': seed,
+        'test_size': test_size,
+        'train_articles': train_articles,
+        'test_articles': test_articles,
+        'features': int(features),
+        'models': scores,
+        'timings': {step: round(seconds, 3) for step, seconds in timings.items()},
+        'peak_rss_mb': _peak_rss_mb(),
+    }, **extra)
+
+
+def interleaved_batches(sources, batch_size: int, seed: int) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """Shuffled ``(texts, labels)`` batches mixing every source in proportion to its size.
+
+    SGD needs both classes in every batch; reading Fake.csv to the end before
+    True.csv would teach it one class at a time.
+    """
+    import pandas as pd
+
+    total = sum(os.path.getsize(path) for path, _ in sources) or 1
+    readers = []
+    for path, label in sources:
+        rows = max(1, round(batch_size * os.path.getsize(path) / total))
+        readers.append((iter(pd.read_csv(path, usecols=['text'], chunksize=rows, dtype=str)), label))
+
+    rng = np.random.default_rng(seed)
+    while readers:
+        texts, labels, active = [], [], []
+        for reader, label in readers:
+            frame = next(reader, None)
+            if frame is None:
+                continue
+            active.append((reader, label))
+            chunk = frame['text'].fillna('').tolist()
+            texts.extend(chunk)
+            labels.extend([label] * len(chunk))
+        readers = active
+        if texts:
+            order = rng.permutation(len(texts))
+            yield [texts[i] for i in order], np.asarray(labels, dtype=np.int64)[order]
+
+
+def _confusion_scores(matrix) -> Dict[str, object]:
+    """evaluate()'s scores from an accumulated 2x2 confusion matrix"""
+    f1 = []
+    for cls in (0, 1):
+        true_positive = matrix[cls, cls]
+        predicted, actual = matrix[:, cls].sum(), matrix[cls, :].sum()
+        f1.append(2 * true_positive / (predicted + actual) if predicted + actual else 0.0)
+    return {
+        'accuracy': round(float(np.trace(matrix) / max(1, matrix.sum())), 6),
+        'fake_f1': round(float(f1[0]), 6),
+        'true_f1': round(float(f1[1]), 6),
+        'macro_f1': round(float(np.mean(f1)), 6),
+    }
+
+
+def train_streaming_bundle(sources, output_root, n_features=2 ** 20, batch_size=2000, epochs=3,
+                           tree_sample=20000, seed=42, test_size=0.25, workers=1, arrays=False,
+                           log=print) -> Tuple[str, Dict[str, object]]:
+    """Out-of-core training with hashed features; writes a bundle like train_bundle()"""
+    hashing_params = {'n_features': n_features, 'alternate_sign': False, 'norm': 'l2'}
+    vectorizer = HashingVectorizer(**hashing_params)
+    classifier = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=seed)
+    classes = np.array([0, 1])
+    holdout = np.random.default_rng(seed)
+    sampler = random.Random(seed)
+    reservoir, reservoir_labels = [], []
+    seen_train = n_train = n_test = 0
+    timings = {}
+
+    with tempfile.TemporaryDirectory(prefix='train-spill-') as spill:
+        start = time.perf_counter()
+        batches = 0
+        for texts, labels in clean_chunks(interleaved_batches(sources, batch_size, seed), workers):
+            features = vectorizer.transform(texts)
+            test = holdout.random(len(labels)) < test_size
+            train_x, train_y = features[~test], labels[~test]
+            sp.save_npz(os.path.join(spill, f'{batches}-train.npz'), train_x)
+            sp.save_npz(os.path.join(spill, f'{batches}-test.npz'), features[test])
+            np.save(os.path.join(spill, f'{batches}-train.npy'), train_y)
+            np.save(os.path.join(spill, f'{batches}-test.npy'), labels[test])
+            classifier.partial_fit(train_x, train_y, classes=classes)
+
+            # Algorithm R: every training row has the same chance to be kept
+            for row in range(train_x.shape[0]):
+                seen_train += 1
+                if len(reservoir) < tree_sample:
+                    reservoir.append(train_x[row])
+                    reservoir_labels.append(train_y[row])
+                else:
+                    slot = sampler.randrange(seen_train)
+                    if slot < tree_sample:
+                        reservoir[slot] = train_x[row]
+                        reservoir_labels[slot] = train_y[row]
+            n_train += train_x.shape[0]
+            n_test += int(test.sum())
+            batches += 1
+        timings['read_preprocess_and_first_epoch'] = time.perf_counter() - start
+        log(f'Cleaned, hashed and spilled {n_train + n_test} articles in {batches} batches '
+            f'in {timings["read_preprocess_and_first_epoch"]:.1f}s')
+        if len(set(reservoir_labels)) < 2:
+            raise ValueError('Training needs articles of both classes')
+
+        def load(batch, part):
+            return (sp.load_npz(os.path.join(spill, f'{batch}-{part}.npz')),
+                    np.load(os.path.join(spill, f'{batch}-{part}.npy')))
+
+        start = time.perf_counter()
+        order = np.random.default_rng(seed + 1)
+        for _ in range(epochs - 1):
+            for batch in order.permutation(batches):
+                classifier.partial_fit(*load(batch, 'train'))
+        timings['further_epochs'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = DecisionTreeClassifier(random_state=seed).fit(sp.vstack(reservoir), reservoir_labels)
+        timings['fit_tree'] = time.perf_counter() - start
+        del reservoir, reservoir_labels
+        log(f'Ran {epochs} SGD epoch(s) and fitted the tree on {min(tree_sample, n_train)} sampled rows')
+
+        matrices = {name: np.zeros((2, 2), dtype=np.int64) for name in ENGINE_MODELS + ('combined',)}
+        for batch in range(batches):
+            features, labels = load(batch, 'test')
+            if not len(labels):
+                continue
+            logistic_true = classifier.predict_proba(features)[:, 1]
+            tree_true = smoothed_tree_probability(tree, features)
+            for name, proba in (('logistic_regression', logistic_true), ('decision_tree', tree_true),
+                                ('combined', (logistic_true + tree_true) / 2.0)):
+                matrices[name] += confusion_matrix(labels, (proba >= 0.5).astype(int), labels=classes)
+
+    # Buckets no article hashed into keep zero weight; a sparse coef_ stores
+    # only the used ones
+    classifier.sparsify()
+    scores = {name: _confusion_scores(matrix) for name, matrix in matrices.items()}
+    metrics = _metrics('streaming', seed, test_size, n_train, n_test, n_features, scores, timings,
+                       epochs=epochs, batch_size=batch_size, tree_sample=min(tree_sample, n_train))
+    artifacts = {HASHING_VECTORIZER_FILE: hashing_params, LOGISTIC_FILE: classifier, TREE_FILE: tree}
+    bundle = write_bundle(output_root, artifacts, metrics, sources, arrays=arrays)
+    return bundle, metrics
+
+
+def write_bundle(output_root, artifacts: Dict[str, object], metrics: Dict[str, object], sources,
+                 arrays=False) -> str:
+    """Write artifacts, metrics and manifest, then move the directory into place.
+
+    With ``arrays`` the serving models are also exported in the
+    memory-mapped format (verifier.model_arrays), which the engine prefers.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.bundle-', dir=output_root)
+    try:
+        files = {}
+        for filename, artifact in artifacts.items():
+            path = os.path.join(staging, filename)
+            if filename.endswith('.json'):
+                with open(path, 'w') as handle:
+                    json.dump(artifact, handle, indent=2)
+            else:
+                joblib.dump(artifact, path)
+            files[filename] = file_sha256(path)
+        if arrays:
+            vectorizer = artifacts.get(VECTORIZER_FILE)
+            if vectorizer is None:
+                vectorizer = HashingVectorizer(**artifacts[HASHING_VECTORIZER_FILE])
+            for filename in export_arrays(vectorizer, artifacts[LOGISTIC_FILE], artifacts[TREE_FILE], staging):
+                files[filename] = file_sha256(os.path.join(staging, filename))
+        with open(os.path.join(staging, METRICS_FILE), 'w') as handle:
+            json.dump(metrics, handle, indent=2)
+        files[METRICS_FILE] = file_sha256(os.path.join(staging, METRICS_FILE))
+
+        bundle_hash = hashlib.sha256(
+            ''.join(f'{name}:{digest}\n' for name, digest in sorted(files.items())).encode()
+        ).hexdigest()
+        version = f'{datetime.now(dt_timezone.utc):%Y%m%dT%H%M%SZ}-{bundle_hash[:12]}'
+        manifest = {
+            'version': version,
+            'format': 'arrays' if arrays else 'pickle',
+            'hash': bundle_hash,
+            'files': files,
+            'inputs': {os.path.basename(str(path)): file_sha256(path) for path, _ in sources},
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as handle:
+            json.dump(manifest, handle, indent=2)
+
+        bundle = os.path.join(output_root, version)
+        os.rename(staging, bundle)
+        return bundle
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def verify_bundle(bundle) -> List[str]:
+    """Files whose sha256 no longer matches the bundle manifest"""
+    with open(os.path.join(bundle, MANIFEST_FILE)) as handle:
+        files = json.load(handle)['files']
+    return [
+        filename for filename, digest in files.items()
+        if not os.path.exists(os.path.join(bundle, filename))
+        or file_sha256(os.path.join(bundle, filename)) != digest
+    ]
+
+
+def install_bundle(bundle, model_dir) -> None:
+    """Copy a bundle's serving files into ``model_dir``, replacing each atomically.
+
+    Files of the other vectorizer kind or format are removed, since the
+    engine prefers hashed features and memory-mapped arrays when present.
+    """
+    corrupt = verify_bundle(bundle)
+    if corrupt:
+        raise ValueError(f'Bundle files do not match the manifest: {", ".join(corrupt)}')
+    os.makedirs(model_dir, exist_ok=True)
+    serving = {VECTORIZER_FILE, HASHING_VECTORIZER_FILE, LOGISTIC_FILE, TREE_FILE, *ARRAY_FILES}
+    present = {filename for filename in serving if os.path.exists(os.path.join(bundle, filename))}
+    for filename in sorted(present) + [MANIFEST_FILE]:
+        staged = os.path.join(model_dir, f'.{filename}.tmp')
+        shutil.copyfile(os.path.join(bundle, filename), staged)
+        os.replace(staged, os.path.join(model_dir, filename))
+    for filename in serving - present:
+        if os.path.exists(os.path.join(model_dir, filename)):
+            os.remove(os.path.join(model_dir, filename))
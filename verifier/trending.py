@@ -0,0 +1,268 @@
+"""
+Trending topics: buffered, lock-free counting with time decay.
+
+Verifications are only queued in an in-process buffer; nothing is written
+on the request path. Every TRENDING_FLUSH_INTERVAL seconds a background
+thread extracts keyphrases for the queued articles in one batch (see
+``keywords.py``) and writes the topic counts with atomic ``F()`` increments
+on the all-time TrendingTopic counter and on a per-hour TrendingTopicBucket, so
+concurrent workers never lose counts. Each topic's ``score`` is then
+recomputed from the buckets inside the trending window with an exponential
+half-life, so "trending" reflects the last few hours, not all-time totals.
+
+The top topics are read from the TRENDING_CACHE_ALIAS cache, which every
+rescore republishes, so dashboard renders only query the table on a cold
+cache. The alias must be shared by all worker processes, or the others keep
+serving their own copy until it expires.
+"""
+import atexit
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .keywords import get_keyword_extractor
+from .models import TrendingTopic, TrendingTopicBucket
+
+
+TRENDING_LIST_SIZE = 10
+
+# Bump when the cached payload's shape changes
+TRENDING_CACHE_KEY = 'trending-topics'
+TRENDING_CACHE_VERSION = 1
+
+
+def extract_topics_many(entries):
+    """Topics credited for each ``(category, title, content)`` entry.
+
+    Every verification counts towards its category plus its top keyphrases.
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+    keywords = get_keyword_extractor().extract_many(
+        [title for _, title, _ in entries],
+        [content for _, _, content in entries],
+        top_k=getattr(settings, 'TRENDING_KEYWORDS_PER_ARTICLE', 2),
+    )
+    return [
+        [category or 'Other'] + [keyword.title() for keyword in article_keywords]
+        for (category, _, _), article_keywords in zip(entries, keywords)
+    ]
+
+
+def extract_topics(category, title, content):
+    """Topics credited for one verification"""
+    return extract_topics_many([(category, title, content)])[0]
+
+
+def current_hour(now=None):
+    now = now or timezone.now()
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+def write_counts(counts, now=None, buckets=True):
+    """Atomically add ``{topic: n}`` to the all-time and (optionally) hourly counters"""
+    counts = {topic[:200]: n for topic, n in counts.items() if n}
+    if not counts:
+        return
+    hour = current_hour(now)
+
+    with transaction.atomic():
+        TrendingTopic.objects.bulk_create(
+            [TrendingTopic(topic=topic) for topic in counts], ignore_conflicts=True
+        )
+        topic_ids = dict(
+            TrendingTopic.objects.filter(topic__in=counts).values_list('topic', 'id')
+        )
+        if buckets:
+            TrendingTopicBucket.objects.bulk_create(
+                [TrendingTopicBucket(topic_id=topic_ids[topic], hour=hour) for topic in counts],
+                ignore_conflicts=True,
+            )
+
+        # One UPDATE per distinct increment rather than per topic
+        by_increment = {}
+        for topic, n in counts.items():
+            by_increment.setdefault(n, []).append(topic_ids[topic])
+        for n, ids in by_increment.items():
+            TrendingTopic.objects.filter(id__in=ids).update(
+                verification_count=F('verification_count') + n, updated_at=timezone.now()
+            )
+            if buckets:
+                TrendingTopicBucket.objects.filter(topic_id__in=ids, hour=hour).update(
+                    count=F('count') + n
+                )
+
+
+def refresh_scores(now=None):
+    """Recompute decayed scores from the hourly buckets in the trending window"""
+    now = now or timezone.now()
+    window_hours = getattr(settings, 'TRENDING_WINDOW_HOURS', 48)
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 6)
+    window_start = current_hour(now) - timedelta(hours=window_hours)
+
+    scores = Counter()
+    for topic_id, hour, count in (
+        TrendingTopicBucket.objects.filter(hour__gte=window_start)
+        .values_list('topic_id', 'hour', 'count')
+    ):
+        age_hours = max(0.0, (now - hour).total_seconds() / 3600.0)
+        scores[topic_id] += count * 0.5 ** (age_hours / half_life)
+
+    with transaction.atomic():
+        TrendingTopic.objects.filter(score__gt=0).exclude(id__in=scores).update(score=0.0)
+        TrendingTopic.objects.bulk_update(
+            [TrendingTopic(id=topic_id, score=score) for topic_id, score in scores.items()],
+            ['score'], batch_size=500,
+        )
+        TrendingTopicBucket.objects.filter(hour__lt=window_start).delete()
+    publish_trending_topics()
+
+
+class TrendingBuffer:
+    """Process-local queue of verifications, flushed to the database in the background.
+
+    Keyword extraction happens at flush time, in one vectorized pass over
+    everything queued since the last flush. The flush thread also prunes
+    expired near-duplicate signatures.
+    """
+
+    # Keyphrases almost always surface in the opening paragraphs
+    CONTENT_CHARS = 4000
+
+    def __init__(self, flush_interval=30, rescore_interval=300, prune_interval=3600):
+        self.flush_interval = flush_interval
+        self.rescore_interval = rescore_interval
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._entries = []
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_rescore = 0.0
+
+    def add(self, category, title, content):
+        with self._lock:
+            self._entries.append((category, title or '', (content or '')[:self.CONTENT_CHARS]))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='trending-flusher', daemon=True
+                )
+                self._thread.start()
+
+    def flush(self):
+        """Write buffered counts; returns the number of distinct topics flushed"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            counts, self._counts = self._counts, Counter()
+
+        # Processes that never recorded a verification have nothing to rescore
+        idle_rescore = (
+            self._thread is not None
+            and time.monotonic() - self._last_rescore >= self.rescore_interval
+        )
+        # Every process flushes at exit; most have nothing to write and must
+        # not load the keyword extractor (and the local models) to find out
+        if not entries and not counts and not idle_rescore:
+            return 0
+        try:
+            extracted = extract_topics_many(entries)
+        except Exception as e:
+            print(f"Trending keyword extraction failed: {e}")
+            with self._lock:
+                self._entries[:0] = entries  # retry on the next flush
+                self._counts.update(counts)
+            return 0
+        for topics in extracted:
+            counts.update(topics)
+        try:
+            if counts:
+                write_counts(counts)
+        except Exception as e:
+            print(f"Trending flush failed: {e}")
+            with self._lock:
+                self._counts.update(counts)  # retry on the next flush
+            return 0
+        if counts or idle_rescore:
+            try:
+                refresh_scores()
+                self._last_rescore = time.monotonic()
+            except Exception as e:
+                # The counts are written; only the scores wait for the next rescore
+                print(f"Trending rescore failed: {e}")
+        return len(counts)
+
+    def prune_signatures(self):
+        """Drop near-duplicate signatures past their reuse window, at most every prune_interval"""
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = time.monotonic()
+        # Imported here: near_duplicates pulls in the whole verifier stack
+        from .near_duplicates import prune_signatures
+
+        try:
+            prune_signatures()
+        except Exception as e:
+            print(f"Near-duplicate pruning failed: {e}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            # Same housekeeping thread: signatures are added as verdicts are saved
+            self.prune_signatures()
+            connections.close_all()
+
+
+trending_buffer = TrendingBuffer(
+    flush_interval=getattr(settings, 'TRENDING_FLUSH_INTERVAL', 30),
+    rescore_interval=getattr(settings, 'TRENDING_RESCORE_INTERVAL', 300),
+    prune_interval=getattr(settings, 'NEAR_DUPLICATE_PRUNE_INTERVAL', 3600),
+)
+atexit.register(trending_buffer.flush)
+
+
+def record_verification(category, title, content):
+    """Count a verification towards trending topics (no database access)"""
+    trending_buffer.add(category, title, content)
+
+
+def _top_topics():
+    return list(
+        TrendingTopic.objects.order_by('-score', '-verification_count')
+        .values('topic', 'verification_count', 'score')[:TRENDING_LIST_SIZE]
+    )
+
+
+def _cache():
+    return caches[getattr(settings, 'TRENDING_CACHE_ALIAS', 'default')]
+
+
+def publish_trending_topics():
+    """Recompute the top topics and replace the cached list"""
+    payload = {'topics': _top_topics(), 'updated_at': timezone.now().isoformat()}
+    _cache().set(
+        TRENDING_CACHE_KEY, payload,
+        timeout=getattr(settings, 'TRENDING_CACHE_TTL', 300), version=TRENDING_CACHE_VERSION,
+    )
+    return payload
+
+
+def get_trending_payload():
+    """Cached ``{'topics': [...], 'updated_at': ...}``; the database is read only on a miss"""
+    payload = _cache().get(TRENDING_CACHE_KEY, version=TRENDING_CACHE_VERSION)
+    if payload is None:
+        payload = publish_trending_topics()
+    return payload
+
+
+def get_trending_topics():
+    """Top trending topics as dicts with ``topic``, ``verification_count`` and ``score``"""
+    return get_trending_payload()['topics']
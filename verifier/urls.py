@@ -5,6 +5,10 @@ app_name = 'verifier'
 
 urlpatterns = [
     path('', views.verify_news, name='verify'),
+    path('stream/', views.verify_news_stream, name='verify_stream'),
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('api/jobs/<int:job_id>/', views.job_status_api, name='job_status_api'),
+    path('api/batch/', views.batch_verify_api, name='batch_verify_api'),
     path('history/', views.verification_history, name='history'),
     path('bookmark/<int:result_id>/', views.toggle_bookmark, name='toggle_bookmark'),
     path('delete/<int:result_id>/', views.delete_result, name='delete_result'),
@@ -0,0 +1,289 @@
+"""
+Extracting and validating the JSON verdict in an LLM reply.
+
+Models wrap the requested object in prose or code fences, put braces inside
+the analysis string, emit an example object first or stop mid-object at
+``max_tokens``. JSONObjectScanner walks the reply once, tracking strings,
+escapes and bracket nesting, and collects every balanced top-level object;
+it can be fed a streamed reply delta by delta. Each candidate is decoded
+(strictly, then with trailing commas dropped) and checked by
+validate_verdict, and the first valid one wins. A reply cut off inside the
+object is closed and tried as a last resort.
+
+Outcomes are counted in ``parse_metrics`` so the failure rate, and how often
+the repair retry in AutoAPINewsVerifier is needed, can be watched.
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+
+PREDICTIONS = ('True', 'Fake', 'Partially True')
+
+# Shared with the legacy fact-check API; graded ratings fold into the nearest class
+_PREDICTION_ALIASES = {
+    'true': 'True', 'real': 'True', 'accurate': 'True', 'reliable': 'True',
+    'mostly true': 'True',
+    'fake': 'Fake', 'false': 'Fake', 'fabricated': 'Fake', 'mostly false': 'Fake',
+    'partially true': 'Partially True', 'partly true': 'Partially True',
+    'half true': 'Partially True', 'mixed': 'Partially True',
+    'misleading': 'Partially True', 'unverified': 'Partially True',
+}
+
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+_STRUCTURAL_RE = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+
+MAX_ANALYSIS_LENGTH = 2000
+MAX_KEY_ISSUES = 10
+
+
+class VerdictSchemaError(ValueError):
+    """A decoded object is not a usable verdict"""
+
+
+class JSONObjectScanner:
+    """Collect balanced top-level ``{...}`` spans from text fed incrementally"""
+
+    def __init__(self):
+        self.text = ''
+        self.objects: List[str] = []
+        self._pos = 0
+        self._start = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, delta: str) -> List[str]:
+        """Add text; returns the objects completed by it"""
+        self.text += delta
+        text = self.text
+        completed = []
+        i = self._pos
+        if self._escape and i < len(text):
+            self._escape = False
+            i += 1
+        while True:
+            # Jump straight to the next character that can change the state
+            if not self._stack:
+                i = text.find('{', i)
+                if i < 0:
+                    i = len(text)
+                    break
+                self._start = i
+                self._stack.append('}')
+                i += 1
+                continue
+            match = (_STRING_SPECIAL_RE if self._in_string else _STRUCTURAL_RE).search(text, i)
+            if match is None:
+                i = len(text)
+                break
+            i = match.start()
+            char = text[i]
+            if self._in_string:
+                if char == '\\':
+                    if i + 1 == len(text):
+                        self._escape = True  # the escaped character is still to come
+                        i += 1
+                        break
+                    i += 1
+                else:
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._stack.append('}' if char == '{' else ']')
+            elif char != self._stack[-1]:
+                # Mismatched closer: abandon this span, rescan after its start
+                i = self._start + 1
+                self._reset()
+                continue
+            else:
+                self._stack.pop()
+                if not self._stack:
+                    completed.append(text[self._start:i + 1])
+                    self._start = None
+            i += 1
+        self._pos = i
+        self.objects.extend(completed)
+        return completed
+
+    def _reset(self):
+        self._start = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def truncated(self) -> Optional[str]:
+        """The unfinished object at the end of the text, closed off, if any"""
+        if self._start is None:
+            return None
+        tail = self.text[self._start:]
+        if self._in_string:
+            tail = tail[:-1] if self._escape else tail
+            tail += '"'
+        tail = tail.rstrip().rstrip(',')
+        if tail.endswith(':'):
+            tail += ' null'
+        return tail + ''.join(reversed(self._stack))
+
+
+def decode_object(candidate: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """``(dict, lenient)`` for a JSON object string, or ``(None, False)``"""
+    for lenient, text in ((False, candidate), (True, _TRAILING_COMMA_RE.sub(r'\1', candidate))):
+        if lenient and text == candidate:
+            break
+        try:
+            value = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value, lenient
+    return None, False
+
+
+def normalize_prediction(label) -> Optional[str]:
+    """One of PREDICTIONS for a verdict label such as ``mostly_false``, or None"""
+    if not isinstance(label, str):
+        return None
+    return _PREDICTION_ALIASES.get(' '.join(label.replace('_', ' ').replace('-', ' ').lower().split()))
+
+
+def _probability(value, name):
+    if isinstance(value, bool) or value is None:
+        raise VerdictSchemaError(f'{name} must be a number')
+    percent = False
+    if isinstance(value, str):
+        value = value.strip()
+        percent = value.endswith('%')
+        value = value.rstrip('%')
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise VerdictSchemaError(f'{name} must be a number')
+    # "85%" and a bare 85 are percentages. A bare 2 or 1.5 is more likely a
+    # 1-10 scale or a slip than 2%, so it stays out of range and is rejected
+    if percent or 10.0 <= value <= 100.0:
+        value /= 100.0
+    if not 0.0 <= value <= 1.0:
+        raise VerdictSchemaError(f'{name} must be between 0 and 1')
+    return value
+
+
+def validate_verdict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized verdict fields of a decoded object; raises VerdictSchemaError"""
+    prediction = data.get('prediction')
+    if not isinstance(prediction, str):
+        raise VerdictSchemaError('prediction is missing')
+    normalized = normalize_prediction(prediction)
+    if normalized is None:
+        raise VerdictSchemaError(f'prediction must be one of {", ".join(PREDICTIONS)}')
+    if 'confidence' not in data:
+        raise VerdictSchemaError('confidence is missing')
+
+    key_issues = data.get('key_issues') or []
+    if isinstance(key_issues, str):
+        key_issues = [key_issues]
+    elif not isinstance(key_issues, list):
+        key_issues = []
+    analysis = data.get('analysis')
+
+    return {
+        'prediction': normalized,
+        'confidence': _probability(data['confidence'], 'confidence'),
+        'analysis': (analysis.strip() if isinstance(analysis, str) and analysis.strip()
+                     else 'Analysis completed')[:MAX_ANALYSIS_LENGTH],
+        'key_issues': [str(issue) for issue in key_issues if issue not in (None, '')][:MAX_KEY_ISSUES],
+        'credibility_score': _probability(data.get('credibility_score', 0.5), 'credibility_score'),
+    }
+
+
+def parse_verdict(content: str, scanner: Optional[JSONObjectScanner] = None):
+    """Extract a verdict from a model reply.
+
+    Returns ``(verdict, status)``: status is 'ok' or 'lenient' with a verdict,
+    otherwise the failure reason ('no_json', 'invalid_json', 'truncated' or
+    'schema: ...') with ``None``. Pass the scanner that already consumed a
+    streamed reply to avoid scanning it again.
+    """
+    if scanner is None:
+        scanner = JSONObjectScanner()
+        scanner.feed(content or '')
+
+    failure = 'no_json'
+    candidates = [(candidate, False) for candidate in scanner.objects]
+    if scanner.truncated:
+        candidates.append((scanner.truncated, True))
+    for candidate, truncated in candidates:
+        data, lenient = decode_object(candidate)
+        if data is None:
+            if failure == 'no_json':
+                failure = 'truncated' if truncated else 'invalid_json'
+            continue
+        try:
+            verdict = validate_verdict(data)
+        except VerdictSchemaError as e:
+            failure = f'schema: {e}'
+            continue
+        return verdict, 'lenient' if lenient or truncated else 'ok'
+    return None, failure
+
+
+class ParseMetrics:
+    """Process-wide counters of verdict parsing outcomes"""
+
+    OUTCOMES = ('ok', 'lenient', 'repaired', 'failed')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {outcome: 0 for outcome in self.OUTCOMES}
+            self._failures: Dict[str, int] = {}
+
+    def record(self, outcome: str, failure: Optional[str] = None) -> None:
+        """Count one reply's final outcome and, if any, its first-pass failure"""
+        with self._lock:
+            self._counters[outcome] += 1
+            if failure:
+                reason = failure.split(':', 1)[0]
+                self._failures[reason] = self._failures.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            failures = dict(self._failures)
+        total = sum(counters.values())
+        counters['total'] = total
+        counters['first_pass_failure_rate'] = (
+            (counters['repaired'] + counters['failed']) / total if total else 0.0
+        )
+        counters['failure_rate'] = counters['failed'] / total if total else 0.0
+        counters['failure_reasons'] = failures
+        return counters
+
+
+parse_metrics = ParseMetrics()
+
+_record_lock = threading.Lock()
+
+
+def record_output(content: str) -> None:
+    """Append a raw model reply to LLM_OUTPUT_RECORD_PATH (JSON lines), if set"""
+    path = getattr(settings, 'LLM_OUTPUT_RECORD_PATH', '')
+    if not path:
+        return
+    try:
+        with _record_lock:
+            os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps({'content': content}) + '\n')
+    except OSError as e:
+        print(f"Could not record LLM output: {e}")
@@ -1,14 +1,31 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.db.models.functions import Substr
+from django.db import connections, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from .forms import NewsVerificationForm, HistoryFilterForm
-from .models import VerificationResult, TrendingTopic
+from .models import VerificationResult, VerificationJob
+from .jobs import enqueue_job
+from .search import apply_search, index_results
+from .near_duplicates import index_signatures
+from .streaming import sse_event
+from .pagination import KeysetPaginator, KnownCountPaginator
+from .rate_limit import RateLimited, check_user_rate
+from .api_auth import api_login_required
+from .trending import record_verification as record_trending
+from dashboard.rollups import record_results_created, record_result_deleted, record_bookmark_changed
+from dashboard.models import UserCategoryStats
+from dashboard.stats import get_user_stats
+import time
 # modified by ganga
 # from .ml_utils import FakeNewsDetector
 import json
+import hashlib
 from .ml_utils import APINewsVerifier
 
 # Initialize the ML detector 
@@ -17,6 +34,16 @@ from .ml_utils import APINewsVerifier
 
 detector = APINewsVerifier()
 
+# Enough of the article for the history card preview and details excerpt
+CONTENT_HEAD_LENGTH = 1000
+
+# Verdict fields the verify page renders; the rest (e.g. reused_from, the id
+# of another user's result) stay on the server
+STREAM_RESULT_FIELDS = (
+    'prediction', 'confidence', 'analysis', 'key_issues', 'error',
+    'source', 'cached', 'reused', 'similarity', 'truncated',
+)
+
 @login_required
 def verify_news(request):
     """Main news verification view"""
@@ -27,26 +54,34 @@ def verify_news(request):
             content = form.cleaned_data['content']
             category = form.cleaned_data.get('category', 'Other')
             save_to_history = form.cleaned_data.get('save_to_history', True)
-            
-            # Use title + content for prediction, or just content if no title
-            text_to_analyze = f"{title} {content}".strip() if title else content
-            # Get ML prediction
-            # modified
-            # result = detector.predict(text_to_analyze)
 
-            result = detector.verify_news(text_to_analyze)
+            try:
+                check_user_rate(request.user)
+                if getattr(settings, 'VERIFICATION_ASYNC_JOBS', False):
+                    job = enqueue_job(request.user, title, content, category, save_to_history)
+                    return redirect('verifier:job_detail', job_id=job.id)
+
+                # Use title + content for prediction, or just content if no title
+                text_to_analyze = f"{title} {content}".strip() if title else content
+                # Get ML prediction
+                # modified
+                # result = detector.predict(text_to_analyze)
+
+                result = detector.verify_news(text_to_analyze, category=category)
+            except RateLimited as e:
+                messages.error(request, e.message)
+                response = verify_page(request, form, status=429)
+                response['Retry-After'] = e.retry_after_header
+                return response
             
             verification_result = None
             if save_to_history:
-                verification_result = VerificationResult.objects.create(
-                    user=request.user,
-                    title=title or content[:100] + '...' if len(content) > 100 else content,
-                    content=content,
-                    prediction=result['prediction'],
-                    confidence=result['confidence'],
-                    category=category
-                )
-                update_trending_topics(category, title, content)
+                verification_result = save_verification_results(request.user, [{
+                    'title': title,
+                    'content': content,
+                    'category': category,
+                    'result': result,
+                }])[0]
 
             context = {
                 'result': result,
@@ -61,15 +96,249 @@ def verify_news(request):
     else:
         form = NewsVerificationForm()
     
-    return render(request, 'verifier/verify.html', {'form': form})
+    return verify_page(request, form)
+
+
+def verify_page(request, form, status=200):
+    return render(request, 'verifier/verify.html', {
+        'form': form,
+        'streaming_enabled': (
+            getattr(settings, 'VERIFICATION_STREAMING_ENABLED', True)
+            and not getattr(settings, 'VERIFICATION_ASYNC_JOBS', False)
+        ),
+    }, status=status)
+
+
+def rate_limited_response(error):
+    """429 JSON answer with ``Retry-After`` for a RateLimited error"""
+    response = JsonResponse({'error': error.message, 'retry_after': error.retry_after}, status=429)
+    response['Retry-After'] = error.retry_after_header
+    return response
+
+
+@login_required
+@require_POST
+def verify_news_stream(request):
+    """Verify one article, relaying the LLM's analysis as server-sent events.
+
+    Emits ``analysis`` events (``{"text": ...}``) while the model writes its
+    explanation and a final ``result`` event with the verdict, so the page
+    shows output at the provider's first-token latency instead of after the
+    whole completion.
+    """
+    form = NewsVerificationForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    try:
+        check_user_rate(request.user)
+    except RateLimited as e:
+        return rate_limited_response(e)
+
+    title = form.cleaned_data.get('title', '')
+    content = form.cleaned_data['content']
+    category = form.cleaned_data.get('category') or 'Other'
+    save_to_history = form.cleaned_data.get('save_to_history', True)
+    text_to_analyze = f"{title} {content}".strip() if title else content
+    user = request.user
+
+    def events():
+        # Opens the stream before the first token so proxies and the browser start reading
+        yield ': verifying\n\n'
+        try:
+            result = None
+            for event, payload in detector.verify_news_stream(text_to_analyze, category=category):
+                if event == 'analysis':
+                    yield sse_event('analysis', {'text': payload})
+                else:
+                    result = payload
+
+            verification_id = None
+            if save_to_history:
+                verification_id = save_verification_results(user, [{
+                    'title': title,
+                    'content': content,
+                    'category': category,
+                    'result': result,
+                }])[0].id
+            public = {field: result[field] for field in STREAM_RESULT_FIELDS if field in result}
+            yield sse_event('result', dict(public, verification_id=verification_id))
+        except RateLimited as e:
+            yield sse_event('error', {'error': e.message, 'retry_after': e.retry_after})
+        except Exception as e:
+            print(f"Streaming verification error: {e}")
+            yield sse_event('error', {'error': 'Verification failed. Please try again.'})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+    return response
+
+
+@login_required
+def job_detail(request, job_id):
+    """Result page for a queued verification; polls until the job finishes"""
+    job = get_object_or_404(VerificationJob, id=job_id, user=request.user)
+
+    if job.status == VerificationJob.STATUS_DONE:
+        context = {
+            'result': job.result,
+            'title': job.title,
+            'content': job.content,
+            'category': job.category,
+            'verification_result': job.verification_result,
+            'form': NewsVerificationForm()
+        }
+        return render(request, 'verifier/result.html', context)
+
+    return render(request, 'verifier/job_pending.html', {'job': job})
+
+
+@login_required
+def job_status_api(request, job_id):
+    """Job status for polling. ``?wait=N`` waits up to N seconds (at most VERIFICATION_JOB_MAX_WAIT)."""
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        wait = 0
+    wait = max(0, min(wait, getattr(settings, 'VERIFICATION_JOB_MAX_WAIT', 1)))
+
+    job = get_object_or_404(VerificationJob, id=job_id, user=request.user)
+    deadline = time.monotonic() + wait
+    while not job.is_finished and time.monotonic() < deadline:
+        time.sleep(0.25)
+        job.refresh_from_db(fields=['status', 'error'])
+
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'finished': job.is_finished,
+        'error': job.error or None,
+    })
+
+
+@require_POST
+@api_login_required
+def batch_verify_api(request):
+    """Verify a batch of articles concurrently (JSON in, JSON out).
+
+    Body: ``{"articles": [{"title": ..., "content": ..., "category": ...}],
+    "save_to_history": true, "concurrency": 4}``. Pipelines authenticate
+    with ``Authorization: Bearer <token>`` (see verifier/api_auth.py).
+    Identical articles in the same category are verified once; results come
+    back in request order with per-item errors.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Request body must be valid JSON.'}, status=400)
+
+    articles = payload.get('articles') if isinstance(payload, dict) else None
+    if not isinstance(articles, list) or not articles:
+        return JsonResponse({'error': '"articles" must be a non-empty list.'}, status=400)
+
+    max_items = getattr(settings, 'BATCH_VERIFY_MAX_ITEMS', 500)
+    if len(articles) > max_items:
+        return JsonResponse({'error': f'At most {max_items} articles per batch.'}, status=400)
+
+    max_concurrency = getattr(settings, 'BATCH_VERIFY_MAX_CONCURRENCY', 8)
+    try:
+        concurrency = int(payload.get('concurrency', max_concurrency))
+    except (TypeError, ValueError):
+        concurrency = max_concurrency
+    concurrency = max(1, min(concurrency, max_concurrency))
+    save_to_history = bool(payload.get('save_to_history', True))
+
+    # Validate every item and group identical content under one cache key
+    items = []
+    unique = {}
+    for article in articles:
+        form = NewsVerificationForm(article if isinstance(article, dict) else {})
+        if not form.is_valid():
+            items.append({'error': {field: errors[0] for field, errors in form.errors.items()}})
+            continue
+        title = form.cleaned_data.get('title', '')
+        content = form.cleaned_data['content']
+        text_to_analyze = f"{title} {content}".strip() if title else content
+        category = form.cleaned_data.get('category') or 'Other'
+        # The category decides escalation and is saved with the result
+        key = (detector.cache_key(text_to_analyze), category)
+        unique.setdefault(key, {
+            'title': title,
+            'content': content,
+            'category': category,
+            'text': text_to_analyze,
+        })
+        items.append({'key': key})
+
+    try:
+        check_user_rate(request.user, cost=len(unique))
+    except RateLimited as e:
+        return rate_limited_response(e)
+
+    def verify(entry):
+        try:
+            return detector.verify_news(entry['text'], category=entry['category'])
+        except RateLimited as e:
+            return {'prediction': 'Error', 'confidence': 0.0, 'error': e.message}
+        except Exception as e:
+            return {'prediction': 'Error', 'confidence': 0.0, 'error': f'Verification failed: {e}'}
+        finally:
+            connections.close_all()
+
+    entries = list(unique.values())
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(entries) or 1)) as pool:
+        for entry, result in zip(entries, pool.map(verify, entries)):
+            entry['result'] = result
+
+    if save_to_history:
+        saveable = [
+            entry for entry in entries
+            if not entry['result'].get('error')
+            and entry['result'].get('prediction') in dict(VerificationResult.PREDICTION_CHOICES)
+        ]
+        for entry, row in zip(saveable, save_verification_results(request.user, saveable)):
+            entry['id'] = row.id
+
+    seen = set()
+    response_items = []
+    for index, item in enumerate(items):
+        if 'error' in item:
+            response_items.append({'index': index, 'error': item['error']})
+            continue
+        entry = unique[item['key']]
+        result = entry['result']
+        response_items.append({
+            'index': index,
+            'prediction': result.get('prediction'),
+            'confidence': result.get('confidence'),
+            'analysis': result.get('analysis'),
+            'source': result.get('source'),
+            'id': entry.get('id'),
+            'duplicate': item['key'] in seen,
+            'error': result.get('error'),
+        })
+        seen.add(item['key'])
+
+    return JsonResponse({'count': len(response_items), 'results': response_items})
 
 
 @login_required
 def verification_history(request):
-    """View user's verification history with filtering"""
+    """View user's verification history with filtering.
+
+    Plain and filtered listings use keyset pagination (``?cursor=``);
+    ranked search results keep numbered pages. List queries never load the
+    full article body, only a DB-side excerpt.
+    """
     filter_form = HistoryFilterForm(request.GET)
     
-    results = VerificationResult.objects.filter(user=request.user)
+    results = (
+        VerificationResult.objects.filter(user=request.user)
+        .defer('content')
+        .annotate(content_head=Substr('content', 1, CONTENT_HEAD_LENGTH))
+    )
+    filters = {}
+    search = ''
     
     if filter_form.is_valid():
         result_filter = filter_form.cleaned_data.get('result_filter')
@@ -77,36 +346,83 @@ def verification_history(request):
         search = filter_form.cleaned_data.get('search')
         
         if result_filter:
-            results = results.filter(prediction=result_filter)
+            filters['prediction'] = result_filter
         
         if category_filter:
-            results = results.filter(category=category_filter)
+            filters['category'] = category_filter
         
+        results = results.filter(**filters)
+
         if search:
-            results = results.filter(
-                Q(title__icontains=search) | Q(content__icontains=search)
-            )
+            results = apply_search(results, search)
     
-    paginator = Paginator(results, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    total_results = history_count(request.user, results, filters, search)
+
+    if search:
+        paginator = KnownCountPaginator(results, 10, total_results)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        page_obj = KeysetPaginator(results, 10).get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
+        'keyset': not search,
         'filter_form': filter_form,
-        'total_results': results.count()
+        'total_results': total_results
     }
     
     return render(request, 'verifier/history.html', context)
 
 
+def history_count(user, results, filters, search=''):
+    """Total for the history header without a COUNT(*) where avoidable.
+
+    Unfiltered and single-filter totals come from the statistics rollups;
+    anything else is counted once and cached briefly.
+    """
+    if not search and len(filters) <= 1:
+        stats = get_user_stats(user, include_details=False)
+        if not filters:
+            return stats['total_checks']
+        if 'prediction' in filters:
+            field = {
+                'True': 'true_news_count',
+                'Fake': 'fake_news_count',
+                'Partially True': 'partially_true_count',
+            }.get(filters['prediction'])
+            if field:
+                return stats[field]
+        if 'category' in filters:
+            return UserCategoryStats.objects.filter(
+                user=user, category=filters['category']
+            ).values_list('checks', flat=True).first() or 0
+
+    key_source = json.dumps([user.id, sorted(filters.items()), search])
+    cache_key = 'history-count:' + hashlib.md5(key_source.encode()).hexdigest()
+    return cache.get_or_set(
+        cache_key, lambda: results.order_by().count(),
+        getattr(settings, 'HISTORY_COUNT_CACHE_TTL', 60),
+    )
+
+
 @login_required
 def toggle_bookmark(request, result_id):
     """Toggle bookmark status of a verification result"""
     if request.method == 'POST':
         result = get_object_or_404(VerificationResult, id=result_id, user=request.user)
-        result.is_bookmarked = not result.is_bookmarked
-        result.save()
+        with transaction.atomic():
+            # Conditional flip: of two concurrent toggles only one changes the
+            # row, so the bookmark counter moves once
+            flipped = VerificationResult.objects.filter(
+                pk=result.pk, is_bookmarked=result.is_bookmarked
+            ).update(is_bookmarked=not result.is_bookmarked)
+            if flipped:
+                result.is_bookmarked = not result.is_bookmarked
+                record_bookmark_changed(result)
+            else:
+                result.is_bookmarked = VerificationResult.objects.filter(
+                    pk=result.pk
+                ).values_list('is_bookmarked', flat=True).first() or False
         
         if request.headers.get('Content-Type') == 'application/json':
             return JsonResponse({
@@ -124,74 +440,62 @@ def toggle_bookmark(request, result_id):
 def delete_result(request, result_id):
     """Delete a verification result"""
     if request.method == 'POST':
-        result = get_object_or_404(VerificationResult, id=result_id, user=request.user)
-        result.delete()
+        with transaction.atomic():
+            # Locked so the rollups see the bookmark flag as it is deleted
+            result = get_object_or_404(
+                VerificationResult.objects.select_for_update(), id=result_id, user=request.user
+            )
+            _, deleted = result.delete()
+            # A concurrent delete of the same row has already un-counted it
+            if deleted.get(VerificationResult._meta.label):
+                record_result_deleted(result)
         messages.success(request, 'Verification result deleted successfully.')
     
     return redirect('verifier:history')
 
 
-def get_trending_topics():
-    """Get or create trending topics"""
-    topics = TrendingTopic.objects.all()[:10]
-    
-    if not topics.exists():
-        initial_topics = [
-            ('Artificial Intelligence', 1250),
-            ('Climate Change', 980),
-            ('Cryptocurrency', 875),
-            ('Space Exploration', 750),
-            ('Healthcare', 690),
-            ('Politics', 650),
-            ('Technology', 580),
-            ('Sports', 520),
-            ('Entertainment', 480),
-            ('Education', 420)
-        ]
-        
-        for topic, count in initial_topics:
-            TrendingTopic.objects.get_or_create(
-                topic=topic,
-                defaults={'verification_count': count}
-            )
-        
-        topics = TrendingTopic.objects.all()[:10]
-    
-    return topics
+def history_title(title, content):
+    """Title stored in history: the headline, or the start of the article"""
+    if title:
+        return title
+    return content[:100] + '...' if len(content) > 100 else content
 
 
-def update_trending_topics(category, title, content):
-    """Update trending topics based on verification"""
-    keywords = []
-    
-    if title:
-        keywords.extend(title.split())
-    
-    if content:
-        words = content.lower().split()
-        important_keywords = [word for word in words 
-                            if len(word) > 4 and word.isalpha()][:5]
-        keywords.extend(important_keywords)
-   
-
-    category_topic, created = TrendingTopic.objects.get_or_create(
-        topic=category,
-        defaults={'verification_count': 1}
+def result_source(result):
+    """The tier recorded in history; borrowed verdicts are marked so they are never re-lent"""
+    return 'reused' if result.get('reused') else (result.get('source') or '')[:20]
+
+
+def save_verification_results(user, entries):
+    """Persist verification results with a single INSERT.
+
+    ``entries`` are dicts with ``title``, ``content``, ``category`` and the
+    verifier ``result``. Returns the created rows in the same order.
+    """
+    rows = VerificationResult.objects.bulk_create([
+        VerificationResult(
+            user=user,
+            title=history_title(entry['title'], entry['content']),
+            content=entry['content'],
+            prediction=entry['result']['prediction'],
+            confidence=entry['result']['confidence'],
+            category=entry['category'] or 'Other',
+            source=result_source(entry['result']),
+        )
+        for entry in entries
+    ])
+    record_results_created(user, rows)
+    index_results(rows)
+    # Only fresh upstream verdicts become reusable for near-duplicates
+    index_signatures(
+        (row, entry['title'], entry['content'])
+        for row, entry in zip(rows, entries)
+        if entry['result'].get('source') == 'llm'
+        and not entry['result'].get('cached') and not entry['result'].get('reused')
     )
-    if not created:
-        category_topic.verification_count += 1
-        category_topic.save()
-    
-    
-    for keyword in keywords[:2]: 
-        if len(keyword) > 4:
-            topic, created = TrendingTopic.objects.get_or_create(
-                topic=keyword.title(),
-                defaults={'verification_count': 1}
-            )
-            if not created:
-                topic.verification_count += 1
-                topic.save()
+    for entry in entries:
+        record_trending(entry['category'] or 'Other', entry['title'], entry['content'])
+    return rows
 
 
 def grok_setup(request):